@@ -0,0 +1,130 @@
+"""
+Benchmark CSV flattening of nested person records: interpreted vs compiled.
+
+Flattens synthetic PDL-shaped person records (see benchmark_wire_format.py)
+with each CSV profile three ways and reports records per second:
+- interpreted: column expressions are parsed and walked per record
+- compiled: the profile's precompiled getters (src/utils/flatten.py)
+- compiled + csv: compiled rows streamed to a CSV file via CSVExportWriter
+
+Usage:
+    python scripts/benchmark_flatten.py
+    python scripts/benchmark_flatten.py --records 20000 --profile detailed
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmark_wire_format import synthetic_person  # noqa: E402
+
+from src.utils.export_writer import CSVExportWriter  # noqa: E402
+from src.utils.flatten import (  # noqa: E402
+    PERSON_CSV_PROFILES,
+    _cell,
+    _parse_steps,
+    compile_columns,
+    parse_column,
+)
+
+
+def interpreted_value(record: dict, expression: str):
+    """Resolve an expression by parsing and walking it for this record."""
+    for alternative in expression.split("||"):
+        values = [record]
+        for step in _parse_steps(alternative.strip()):
+            resolved = []
+            for value in values:
+                if step[0] == "key" and isinstance(value, dict):
+                    resolved.append(value.get(step[1]))
+                elif step[0] == "index" and isinstance(value, list):
+                    resolved.append(value[step[1]] if len(value) > step[1] else None)
+                elif step[0] == "match" and isinstance(value, list):
+                    resolved.append(
+                        next(
+                            (
+                                e for e in value
+                                if isinstance(e, dict)
+                                and (
+                                    _cell(e.get(step[1])) == step[2]
+                                    if step[2] is not None
+                                    else e.get(step[1])
+                                )
+                            ),
+                            None,
+                        )
+                    )
+                elif step[0] == "all" and isinstance(value, list):
+                    resolved.extend(value)
+            values = [v for v in resolved if v is not None]
+        if values and values != [""]:
+            return values if "[*]" in alternative else values[0]
+    return None
+
+
+def interpreted_rows(records: list[dict], specs: tuple[str, ...]) -> int:
+    count = 0
+    for record in records:
+        [
+            _cell(interpreted_value(record, parse_column(spec)[1]))
+            for spec in specs
+        ]
+        count += 1
+    return count
+
+
+def compiled_rows(records: list[dict], specs: tuple[str, ...]) -> int:
+    columns = compile_columns(specs)
+    count = 0
+    for _ in columns.rows(records):
+        count += 1
+    return count
+
+
+def compiled_csv(records: list[dict], specs: tuple[str, ...]) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        writer = CSVExportWriter(
+            os.path.join(directory, "persons.csv"), compile_columns(specs)
+        )
+        writer.write(records)
+        writer.close()
+        return writer.count
+
+
+def rate(run, records: list[dict], specs: tuple[str, ...]) -> float:
+    """Records flattened per second."""
+    started = time.perf_counter()
+    count = run(records, specs)
+    return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument(
+        "--profile", choices=sorted(PERSON_CSV_PROFILES), action="append"
+    )
+    args = parser.parse_args()
+
+    records = [synthetic_person(i) for i in range(args.records)]
+    print(f"Records: {args.records:,} synthetic persons")
+    print()
+    print(f"{'profile':<10}{'columns':>8}{'interpreted/s':>16}"
+          f"{'compiled/s':>14}{'+ csv/s':>12}{'speedup':>9}")
+    for profile in args.profile or ["minimal", "crm", "detailed"]:
+        specs = PERSON_CSV_PROFILES[profile]
+        interpreted = rate(interpreted_rows, records, specs)
+        compiled = rate(compiled_rows, records, specs)
+        with_csv = rate(compiled_csv, records, specs)
+        print(
+            f"{profile:<10}{len(specs):>8}{interpreted:>16,.0f}"
+            f"{compiled:>14,.0f}{with_csv:>12,.0f}{compiled / interpreted:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark PDL wire formats: pretty vs compact JSON, gzip, json vs orjson.
+
+Reports bytes on the wire and decode time for a 100-record person search
+page. By default a synthetic page shaped like PDL person records (with
+experience, education and profiles arrays) is used, so no credits are
+spent. Pass --live to fetch one real page each way (requires PDL_KEY).
+
+Usage:
+    python scripts/benchmark_wire_format.py
+    python scripts/benchmark_wire_format.py --live --sql "SELECT * FROM person WHERE job_title_role='sales'"
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils import fast_json  # noqa: E402
+
+PAGE_SIZE = 100
+DECODE_ROUNDS = 50
+
+
+def synthetic_person(i: int) -> dict:
+    """Build a person record roughly the shape and size of a PDL record."""
+    return {
+        "id": f"pdl-{i:06d}",
+        "full_name": f"Person {i}",
+        "first_name": "Person",
+        "last_name": str(i),
+        "work_email": f"person{i}@example.com",
+        "personal_emails": [f"person{i}@gmail.com"],
+        "emails": [{"address": f"person{i}@example.com", "type": "current_professional"}],
+        "phone_numbers": [f"+1415555{i:04d}"],
+        "job_title": "Director of Engineering",
+        "job_title_role": "engineering",
+        "job_title_levels": ["director"],
+        "job_company_id": f"company-{i % 20}",
+        "job_company_name": f"Company {i % 20}",
+        "job_company_website": f"company{i % 20}.com",
+        "location_name": "San Francisco, California, United States",
+        "location_country": "united states",
+        "skills": ["python", "aws", "kubernetes", "leadership", "sql"],
+        "profiles": [
+            {"network": "linkedin", "url": f"linkedin.com/in/person{i}", "username": f"person{i}"},
+            {"network": "github", "url": f"github.com/person{i}", "username": f"person{i}"},
+        ],
+        "experience": [
+            {
+                "company": {"name": f"Employer {j}", "size": "51-200", "industry": "computer software"},
+                "title": {"name": "Engineer", "role": "engineering", "levels": ["senior"]},
+                "start_date": f"201{j}-01",
+                "end_date": f"201{j + 1}-06",
+                "is_primary": j == 0,
+            }
+            for j in range(5)
+        ],
+        "education": [
+            {
+                "school": {"name": "State University", "type": "post-secondary institution"},
+                "degrees": ["bachelors"],
+                "majors": ["computer science"],
+                "start_date": "2005",
+                "end_date": "2009",
+            }
+        ],
+    }
+
+
+def synthetic_pages() -> tuple[bytes, bytes]:
+    """Return (pretty, compact) encodings of one synthetic search page."""
+    page = {
+        "status": 200,
+        "total": 12345,
+        "scroll_token": "token",
+        "data": [synthetic_person(i) for i in range(PAGE_SIZE)],
+    }
+    pretty = json.dumps(page, indent=2).encode("utf-8")
+    compact = json.dumps(page, separators=(",", ":")).encode("utf-8")
+    return pretty, compact
+
+
+def live_pages(sql: str) -> tuple[bytes, bytes]:
+    """Fetch one real page with pretty on and off."""
+    import httpx
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    headers = {"X-Api-Key": os.environ["PDL_KEY"], "Accept-Encoding": "identity"}
+    bodies = []
+    with httpx.Client(base_url="https://api.peopledatalabs.com/v5", timeout=60) as http:
+        for pretty in (True, False):
+            response = http.post(
+                "/person/search",
+                json={"sql": sql, "size": PAGE_SIZE, "pretty": pretty},
+                headers=headers,
+            )
+            bodies.append(response.content)
+    return bodies[0], bodies[1]
+
+
+def decode_ms(decode, body: bytes) -> float:
+    """Average decode time in milliseconds over DECODE_ROUNDS."""
+    started = time.perf_counter()
+    for _ in range(DECODE_ROUNDS):
+        decode(body)
+    return (time.perf_counter() - started) * 1000 / DECODE_ROUNDS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--live", action="store_true", help="fetch real pages from PDL")
+    parser.add_argument("--sql", default="SELECT * FROM person WHERE work_email IS NOT NULL")
+    args = parser.parse_args()
+
+    pretty, compact = live_pages(args.sql) if args.live else synthetic_pages()
+
+    print(f"Page: {PAGE_SIZE} person records ({'live' if args.live else 'synthetic'})")
+    print(f"Fast JSON backend: {fast_json.BACKEND}")
+    print()
+    print(f"{'format':<22}{'wire bytes':>12}{'json ms':>10}{'fast ms':>10}")
+    for label, body in (("pretty", pretty), ("compact", compact)):
+        wire = len(body)
+        gz = len(gzip.compress(body))
+        print(
+            f"{label:<22}{wire:>12,}{decode_ms(json.loads, body):>10.2f}"
+            f"{decode_ms(fast_json.loads, body):>10.2f}"
+        )
+        print(f"{label + ' + gzip':<22}{gz:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,5 @@
 """Company Search and Enrichment API endpoints."""
 
-import json
-import os
-from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -10,7 +7,17 @@ from fastapi import APIRouter, HTTPException
 
 from src.schema.company import CompanySearchSchema
 from src.utils.company_query_builder import build_company_query
-from src.utils.pdl_client import get_pdl_client
+from src.utils.enrichment_cache import CacheMode
+from src.utils.export_writer import ExportFormat, export_records
+from src.utils.field_profiles import FieldProfile, company_fields
+from src.utils.flatten import CSVColumns, CSVProfile, csv_columns
+from src.utils.pdl_client import (
+    PDL_SEARCH_PAGE_LIMIT,
+    collect_search_pages,
+    get_async_pdl_client,
+)
+from src.utils.prospect_store import store_companies
+from src.utils.resilience import PDLUnavailableError
 
 router = APIRouter(prefix="/api/v1", tags=["companies"])
 
@@ -27,6 +34,14 @@ class CompanySearchRequest(BaseModel):
     scroll_token: str | None = Field(
         default=None, description="Token for pagination"
     )
+    cache_mode: CacheMode = Field(
+        default="use",
+        description="Search cache: use cached pages, refresh them, or bypass the cache",
+    )
+    field_profile: FieldProfile = Field(
+        default="full",
+        description="Company fields to return: minimal, outreach, or full records",
+    )
 
 
 class CompanyEnrichmentRequest(BaseModel):
@@ -44,7 +59,33 @@ class CompanyEnrichmentRequest(BaseModel):
         default=None, description="Search criteria to find companies first, then enrich"
     )
     number_of_companies: int = Field(
-        default=10, ge=1, le=100, description="Number of companies to enrich (max 100)"
+        default=10, ge=1, le=1000, description="Number of companies to enrich (max 1000)"
+    )
+    cache_mode: CacheMode = Field(
+        default="use",
+        description="Result caches (search and enrichment): use, refresh, or bypass",
+    )
+    field_profile: FieldProfile = Field(
+        default="full",
+        description="Company fields to return: minimal, outreach, or full records",
+    )
+    export_format: ExportFormat = Field(
+        default="json",
+        description=(
+            "Export format: json (single document), json_compact, jsonl, "
+            "jsonl_gzip or jsonl_zstd (sharded), csv, parquet or arrow (columnar)"
+        ),
+    )
+    csv_profile: CSVProfile = Field(
+        default="crm",
+        description="Column set for csv exports: minimal, crm, or detailed",
+    )
+    csv_columns: CSVColumns | None = Field(
+        default=None,
+        description=(
+            "Custom csv columns as 'header=expression' specs "
+            "(e.g. 'country=location.country'); overrides csv_profile"
+        ),
     )
 
 
@@ -64,13 +105,15 @@ async def search_companies(request: CompanySearchRequest):
         sql_query = build_company_query(request.criteria)
 
         # Get PDL client
-        client = get_pdl_client()
+        client = get_async_pdl_client()
 
         # Execute search
-        response = client.company_search(
+        response = await client.company_search(
             sql_query=sql_query,
             size=request.size,
             scroll_token=request.scroll_token,
+            fields=company_fields(request.field_profile),
+            cache_mode=request.cache_mode,
         )
 
         return {
@@ -84,6 +127,8 @@ async def search_companies(request: CompanySearchRequest):
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PDLUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Company search failed: {str(e)}")
 
@@ -105,7 +150,7 @@ async def enrich_companies(request: CompanyEnrichmentRequest):
     """
     try:
         # Get PDL client
-        client = get_pdl_client()
+        client = get_async_pdl_client()
         enriched_companies: list[dict] = []
 
         # Validate request - need either company_ids or criteria
@@ -116,7 +161,11 @@ async def enrich_companies(request: CompanyEnrichmentRequest):
         if request.company_ids:
             pdl_ids = request.company_ids[:request.number_of_companies]
             if pdl_ids:
-                bulk_response = client.company_bulk_enrichment(pdl_ids=pdl_ids)
+                bulk_response = await client.company_bulk_enrichment(
+                    pdl_ids=pdl_ids,
+                    fields=company_fields(request.field_profile),
+                    cache_mode=request.cache_mode,
+                )
                 # Response is a flat list where each item IS the company data with status embedded
                 for item in bulk_response:
                     if item.get("status") == 200:
@@ -124,10 +173,23 @@ async def enrich_companies(request: CompanyEnrichmentRequest):
         else:
             # Search first, then enrich using bulk enrichment
             sql_query = build_company_query(request.criteria)
-            search_response = client.company_search(
-                sql_query=sql_query,
-                size=request.number_of_companies,
-            )
+            # Only the IDs are used from the search step
+            if request.number_of_companies > PDL_SEARCH_PAGE_LIMIT:
+                search_response = await collect_search_pages(
+                    client.iter_company_search(
+                        sql_query=sql_query,
+                        limit=request.number_of_companies,
+                        fields=["id"],
+                        cache_mode=request.cache_mode,
+                    )
+                )
+            else:
+                search_response = await client.company_search(
+                    sql_query=sql_query,
+                    size=request.number_of_companies,
+                    fields=["id"],
+                    cache_mode=request.cache_mode,
+                )
 
             if search_response.get("status") != 200:
                 raise HTTPException(
@@ -141,60 +203,67 @@ async def enrich_companies(request: CompanyEnrichmentRequest):
 
             if pdl_ids:
                 # Call bulk enrichment API with PDL IDs
-                bulk_response = client.company_bulk_enrichment(pdl_ids=pdl_ids)
+                bulk_response = await client.company_bulk_enrichment(
+                    pdl_ids=pdl_ids,
+                    fields=company_fields(request.field_profile),
+                    cache_mode=request.cache_mode,
+                )
 
                 # Response is a flat list where each item IS the company data with status embedded
                 for item in bulk_response:
                     if item.get("status") == 200:
                         enriched_companies.append(item)
 
-        # Export to JSON file
-        export_file = _export_companies_to_json(enriched_companies)
+        # Export in the requested format
+        export_file = await _export_companies_to_json(enriched_companies, request)
+        # Keep a local copy for store queries (see src/utils/prospect_store.py)
+        run_id = await store_companies(
+            enriched_companies,
+            "companies_enrich",
+            request.model_dump(
+                mode="json", include={"company_ids", "criteria"}, exclude_none=True
+            ),
+        )
 
         return {
             "status": "success",
             "count": len(enriched_companies),
             "data": enriched_companies,
             "export_file": export_file,
+            "run_id": run_id,
         }
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PDLUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Company enrichment failed: {str(e)}")
 
 
-def _export_companies_to_json(
-    companies: list[dict[str, Any]],
+async def _export_companies_to_json(
+    companies: list[dict[str, Any]], request: CompanyEnrichmentRequest
 ) -> str:
     """
-    Export companies to a JSON file with timestamp.
+    Export companies to a timestamped export.
+
+    Records are streamed to disk in a worker thread (see
+    src/utils/export_writer.py).
 
     Args:
         companies: List of company data to export.
+        request: Enrichment request (export format and csv columns).
 
     Returns:
-        Path to the exported JSON file.
+        Path to the exported JSON or CSV file, or to the manifest of a
+        sharded or columnar export.
     """
-    # Create exports directory if it doesn't exist
-    exports_dir = os.path.join(os.path.dirname(__file__), "..", "..", "exports")
-    os.makedirs(exports_dir, exist_ok=True)
-
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"companies_{timestamp}.json"
-    filepath = os.path.join(exports_dir, filename)
-
-    # Export data
-    export_data = {
-        "generated_at": datetime.now().isoformat(),
-        "total_companies": len(companies),
-        "companies": companies,
-    }
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
-
-    return filepath
+    return await export_records(
+        "companies",
+        "companies",
+        companies,
+        request.export_format,
+        csv_columns("companies", request.csv_profile, request.csv_columns),
+    )
@@ -4,14 +4,21 @@ Persons API endpoints for PDL-POC.
 Provides endpoints for:
 - search_persons: Search persons using PDL Person Search API
 - enrich_persons: Enrich persons using PDL Person Enrichment API
+- enrich_persons/stream: NDJSON streaming variant of enrich_persons
+
+Enriched persons are also upserted into the local prospect store (see
+src/utils/prospect_store.py) under a run ID returned with the response.
 """
 
-import json
-import os
-from datetime import datetime
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Iterable
+from contextlib import aclosing
+from itertools import islice
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from src.schema.persons import (
     EnrichPersonsRequest,
@@ -19,7 +26,18 @@ from src.schema.persons import (
     SearchPersonsRequest,
     SearchPersonsResponse,
 )
-from src.utils.pdl_client import get_pdl_client
+from src.utils.export_writer import AsyncExportWriter, export_records
+from src.utils.field_profiles import person_fields
+from src.utils.flatten import csv_columns
+from src.utils.ndjson import ndjson_response, record_line, summary_line
+from src.utils.pdl_client import (
+    PDL_BULK_LIMIT,
+    PDL_SEARCH_PAGE_LIMIT,
+    collect_search_pages,
+    get_async_pdl_client,
+)
+from src.utils.prospect_store import store_persons
+from src.utils.resilience import PDLUnavailableError
 from src.utils.query_builder import build_pdl_query
 
 router = APIRouter()
@@ -38,13 +56,27 @@ async def search_persons(request: SearchPersonsRequest) -> SearchPersonsResponse
         sql_query = build_pdl_query(request.icp)
 
         # Get PDL client
-        client = get_pdl_client()
-
-        # Execute search
-        response = client.person_search(
-            sql_query=sql_query,
-            size=request.number_of_persons,
-        )
+        client = get_async_pdl_client()
+
+        # Execute search (following scroll tokens beyond one page)
+        if request.number_of_persons > PDL_SEARCH_PAGE_LIMIT:
+            response = await collect_search_pages(
+                client.iter_person_search(
+                    sql_query=sql_query,
+                    limit=request.number_of_persons,
+                    scroll_token=request.scroll_token,
+                    fields=person_fields(request.field_profile),
+                    cache_mode=request.cache_mode,
+                )
+            )
+        else:
+            response = await client.person_search(
+                sql_query=sql_query,
+                size=request.number_of_persons,
+                scroll_token=request.scroll_token,
+                fields=person_fields(request.field_profile),
+                cache_mode=request.cache_mode,
+            )
 
         # Check for errors
         if response.get("status") != 200:
@@ -74,6 +106,8 @@ async def search_persons(request: SearchPersonsRequest) -> SearchPersonsResponse
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PDLUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
@@ -84,55 +118,29 @@ async def enrich_persons(request: EnrichPersonsRequest) -> EnrichPersonsResponse
     Enrich persons using PDL Person Enrichment API.
 
     This endpoint first searches for persons, then enriches them
-    and exports results to a JSON file.
+    and exports results to a JSON file. Requests for more than one
+    search page enrich each page while the next one is being fetched.
     """
     try:
-        client = get_pdl_client()
+        client = get_async_pdl_client()
         enriched_persons: list[dict[str, Any]] = []
 
-        # If person_ids provided, enrich directly
-        if request.person_ids:
-            for pdl_id in request.person_ids[:request.number_of_persons]:
-                try:
-                    result = client.person_enrichment(pdl_id=pdl_id)
-                    if result.get("status") == 200:
-                        enriched_persons.append(result.get("data", {}))
-                except Exception:
-                    continue
-        else:
-            # Search first, then enrich using bulk enrichment
-            sql_query = build_pdl_query(request.icp)
-            search_response = client.person_search(
-                sql_query=sql_query,
-                size=request.number_of_persons,
+        try:
+            async for batch in _enriched_batches(client, request):
+                enriched_persons.extend(batch)
+        except _SearchFailed as failed:
+            return EnrichPersonsResponse(
+                success=False,
+                status_code=failed.response.get("status", 500),
+                message="PDL search failed",
+                persons_enriched=0,
+                persons_requested=request.number_of_persons,
+                persons=None,
             )
 
-            if search_response.get("status") != 200:
-                return EnrichPersonsResponse(
-                    success=False,
-                    status_code=search_response.get("status", 500),
-                    message="PDL search failed",
-                    persons_enriched=0,
-                    persons_requested=request.number_of_persons,
-                    persons=None,
-                )
-
-            # Extract PDL IDs from search results
-            search_data = search_response.get("data", [])
-            pdl_ids = [person.get("id") for person in search_data if person.get("id")]
-
-            if pdl_ids:
-                # Call bulk enrichment API with PDL IDs
-                # Response format: [{"status": 200, "likelihood": 10, "data": {...}}, ...]
-                bulk_response = client.person_bulk_enrichment(pdl_ids=pdl_ids)
-
-                # Extract enriched data from bulk response (list of results)
-                for item in bulk_response:
-                    if item.get("status") == 200 and item.get("data"):
-                        enriched_persons.append(item.get("data"))
-
-        # Export to JSON file
-        export_file = _export_persons_to_json(enriched_persons)
+        # Export in the requested format
+        export_file = await _export_persons_to_json(enriched_persons, request)
+        run_id = await _store_persons(enriched_persons, request)
 
         return EnrichPersonsResponse(
             success=True,
@@ -142,44 +150,317 @@ async def enrich_persons(request: EnrichPersonsRequest) -> EnrichPersonsResponse
             persons_requested=request.number_of_persons,
             persons=enriched_persons,
             export_file=export_file,
+            run_id=run_id,
         )
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PDLUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
-def _export_persons_to_json(
-    persons: list[dict[str, Any]],
+@router.post("/enrich_persons/stream")
+async def enrich_persons_stream(request: EnrichPersonsRequest) -> StreamingResponse:
+    """
+    Streaming variant of enrich_persons (NDJSON).
+
+    Emits one {"record": ...} line per enriched person as each enrichment
+    batch completes, then a trailing {"summary": ...} line with the fields
+    of EnrichPersonsResponse (without the persons list).
+    """
+    try:
+        client = get_async_pdl_client()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def lines() -> AsyncIterator[bytes]:
+        # Each batch is written to the export as it is streamed, so the
+        # enriched records are never accumulated in memory
+        export = AsyncExportWriter(
+            "persons",
+            "persons",
+            request.export_format,
+            csv_columns("persons", request.csv_profile, request.csv_columns),
+        )
+        await export.open()
+        run_id = None
+        try:
+            async for batch in _enriched_batches(client, request):
+                await export.write(batch)
+                run_id = await _store_persons(batch, request, run_id)
+                for person in batch:
+                    yield record_line(person)
+        except _SearchFailed as failed:
+            await export.abort()
+            yield summary_line(
+                {
+                    "success": False,
+                    "status_code": failed.response.get("status", 500),
+                    "message": "PDL search failed",
+                    "persons_enriched": 0,
+                    "persons_requested": request.number_of_persons,
+                }
+            )
+            return
+        except BaseException:
+            await export.abort()
+            raise
+
+        export_file = await export.close()
+        yield summary_line(
+            {
+                "success": True,
+                "status_code": 200,
+                "message": "Persons enriched successfully",
+                "persons_enriched": export.count,
+                "persons_requested": request.number_of_persons,
+                "export_file": export_file,
+                "run_id": run_id,
+            }
+        )
+
+    def on_error(e: Exception) -> dict[str, Any]:
+        status_code = 503 if isinstance(e, PDLUnavailableError) else 500
+        return {
+            "success": False,
+            "status_code": status_code,
+            "message": f"Internal error: {str(e)}",
+            "persons_requested": request.number_of_persons,
+        }
+
+    return ndjson_response(lines(), on_error)
+
+
+class _SearchFailed(Exception):
+    """The search stage of enrich_persons returned a PDL error response."""
+
+    def __init__(self, response: dict[str, Any]):
+        message = response.get("error", {}).get("message", "PDL search failed")
+        super().__init__(message)
+        self.response = response
+
+
+async def _enriched_batches(
+    client: Any, request: EnrichPersonsRequest
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Yield enriched person records batch by batch, in search order.
+
+    - person_ids: enriched directly in PDL_BULK_LIMIT-sized batches, at
+      most client.bulk_concurrency in flight
+    - up to one search page: one search, then one bulk enrichment
+    - more than one page: each search page is enriched as it arrives, at
+      most client.bulk_concurrency in flight (see _search_and_enrich_pages)
+
+    Raises:
+        _SearchFailed: If the (first) search page fails.
+    """
+    fields = person_fields(request.field_profile)
+
+    if request.person_ids:
+        # If person_ids provided, enrich directly
+        pdl_ids = request.person_ids[:request.number_of_persons]
+        batches = [
+            pdl_ids[i : i + PDL_BULK_LIMIT]
+            for i in range(0, len(pdl_ids), PDL_BULK_LIMIT)
+        ]
+        async for results in _ordered_as_completed(
+            (_bulk_enrich(client, batch, fields, request) for batch in batches),
+            limit=client.bulk_concurrency,
+        ):
+            yield _enriched_data(results)
+        return
+
+    if request.number_of_persons > PDL_SEARCH_PAGE_LIMIT:
+        # Several search pages: enrich each page as soon as it arrives
+        async for results in _search_and_enrich_pages(client, request, fields):
+            yield _enriched_data(results)
+        return
+
+    # Search first, then enrich using bulk enrichment
+    # (only the IDs are used from the search step)
+    search_response = await client.person_search(
+        sql_query=build_pdl_query(request.icp),
+        size=request.number_of_persons,
+        fields=["id"],
+        cache_mode=request.cache_mode,
+    )
+    if search_response.get("status") != 200:
+        raise _SearchFailed(search_response)
+
+    # Extract PDL IDs from search results
+    search_data = search_response.get("data", [])
+    pdl_ids = [person.get("id") for person in search_data if person.get("id")]
+    yield _enriched_data(await _bulk_enrich(client, pdl_ids, fields, request))
+
+
+def _enriched_data(bulk_response: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Extract enriched data from bulk response (list of results)."""
+    return [
+        item["data"]
+        for item in bulk_response
+        if item.get("status") == 200 and item.get("data")
+    ]
+
+
+async def _bulk_enrich(
+    client: Any,
+    pdl_ids: list[str],
+    fields: list[str] | None,
+    request: EnrichPersonsRequest,
+) -> list[dict[str, Any]]:
+    """
+    Bulk enrich PDL IDs (chunked by the client).
+
+    Response format: [{"status": 200, "likelihood": 10, "data": {...}}, ...]
+    """
+    if not pdl_ids:
+        return []
+    return await client.person_bulk_enrichment(
+        pdl_ids=pdl_ids, fields=fields, cache_mode=request.cache_mode
+    )
+
+
+async def _search_and_enrich_pages(
+    client: Any,
+    request: EnrichPersonsRequest,
+    fields: list[str] | None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Fetch ceil(n/100) search pages and pipeline each one into bulk enrichment.
+
+    The search iterator prefetches the next page while the current page's
+    bulk enrichment is already in flight, so total latency tracks the
+    slowest page rather than the sum of all pages. At most
+    client.bulk_concurrency page enrichments are in flight. Bulk results
+    are yielded in page order as soon as each leading page's enrichment
+    completes.
+
+    Args:
+        client: Async PDL client.
+        request: Enrich request (number_of_persons, icp, cache_mode).
+        fields: Optional field projection for the enriched records.
+
+    Yields:
+        Bulk enrichment results, one list per search page.
+
+    Raises:
+        _SearchFailed: If the first search page fails. A failure after the
+            first page keeps the pages already enriched.
+    """
+    seen: set[str] = set()
+    enrichments: deque[asyncio.Task] = deque()
+    try:
+        pages = client.iter_person_search(
+            sql_query=build_pdl_query(request.icp),
+            limit=request.number_of_persons,
+            fields=["id"],
+            cache_mode=request.cache_mode,
+        )
+        async with aclosing(pages):
+            async for page in pages:
+                if page.get("status") != 200:
+                    if not seen:
+                        raise _SearchFailed(page)
+                    break
+
+                page_ids = [
+                    person["id"]
+                    for person in page.get("data", [])
+                    if person.get("id") and person["id"] not in seen
+                ]
+                seen.update(page_ids)
+                if page_ids:
+                    if len(enrichments) >= max(1, client.bulk_concurrency):
+                        # Same bound as person_ids batches: wait for the
+                        # leading page before starting another bulk call
+                        yield await enrichments.popleft()
+                    enrichments.append(
+                        asyncio.ensure_future(
+                            _bulk_enrich(client, page_ids, fields, request)
+                        )
+                    )
+                while enrichments and enrichments[0].done():
+                    yield enrichments.popleft().result()
+
+        while enrichments:
+            yield await enrichments.popleft()
+    finally:
+        for task in enrichments:
+            task.cancel()
+
+
+async def _ordered_as_completed(
+    calls: Iterable[Awaitable[list[dict[str, Any]]]],
+    limit: int,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Run calls concurrently and yield their results in call order.
+
+    At most `limit` calls are in flight; calls is consumed lazily, so a
+    call is only created once a slot frees up.
+    """
+    pending = iter(calls)
+    tasks: deque[asyncio.Task] = deque(
+        asyncio.ensure_future(call) for call in islice(pending, max(1, limit))
+    )
+    try:
+        while tasks:
+            result = await tasks.popleft()
+            tasks.extend(asyncio.ensure_future(call) for call in islice(pending, 1))
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _export_persons_to_json(
+    persons: list[dict[str, Any]], request: EnrichPersonsRequest
 ) -> str:
     """
-    Export persons to a JSON file with timestamp.
+    Export persons to a timestamped export.
+
+    Records are streamed to disk in a worker thread (see
+    src/utils/export_writer.py).
 
     Args:
         persons: List of person data to export.
+        request: Enrichment request (export format and csv columns).
 
     Returns:
-        Path to the exported JSON file.
+        Path to the exported JSON or CSV file, or to the manifest of a
+        sharded or columnar export.
     """
-    # Create exports directory if it doesn't exist
-    exports_dir = os.path.join(os.path.dirname(__file__), "..", "..", "exports")
-    os.makedirs(exports_dir, exist_ok=True)
+    return await export_records(
+        "persons",
+        "persons",
+        persons,
+        request.export_format,
+        csv_columns("persons", request.csv_profile, request.csv_columns),
+    )
 
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"persons_{timestamp}.json"
-    filepath = os.path.join(exports_dir, filename)
 
-    # Export data
-    export_data = {
-        "generated_at": datetime.now().isoformat(),
-        "total_persons": len(persons),
-        "persons": persons,
-    }
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
+async def _store_persons(
+    persons: list[dict[str, Any]],
+    request: EnrichPersonsRequest,
+    run_id: str | None = None,
+) -> str | None:
+    """
+    Upsert enriched persons into the local prospect store.
 
-    return filepath
+    Args:
+        persons: Person records to store.
+        request: Enrichment request (its ICP is recorded with the run).
+        run_id: Run to add the persons to (a new run if omitted).
 
+    Returns:
+        The store run ID, or None if the store is disabled.
+    """
+    return await store_persons(
+        persons,
+        "persons_enrich",
+        request.icp.model_dump(mode="json", exclude_none=True),
+        run_id,
+    )
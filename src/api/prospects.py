@@ -3,30 +3,68 @@ Prospects API endpoints for PDL-POC.
 
 Provides unified endpoints for prospect search with automatic mode detection:
 - SIC-based (if sic_code/naics_code present): Company Search → Extract IDs → Person Search
+  (stages pipelined, see src/utils/sic_pipeline.py)
 - Direct (otherwise): Person Search → Person Enrichment
 
 Uses CombinedICP schema and ProspectsQueryBuilder for unified query building.
 
+/preview/stream and /generate/stream return the same flows as NDJSON: one
+record per line followed by a trailing summary line. /jobs runs generate
+as a background job (see src/utils/jobs.py) that is polled for progress and
+checkpointed page by page (see src/utils/checkpoint.py) so it can resume.
+Jobs run in the worker process that accepted them; a run holds an
+exclusive lease on its checkpoint, and other workers answer polls for it
+from the checkpoint on disk.
+Generated persons are also upserted into the local prospect store (see
+src/utils/prospect_store.py) under a run ID returned with the response.
+
 Reference: docs/PROSPECTS_FLOW_DESIGN.md
 """
 
-import json
+import asyncio
 import os
-from datetime import datetime
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
+from src.core.config import settings
 from src.schema.prospects import (
     ProspectSearchRequest,
     ProspectPreviewResponse,
     ProspectGenerateResponse,
+    ProspectJobRequest,
+    ProspectJobResponse,
+)
+from src.utils.checkpoint import (
+    CheckpointLease,
+    CheckpointLeaseHeldError,
+    RunCheckpoint,
 )
-from src.utils.pdl_client import get_pdl_client
+from src.utils.enrichment_cache import CacheMode
+from src.utils.export_writer import export_records
+from src.utils.field_profiles import person_fields
+from src.utils.flatten import csv_columns
+from src.utils.jobs import Job, JobQueueFullError, get_job_manager
+from src.utils.ndjson import ndjson_response, record_line, summary_line
+from src.utils.pdl_client import (
+    PDL_SEARCH_PAGE_LIMIT,
+    get_async_pdl_client,
+    state_directory,
+)
+from src.utils.prospect_store import store_persons
+from src.utils.resilience import PDLUnavailableError
 from src.utils.prospects_query_builder import ProspectsQueryBuilder
+from src.utils.search_budget import SearchBudget
+from src.utils.sic_pipeline import SICCursor, SICPipeline
 
 router = APIRouter(prefix="/api/v1/prospects", tags=["prospects"])
 
+# Receives each final page of a flow and the scroll token resuming after it
+PageFunc = Callable[[list[dict], str | None], Awaitable[None]]
+
 
 @router.post("/preview", response_model=ProspectPreviewResponse)
 async def preview_prospects(request: ProspectSearchRequest) -> ProspectPreviewResponse:
@@ -47,7 +85,7 @@ async def preview_prospects(request: ProspectSearchRequest) -> ProspectPreviewRe
         2. Person Enrichment
     """
     try:
-        client = get_pdl_client()
+        client = get_async_pdl_client()
 
         if request.icp.is_sic_based:
             return await _preview_sic_based(client, request)
@@ -56,6 +94,8 @@ async def preview_prospects(request: ProspectSearchRequest) -> ProspectPreviewRe
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PDLUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Preview failed: {str(e)}")
 
@@ -72,7 +112,7 @@ async def generate_prospects(
     - Direct: Person Search → Enrichment → Save
     """
     try:
-        client = get_pdl_client()
+        client = get_async_pdl_client()
 
         if request.icp.is_sic_based:
             # SIC-based: includes enrichment
@@ -82,195 +122,607 @@ async def generate_prospects(
             result = await _generate_direct(client, request)
 
         # Export to file
-        export_path = _export_prospects_to_json(result.preview_data)
+        export_path = await _export_prospects_to_json(result.preview_data, request)
+        run_id = await _store_prospects(result.preview_data, request)
 
-        return ProspectGenerateResponse(
-            success=result.success,
-            mode=result.mode,
-            companies_found=result.companies_found,
-            persons_generated=result.persons_found,
-            export_path=export_path,
-            scroll_token=result.scroll_token,
-            message=result.message,
-        )
+        return _generate_response(result, export_path, run_id)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PDLUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Generate failed: {str(e)}")
 
 
-async def _preview_sic_based(
-    client: Any, request: ProspectSearchRequest
-) -> ProspectPreviewResponse:
-    """Handle SIC-based flow: Company Search → Person Search."""
-    query_builder = ProspectsQueryBuilder(request.icp)
+@router.post("/preview/stream")
+async def preview_prospects_stream(request: ProspectSearchRequest) -> StreamingResponse:
+    """
+    Streaming variant of preview (NDJSON).
 
-    # Step 1: Build company query using ProspectsQueryBuilder
-    company_query = query_builder.build_company_query()
+    Emits one {"record": ...} line per person, then a trailing
+    {"summary": ...} line with the ProspectPreviewResponse fields
+    (without preview_data).
+    """
+    return _stream_prospects(request, generate=False)
 
-    # Step 2: Search companies
-    company_response = client.company_search(
-        sql_query=company_query,
-        size=request.size,
-        scroll_token=request.scroll_token,
-    )
 
-    if company_response.get("status") != 200:
-        return ProspectPreviewResponse(
-            success=False,
-            mode="sic_based",
-            companies_found=0,
-            persons_found=0,
-            message=f"Company search failed: {company_response.get('error', {}).get('message', 'Unknown error')}",
+@router.post("/generate/stream")
+async def generate_prospects_stream(
+    request: ProspectSearchRequest,
+) -> StreamingResponse:
+    """
+    Streaming variant of generate (NDJSON).
+
+    Emits one {"record": ...} line per enriched person, then a trailing
+    {"summary": ...} line with the ProspectGenerateResponse fields.
+    """
+    return _stream_prospects(request, generate=True)
+
+
+def _stream_prospects(
+    request: ProspectSearchRequest, generate: bool
+) -> StreamingResponse:
+    """Run the preview or generate flow and stream its records as NDJSON."""
+    try:
+        client = get_async_pdl_client()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    mode = "sic_based" if request.icp.is_sic_based else "direct"
+
+    async def lines() -> AsyncIterator[bytes]:
+        if generate:
+            flow = _generate_sic_based if mode == "sic_based" else _generate_direct
+        else:
+            flow = _preview_sic_based if mode == "sic_based" else _preview_direct
+
+        # The flow runs as a task reporting each page (a SIC pipeline page,
+        # a search page or an enrichment batch) as soon as it is final, so
+        # records are sent while later pages are still being fetched
+        pages: asyncio.Queue[list[dict] | None] = asyncio.Queue()
+
+        async def on_page(persons: list[dict], scroll_token: str | None) -> None:
+            await pages.put(persons)
+
+        async def run_flow() -> ProspectPreviewResponse:
+            try:
+                return await flow(client, request, on_page=on_page)
+            finally:
+                pages.put_nowait(None)
+
+        flow_task = asyncio.ensure_future(run_flow())
+        try:
+            while (persons := await pages.get()) is not None:
+                for person in persons:
+                    yield record_line(person)
+            result = await flow_task
+        finally:
+            flow_task.cancel()
+
+        if not generate:
+            yield summary_line(result.model_dump(exclude={"preview_data"}))
+            return
+
+        export_path = await _export_prospects_to_json(result.preview_data, request)
+        run_id = await _store_prospects(result.preview_data, request)
+        yield summary_line(
+            _generate_response(result, export_path, run_id).model_dump()
         )
 
-    companies = company_response.get("data", [])
-    company_ids = [c.get("id") for c in companies if c.get("id")]
+    def on_error(e: Exception) -> dict[str, Any]:
+        action = "Generate" if generate else "Preview"
+        if isinstance(e, PDLUnavailableError):
+            message = str(e)
+        else:
+            message = f"{action} failed: {str(e)}"
+        return {"success": False, "mode": mode, "message": message}
 
-    if not company_ids:
-        return ProspectPreviewResponse(
-            success=True,
-            mode="sic_based",
-            companies_found=0,
-            persons_found=0,
-            message="No companies found matching criteria",
+    return ndjson_response(lines(), on_error)
+
+
+@router.post("/jobs", response_model=ProspectJobResponse, status_code=202)
+async def submit_generate_job(request: ProspectJobRequest) -> ProspectJobResponse:
+    """
+    Submit prospect generation as a background job.
+
+    Returns immediately with a job ID. Poll GET /jobs/{job_id} for status
+    and progress, then fetch GET /jobs/{job_id}/result once it succeeds.
+    The job checkpoints after every page; an interrupted job can be
+    continued with POST /jobs/{job_id}/resume.
+    """
+    try:
+        job = get_job_manager().submit(
+            "prospects_generate", lambda job: _run_generate_job(job, request)
         )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return ProspectJobResponse(**job.to_dict())
 
-    # Step 3: Search persons with job_company_id filter
-    person_query = query_builder.build_person_query_with_company_ids(company_ids)
 
-    person_response = client.person_search(
-        sql_query=person_query,
-        size=request.size,
+@router.post(
+    "/jobs/{job_id}/resume", response_model=ProspectJobResponse, status_code=202
+)
+async def resume_generate_job(job_id: str) -> ProspectJobResponse:
+    """
+    Resume an interrupted generate job from its last checkpoint.
+
+    Works across restarts: the job's request, scroll tokens, enriched IDs
+    and partial export are recovered from its write-ahead log.
+    """
+    manager = get_job_manager()
+    existing = manager.get(job_id)
+    if existing is not None and not existing.finished:
+        raise HTTPException(status_code=409, detail=f"Job is {existing.status}")
+
+    try:
+        checkpoint = await asyncio.to_thread(_open_leased_checkpoint, job_id)
+    except CheckpointLeaseHeldError as e:
+        # Still running on another worker
+        raise HTTPException(status_code=409, detail=str(e))
+    if not checkpoint.exists:
+        raise HTTPException(status_code=404, detail=f"No checkpoint for job {job_id}")
+
+    request = ProspectJobRequest(**checkpoint.request)
+    try:
+        job = manager.submit(
+            "prospects_generate",
+            lambda job: _run_generate_job(job, request),
+            job_id=job_id,
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return ProspectJobResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}", response_model=ProspectJobResponse)
+async def get_generate_job(job_id: str) -> ProspectJobResponse:
+    """Get the status and progress of a background generate job."""
+    return ProspectJobResponse(**(await _get_job(job_id)).to_dict())
+
+
+@router.get("/jobs/{job_id}/result", response_model=ProspectGenerateResponse)
+async def get_generate_job_result(job_id: str) -> ProspectGenerateResponse:
+    """Get the result of a finished background generate job."""
+    job = await _get_job(job_id)
+    if job.status != "succeeded":
+        detail = f"Job is {job.status}"
+        if job.error:
+            detail += f": {job.error}"
+        raise HTTPException(status_code=409, detail=detail)
+    return job.result
+
+
+@router.delete("/jobs/{job_id}", response_model=ProspectJobResponse)
+async def cancel_generate_job(job_id: str) -> ProspectJobResponse:
+    """Cancel a queued or running background generate job."""
+    job = await _get_job(job_id)
+    manager = get_job_manager()
+    if manager.get(job_id) is None:
+        # Known only from its checkpoint: not running in this worker
+        if job.status == "running":
+            raise HTTPException(
+                status_code=409, detail="Job is running on another worker"
+            )
+        return ProspectJobResponse(**job.to_dict())
+    return ProspectJobResponse(**manager.cancel(job_id).to_dict())
+
+
+async def _get_job(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        job = await asyncio.to_thread(_checkpoint_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def _checkpoint_job(job_id: str) -> Job | None:
+    """
+    Job status recovered from its checkpoint on disk.
+
+    Answers polls for jobs this worker does not know: ones accepted by
+    another worker process or lost to a restart. A finished checkpoint
+    has succeeded, a leased one is running elsewhere, and any other was
+    interrupted and can be resumed.
+
+    Returns:
+        The job, or None if there is no checkpoint for job_id.
+    """
+    directory = _runs_directory()
+    checkpoint = RunCheckpoint(directory, job_id, readonly=True)
+    if not checkpoint.exists:
+        return None
+
+    job = Job(
+        id=job_id,
+        kind="prospects_generate",
+        progress={
+            "pages_done": checkpoint.state.get("pages", 0),
+            "persons_found": checkpoint.records,
+        },
+        created_at=checkpoint.created_at or os.path.getmtime(checkpoint.wal_path),
     )
+    if checkpoint.finished:
+        job.status, job.stage = "succeeded", "done"
+        job.result = ProspectGenerateResponse(**checkpoint.result)
+        job.finished_at = checkpoint.finished_at
+    elif CheckpointLease(directory, job_id).held_elsewhere():
+        job.status, job.stage = "running", "running_on_another_worker"
+    else:
+        job.status = "failed"
+        job.error = (
+            "Job was interrupted; resume it with "
+            f"POST /api/v1/prospects/jobs/{job_id}/resume"
+        )
+    return job
 
-    if person_response.get("status") != 200:
-        return ProspectPreviewResponse(
-            success=False,
-            mode="sic_based",
-            companies_found=len(companies),
-            persons_found=0,
-            message=f"Person search failed: {person_response.get('error', {}).get('message', 'Unknown error')}",
+
+def _open_leased_checkpoint(job_id: str) -> RunCheckpoint:
+    """
+    Open a job's checkpoint for writing under its lease.
+
+    Opening replays the WAL and truncates uncommitted data, which must
+    never happen while another worker is running the job.
+
+    Raises:
+        CheckpointLeaseHeldError: If the job is running elsewhere.
+    """
+    with CheckpointLease(_runs_directory(), job_id):
+        return RunCheckpoint(_runs_directory(), job_id)
+
+
+def _runs_directory() -> str:
+    """Directory holding generate job checkpoints."""
+    return os.path.join(state_directory(), "runs")
+
+
+async def _run_generate_job(
+    job: Job, request: ProspectJobRequest
+) -> ProspectGenerateResponse:
+    """
+    Run generate as a checkpointed job of up to max_pages pages.
+
+    The job runs the same pipelined flows as generate (see _run_job_flow)
+    and commits every enriched page to its checkpoint together with the
+    scroll token resuming after it, so a resumed job continues after the
+    last committed page without re-fetching or re-enriching it. Errors
+    propagate so the job is marked failed with its checkpoint intact.
+
+    The run holds the checkpoint's lease throughout, so a resume submitted
+    to another worker cannot replay or append to it concurrently; the job
+    fails with CheckpointLeaseHeldError if the lease is held elsewhere.
+    """
+    lease = CheckpointLease(_runs_directory(), job.id)
+    await _acquire_lease(lease)
+    try:
+        return await _run_leased_generate_job(job, request)
+    finally:
+        lease.release()
+
+
+# Lease attempts 50ms apart: status polls hold the lease only for a moment
+_LEASE_ATTEMPTS = 20
+
+
+async def _acquire_lease(lease: CheckpointLease) -> None:
+    """Take a job's lease, riding out a concurrent status probe."""
+    for attempt in range(_LEASE_ATTEMPTS):
+        try:
+            lease.acquire()
+            return
+        except CheckpointLeaseHeldError:
+            if attempt == _LEASE_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def _run_leased_generate_job(
+    job: Job, request: ProspectJobRequest
+) -> ProspectGenerateResponse:
+    """Body of _run_generate_job, run while holding the checkpoint lease."""
+    checkpoint = await asyncio.to_thread(RunCheckpoint, _runs_directory(), job.id)
+    if checkpoint.finished:
+        return ProspectGenerateResponse(**checkpoint.result)
+    await asyncio.to_thread(checkpoint.begin, request.model_dump(mode="json"))
+
+    client = get_async_pdl_client()
+    mode = "sic_based" if request.icp.is_sic_based else "direct"
+    state = checkpoint.state
+    job.report(
+        "resuming" if state else "searching_and_enriching",
+        mode=mode,
+        pages_done=state.get("pages", 0),
+        persons_found=checkpoint.records,
+    )
+
+    if not state.get("searched"):
+        scroll_token = await _run_job_flow(client, request, checkpoint, job)
+        await asyncio.to_thread(
+            checkpoint.commit, [], scroll_token=scroll_token, searched=True
         )
 
-    persons = person_response.get("data", [])
+    companies_found = state.get("companies_found", 0)
+    job.report("exporting", companies_found=companies_found)
+    # Streamed from the partial export, never held in memory
+    export_path = await _export_prospects_to_json(checkpoint.iter_records(), request)
+    # The job ID doubles as the store run ID, so a resumed job adds to it
+    run_id = await _store_prospects(checkpoint.iter_records(), request, job.id)
 
-    return ProspectPreviewResponse(
+    response = ProspectGenerateResponse(
         success=True,
-        mode="sic_based",
-        companies_found=len(companies),
-        persons_found=len(persons),
-        preview_data=persons,
-        scroll_token=person_response.get("scroll_token"),
+        mode=mode,
+        companies_found=companies_found,
+        persons_generated=checkpoint.records,
+        export_path=export_path,
+        scroll_token=state["scroll_token"],
+        run_id=run_id,
+    )
+    await asyncio.to_thread(checkpoint.finish, response.model_dump())
+    job.report("done")
+    return response
+
+
+async def _run_job_flow(
+    client: Any, request: ProspectJobRequest, checkpoint: RunCheckpoint, job: Job
+) -> str | None:
+    """
+    Run a job's generate flow from its checkpointed position.
+
+    The job targets size * max_pages persons and runs _run_sic_based or
+    _fill_direct in fill mode with max_pages as the budget of person search
+    calls (company searches are bounded by the target only); a resumed job
+    subtracts the persons and pages it already committed. Each enriched
+    page is committed with the scroll token resuming after it.
+
+    Returns:
+        The scroll token to continue after the job.
+
+    Raises:
+        RuntimeError: If a search fails; pages collected before the
+            failure are committed, so a resume continues after them.
+    """
+    state = checkpoint.state
+    scroll_token = state.get("scroll_token", request.scroll_token)
+    target = request.size * request.max_pages - checkpoint.records
+    budget = SearchBudget(max_calls=request.max_pages - state.get("pages", 0))
+    if ("scroll_token" in state and scroll_token is None) or (
+        target <= 0 or budget.exhausted
+    ):
+        return scroll_token
+
+    async def commit_page(persons: list[dict], page_scroll_token: str | None) -> None:
+        # Skip persons a previous attempt of the job already committed
+        new_persons: list[dict] = []
+        new_ids: list[str] = []
+        for person in persons:
+            pdl_id = person.get("id")
+            if pdl_id in checkpoint.enriched_ids or pdl_id in new_ids:
+                continue
+            new_persons.append(person)
+            if pdl_id:
+                new_ids.append(pdl_id)
+
+        await asyncio.to_thread(
+            checkpoint.commit,
+            new_persons,
+            enriched_ids=new_ids,
+            scroll_token=page_scroll_token,
+            pages=state.get("pages", 0) + 1,
+        )
+        job.report(
+            "searching_and_enriching",
+            pages_done=state["pages"],
+            persons_found=checkpoint.records,
+        )
+
+    flow_request = request.model_copy(update={"scroll_token": scroll_token})
+    if request.icp.is_sic_based:
+        result = await _run_sic_based(
+            client,
+            flow_request,
+            enrich=True,
+            on_page=commit_page,
+            target=target,
+            budget=budget,
+            company_budget=SearchBudget(),
+            strict=True,
+        )
+    else:
+        result = await _fill_direct(
+            client,
+            flow_request,
+            enrich=True,
+            on_page=commit_page,
+            target=target,
+            budget=budget,
+            strict=True,
+        )
+    await asyncio.to_thread(
+        checkpoint.commit,
+        [],
+        companies_found=state.get("companies_found", 0) + result.companies_found,
     )
+    if not result.success:
+        raise RuntimeError(result.message)
+    return result.scroll_token
+
+
+def _generate_response(
+    result: ProspectPreviewResponse, export_path: str, run_id: str | None = None
+) -> ProspectGenerateResponse:
+    """Build the generate response from an enriched flow result."""
+    return ProspectGenerateResponse(
+        success=result.success,
+        mode=result.mode,
+        companies_found=result.companies_found,
+        persons_generated=result.persons_found,
+        export_path=export_path,
+        scroll_token=result.scroll_token,
+        run_id=run_id,
+        message=result.message,
+    )
+
+
+async def _preview_sic_based(
+    client: Any, request: ProspectSearchRequest, on_page: PageFunc | None = None
+) -> ProspectPreviewResponse:
+    """Handle SIC-based flow: Company Search → Person Search."""
+    return await _run_sic_based(client, request, enrich=False, on_page=on_page)
 
 
 async def _generate_sic_based(
-    client: Any, request: ProspectSearchRequest
+    client: Any, request: ProspectSearchRequest, on_page: PageFunc | None = None
 ) -> ProspectPreviewResponse:
     """Handle SIC-based flow for Generate: Company Search → Person Search → Enrichment."""
-    query_builder = ProspectsQueryBuilder(request.icp)
+    result = await _run_sic_based(client, request, enrich=True, on_page=on_page)
 
-    # Step 1: Build company query using ProspectsQueryBuilder
-    company_query = query_builder.build_company_query()
+    if result.success and result.companies_found and not result.preview_data:
+        return result.model_copy(
+            update={"message": "No persons found matching criteria"}
+        )
+    return result
 
-    # Step 2: Search companies
-    company_response = client.company_search(
-        sql_query=company_query,
-        size=request.size,
-        scroll_token=request.scroll_token,
+
+async def _run_sic_based(
+    client: Any,
+    request: ProspectSearchRequest,
+    enrich: bool,
+    on_page: PageFunc | None = None,
+    target: int | None = None,
+    budget: SearchBudget | None = None,
+    company_budget: SearchBudget | None = None,
+    strict: bool = False,
+) -> ProspectPreviewResponse:
+    """
+    Run the SIC-based flow through the pipelined engine.
+
+    Company pages are split into ID shards whose person searches start as
+    soon as each page arrives; with enrich, each person page is bulk
+    enriched as soon as it lands (see src/utils/sic_pipeline.py).
+
+    With fill_to_target, company pages are followed until request.size
+    persons qualify (generate drops persons whose enrichment fails) or the
+    search budget is spent.
+
+    request.scroll_token and the returned scroll_token are SIC cursors
+    holding the company scroll position, the pending company ID shards and
+    their person scroll positions, so the next page resumes both stages.
+
+    on_page (used by the streaming endpoints and jobs) receives each
+    collected page as soon as the pipeline has collected it, with the
+    cursor resuming right after it.
+
+    Generate jobs pass their own target (instead of request.size) and
+    search budgets, which also select fill mode, and strict: any search
+    error then fails the result (success=False, keeping the persons and
+    cursor collected before it) instead of returning a partial success.
+    """
+    fields = person_fields(request.field_profile)
+    cursor = SICCursor.decode(request.scroll_token)
+    if budget is None and request.fill_to_target:
+        budget = _search_budget(request)
+    fill = budget is not None
+
+    async def report(persons: list[dict], position: SICCursor) -> None:
+        await on_page(persons, position.encode())
+
+    async def enrich_page(persons: list[dict]) -> list[dict]:
+        return await _enrich_persons(
+            client,
+            persons,
+            fields=fields,
+            cache_mode=request.cache_mode,
+            keep_unenriched=not fill,
+        )
+
+    pipeline = SICPipeline(
+        client,
+        ProspectsQueryBuilder(request.icp),
+        target=request.size if target is None else target,
+        # Top-up pages companies until the target is reached (or budget spent)
+        company_limit=None if fill else request.size,
+        cursor=cursor,
+        fields=fields,
+        cache_mode=request.cache_mode,
+        enrich=enrich_page if enrich else None,
+        on_page=report if on_page is not None else None,
+        budget=budget,
+        company_budget=company_budget,
     )
+    result = await pipeline.run()
 
-    if company_response.get("status") != 200:
+    if strict and (result.company_error or result.person_error):
         return ProspectPreviewResponse(
             success=False,
             mode="sic_based",
-            companies_found=0,
-            persons_found=0,
-            message=f"Company search failed: {company_response.get('error', {}).get('message', 'Unknown error')}",
+            companies_found=result.companies_found,
+            persons_found=len(result.persons),
+            preview_data=result.persons,
+            scroll_token=result.cursor.encode(),
+            message=(
+                f"Company search failed: {result.company_error}"
+                if result.company_error
+                else f"Person search failed: {result.person_error}"
+            ),
         )
 
-    companies = company_response.get("data", [])
-    company_ids = [c.get("id") for c in companies if c.get("id")]
-
-    if not company_ids:
+    if result.company_error and not result.companies_found:
         return ProspectPreviewResponse(
-            success=True,
+            success=False,
             mode="sic_based",
             companies_found=0,
             persons_found=0,
-            message="No companies found matching criteria",
+            message=f"Company search failed: {result.company_error}",
         )
 
-    # Step 3: Search persons with job_company_id filter
-    person_query = query_builder.build_person_query_with_company_ids(company_ids)
-
-    person_response = client.person_search(
-        sql_query=person_query,
-        size=request.size,
-    )
-
-    if person_response.get("status") != 200:
+    if not result.companies_found and not cursor.shards:
         return ProspectPreviewResponse(
-            success=False,
+            success=True,
             mode="sic_based",
-            companies_found=len(companies),
+            companies_found=0,
             persons_found=0,
-            message=f"Person search failed: {person_response.get('error', {}).get('message', 'Unknown error')}",
+            message="No companies found matching criteria",
         )
 
-    persons = person_response.get("data", [])
-
-    if not persons:
+    if result.person_error and not result.persons:
         return ProspectPreviewResponse(
-            success=True,
+            success=False,
             mode="sic_based",
-            companies_found=len(companies),
+            companies_found=result.companies_found,
             persons_found=0,
-            message="No persons found matching criteria",
+            message=f"Person search failed: {result.person_error}",
         )
 
-    # Step 4: Person Enrichment - enrich each person using their PDL ID
-    enriched_persons: list[dict] = []
-    for person in persons:
-        pdl_id = person.get("id")
-        if pdl_id:
-            try:
-                enrich_response = client.person_enrichment(pdl_id=pdl_id)
-                if enrich_response.get("status") == 200:
-                    enriched_persons.append(enrich_response.get("data", person))
-                else:
-                    # Use search data if enrichment fails
-                    enriched_persons.append(person)
-            except Exception:
-                enriched_persons.append(person)
-        else:
-            enriched_persons.append(person)
-
     return ProspectPreviewResponse(
         success=True,
         mode="sic_based",
-        companies_found=len(companies),
-        persons_found=len(enriched_persons),
-        preview_data=enriched_persons,
-        scroll_token=person_response.get("scroll_token"),
+        companies_found=result.companies_found,
+        persons_found=len(result.persons),
+        preview_data=result.persons,
+        scroll_token=result.cursor.encode(),
+        message=_top_up_message(request, len(result.persons), result.budget_exhausted),
     )
 
 
 async def _preview_direct(
-    client: Any, request: ProspectSearchRequest
+    client: Any, request: ProspectSearchRequest, on_page: PageFunc | None = None
 ) -> ProspectPreviewResponse:
     """Handle Direct flow for Preview: Person Search only (NO enrichment)."""
+    if request.fill_to_target:
+        return await _fill_direct(client, request, enrich=False, on_page=on_page)
+
     query_builder = ProspectsQueryBuilder(request.icp)
 
     # Person Search - maps common fields to job_company_* prefix
     person_query = query_builder.build_person_query()
 
-    person_response = client.person_search(
+    person_response = await client.person_search(
         sql_query=person_query,
         size=request.size,
         scroll_token=request.scroll_token,
+        fields=person_fields(request.field_profile),
+        cache_mode=request.cache_mode,
     )
 
     if person_response.get("status") != 200:
@@ -293,6 +745,9 @@ async def _preview_direct(
             message="No persons found matching criteria",
         )
 
+    if on_page is not None:
+        await on_page(persons, person_response.get("scroll_token"))
+
     # Preview: Return search results directly (NO enrichment)
     return ProspectPreviewResponse(
         success=True,
@@ -305,32 +760,139 @@ async def _preview_direct(
 
 
 async def _generate_direct(
-    client: Any, request: ProspectSearchRequest
+    client: Any, request: ProspectSearchRequest, on_page: PageFunc | None = None
 ) -> ProspectPreviewResponse:
     """Handle Direct flow for Generate: Person Search → Person Enrichment."""
-    query_builder = ProspectsQueryBuilder(request.icp)
+    if request.fill_to_target:
+        return await _fill_direct(client, request, enrich=True, on_page=on_page)
 
-    # Step 1: Person Search - maps common fields to job_company_* prefix
-    person_query = query_builder.build_person_query()
+    # Step 1: Person Search (same as preview)
+    result = await _preview_direct(client, request)
 
-    person_response = client.person_search(
-        sql_query=person_query,
-        size=request.size,
-        scroll_token=request.scroll_token,
-    )
+    if not result.success or not result.preview_data:
+        return result
 
-    if person_response.get("status") != 200:
+    # Step 2: Person Enrichment - bulk enrich persons by PDL ID
+    return await _with_enrichment(client, request, result, on_page)
+
+
+async def _fill_direct(
+    client: Any,
+    request: ProspectSearchRequest,
+    enrich: bool,
+    on_page: PageFunc | None = None,
+    target: int | None = None,
+    budget: SearchBudget | None = None,
+    strict: bool = False,
+) -> ProspectPreviewResponse:
+    """
+    Direct flow in fill-to-target mode.
+
+    Follows person search pages until request.size (or target) persons
+    qualify, the results run out or the search budget is spent. With
+    enrich, only persons whose enrichment succeeds qualify; each page's
+    enrichment runs while the next pages are searched, up to
+    settings.top_up_window pages in flight, and every search asks only for
+    the persons not yet covered by qualified or in-flight ones. on_page
+    receives each page of qualified persons as soon as it qualifies, with
+    the scroll token resuming right after that page.
+
+    Generate jobs pass their own target and budget, and strict: a search
+    error then fails the result (success=False, keeping the persons that
+    qualified before it) instead of returning a partial success.
+    """
+    person_query = ProspectsQueryBuilder(request.icp).build_person_query()
+    fields = person_fields(request.field_profile)
+    target = request.size if target is None else target
+    budget = budget or _search_budget(request)
+    scroll_token = request.scroll_token
+    exhausted = False
+    search_error: str | None = None
+    seen: set[str] = set()
+    qualified: list[dict] = []
+    in_flight: deque[tuple[asyncio.Task, int, str | None]] = deque()
+
+    async def qualify(persons: list[dict], position: str | None) -> None:
+        page = persons[: target - len(qualified)]
+        qualified.extend(page)
+        if on_page is not None and page:
+            await on_page(page, position)
+
+    try:
+        while True:
+            needed = target - len(qualified) - sum(n for _, n, _ in in_flight)
+            if (
+                needed > 0
+                and not exhausted
+                and search_error is None
+                and not budget.exhausted
+                and len(in_flight) < settings.top_up_window
+            ):
+                size = budget.acquire(min(PDL_SEARCH_PAGE_LIMIT, needed))
+                person_response = await client.person_search(
+                    sql_query=person_query,
+                    size=size,
+                    scroll_token=scroll_token,
+                    fields=fields,
+                    cache_mode=request.cache_mode,
+                )
+                data = person_response.get("data", [])
+                budget.settle(size, len(data))
+
+                if person_response.get("status") != 200:
+                    search_error = person_response.get("error", {}).get(
+                        "message", "Unknown error"
+                    )
+                    if not qualified and not in_flight:
+                        return ProspectPreviewResponse(
+                            success=False,
+                            mode="direct",
+                            companies_found=0,
+                            persons_found=0,
+                            message=f"Person search failed: {search_error}",
+                        )
+                    # Keep what qualified; the scroll token retries the page
+                    continue
+
+                scroll_token = person_response.get("scroll_token")
+                exhausted = not data or not scroll_token
+                persons = [p for p in data if p.get("id") not in seen]
+                seen.update(p["id"] for p in persons if p.get("id"))
+                if not enrich:
+                    await qualify(persons, scroll_token)
+                elif persons:
+                    enrichment = asyncio.ensure_future(
+                        _enrich_persons(
+                            client,
+                            persons,
+                            fields=fields,
+                            cache_mode=request.cache_mode,
+                            keep_unenriched=False,
+                        )
+                    )
+                    in_flight.append((enrichment, len(persons), scroll_token))
+                continue
+
+            if not in_flight:
+                break
+            enrichment, _, position = in_flight.popleft()
+            await qualify(await enrichment, position)
+    finally:
+        for enrichment, _, _ in in_flight:
+            enrichment.cancel()
+
+    if strict and search_error is not None:
         return ProspectPreviewResponse(
             success=False,
             mode="direct",
             companies_found=0,
-            persons_found=0,
-            message=f"Person search failed: {person_response.get('error', {}).get('message', 'Unknown error')}",
+            persons_found=len(qualified),
+            preview_data=qualified,
+            scroll_token=scroll_token,
+            message=f"Person search failed: {search_error}",
         )
 
-    persons = person_response.get("data", [])
-
-    if not persons:
+    if not qualified:
         return ProspectPreviewResponse(
             success=True,
             mode="direct",
@@ -339,60 +901,156 @@ async def _generate_direct(
             message="No persons found matching criteria",
         )
 
-    # Step 2: Person Enrichment - enrich each person using their PDL ID
-    enriched_persons: list[dict] = []
-    for person in persons:
-        pdl_id = person.get("id")
-        if pdl_id:
-            try:
-                enrich_response = client.person_enrichment(pdl_id=pdl_id)
-                if enrich_response.get("status") == 200:
-                    enriched_persons.append(enrich_response.get("data", person))
-                else:
-                    # Use search data if enrichment fails
-                    enriched_persons.append(person)
-            except Exception:
-                enriched_persons.append(person)
-        else:
-            enriched_persons.append(person)
-
     return ProspectPreviewResponse(
         success=True,
         mode="direct",
         companies_found=0,
-        persons_found=len(enriched_persons),
-        preview_data=enriched_persons,
-        scroll_token=person_response.get("scroll_token"),
+        persons_found=len(qualified),
+        preview_data=qualified,
+        scroll_token=None if exhausted else scroll_token,
+        message=_top_up_message(request, len(qualified), budget.exhausted),
     )
 
 
-def _export_prospects_to_json(prospects: list[dict]) -> str:
+def _search_budget(request: ProspectSearchRequest) -> SearchBudget:
+    """Search budget of a fill_to_target request."""
+    return SearchBudget(
+        max_calls=request.max_search_calls or settings.top_up_max_search_calls,
+        max_credits=settings.top_up_max_search_credits,
+    )
+
+
+def _top_up_message(
+    request: ProspectSearchRequest, found: int, budget_exhausted: bool
+) -> str | None:
+    """Explain a fill_to_target result that fell short of request.size."""
+    if not request.fill_to_target or found >= request.size:
+        return None
+    message = f"Found {found} of {request.size} requested prospects"
+    if budget_exhausted:
+        message += " before the search budget was exhausted"
+    return message
+
+
+async def _with_enrichment(
+    client: Any,
+    request: ProspectSearchRequest,
+    result: ProspectPreviewResponse,
+    on_page: PageFunc | None = None,
+) -> ProspectPreviewResponse:
+    """Replace a search result's person records with their enriched records."""
+    enriched_persons = await _enrich_persons(
+        client,
+        result.preview_data,
+        fields=person_fields(request.field_profile),
+        cache_mode=request.cache_mode,
+    )
+    if on_page is not None and enriched_persons:
+        await on_page(enriched_persons, result.scroll_token)
+    return result.model_copy(
+        update={
+            "persons_found": len(enriched_persons),
+            "preview_data": enriched_persons,
+        }
+    )
+
+
+async def _enrich_persons(
+    client: Any,
+    persons: list[dict],
+    fields: list[str] | None = None,
+    cache_mode: CacheMode = "use",
+    keep_unenriched: bool = True,
+) -> list[dict]:
     """
-    Export prospects to a JSON file with timestamp.
+    Enrich search records through PDL bulk enrichment.
+
+    The client splits IDs into PDL_BULK_LIMIT-sized chunks and runs them
+    concurrently; results come back in request order and are matched to
+    the search records by PDL ID. Output order matches input order, and any
+    record whose enrichment fails (or has no ID) falls back to its search data.
 
     Args:
-        prospects: List of prospect data to export.
+        client: Async PDL client.
+        persons: Person records from person search.
+        fields: Optional field projection for the enriched records.
+        cache_mode: Enrichment cache behavior for this request.
+        keep_unenriched: Fall back to search data for records that could
+            not be enriched; if False, such records are dropped.
 
     Returns:
-        Path to the exported JSON file.
+        Enriched person records, one per input record (unless dropped).
     """
-    # Create exports directory if it doesn't exist
-    exports_dir = os.path.join(os.path.dirname(__file__), "..", "..", "exports")
-    os.makedirs(exports_dir, exist_ok=True)
-
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"prospects_{timestamp}.json"
-    filepath = os.path.join(exports_dir, filename)
-
-    # Export data
-    export_data = {
-        "generated_at": datetime.now().isoformat(),
-        "total_prospects": len(prospects),
-        "prospects": prospects,
+    pdl_ids = list(dict.fromkeys(p.get("id") for p in persons if p.get("id")))
+    if not pdl_ids:
+        return persons if keep_unenriched else []
+
+    bulk_response = await client.person_bulk_enrichment(
+        pdl_ids=pdl_ids, fields=fields, cache_mode=cache_mode
+    )
+
+    enriched_by_id: dict[str, dict] = {
+        pdl_id: item["data"]
+        for pdl_id, item in zip(pdl_ids, bulk_response)
+        if item.get("status") == 200 and item.get("data")
     }
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
+    if not keep_unenriched:
+        return [
+            enriched_by_id[person["id"]]
+            for person in persons
+            if person.get("id") in enriched_by_id
+        ]
+
+    # Use search data if enrichment fails
+    return [enriched_by_id.get(person.get("id"), person) for person in persons]
+
+
+async def _export_prospects_to_json(
+    prospects: Iterable[dict], request: ProspectSearchRequest
+) -> str:
+    """
+    Export prospects to a timestamped export.
+
+    Records are streamed to disk in a worker thread (see
+    src/utils/export_writer.py), so a lazy iterable is never materialized.
+
+    Args:
+        prospects: Prospect records to export.
+        request: Generate request (export format and csv columns).
+
+    Returns:
+        Path to the exported JSON or CSV file, or to the manifest of a
+        sharded or columnar export.
+    """
+    return await export_records(
+        "prospects",
+        "prospects",
+        prospects,
+        request.export_format,
+        csv_columns("prospects", request.csv_profile, request.csv_columns),
+    )
+
+
+async def _store_prospects(
+    prospects: Iterable[dict],
+    request: ProspectSearchRequest,
+    run_id: str | None = None,
+) -> str | None:
+    """
+    Upsert generated prospects into the local prospect store.
+
+    Args:
+        prospects: Prospect records to store.
+        request: Generate request (its ICP is recorded with the run).
+        run_id: Run to store under (a new run if omitted).
 
-    return filepath
+    Returns:
+        The store run ID, or None if the store is disabled.
+    """
+    return await store_persons(
+        prospects,
+        "prospects_generate",
+        request.icp.model_dump(mode="json", exclude_none=True),
+        run_id,
+    )
@@ -0,0 +1,89 @@
+"""
+Prospect store API endpoints for PDL-POC.
+
+Queries persons and companies previously fetched by the generate and
+enrich endpoints from the local prospect store (see
+src/utils/prospect_store.py). These endpoints never call PDL and cost no
+credits.
+
+Results are ordered by PDL ID and paged with an opaque cursor: pass the
+returned next_cursor as cursor to fetch the next page.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src.schema.store import StoreRecordsResponse, StoreRun, StoreRunsResponse
+from src.utils.prospect_store import ProspectStore, get_prospect_store
+
+router = APIRouter(prefix="/api/v1/store", tags=["store"])
+
+MAX_STORE_PAGE_SIZE = 1000
+
+
+@router.get("/prospects", response_model=StoreRecordsResponse)
+async def query_prospects(
+    pdl_id: list[str] | None = Query(None, description="PDL person IDs"),
+    job_company_id: list[str] | None = Query(
+        None, description="PDL company IDs of the persons' current job"
+    ),
+    work_email_domain: str | None = Query(None, description="Work email domain"),
+    run_id: str | None = Query(None, description="Run that fetched the persons"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_STORE_PAGE_SIZE),
+) -> StoreRecordsResponse:
+    """
+    Query stored persons (prospects and enriched persons).
+
+    Filters are combined with AND; omitted filters match every stored
+    person.
+    """
+    records, next_cursor = await asyncio.to_thread(
+        _store().query_persons,
+        pdl_ids=pdl_id,
+        job_company_ids=job_company_id,
+        work_email_domain=work_email_domain,
+        run_id=run_id,
+        after=cursor,
+        limit=limit,
+    )
+    return StoreRecordsResponse(
+        count=len(records), records=records, next_cursor=next_cursor
+    )
+
+
+@router.get("/companies", response_model=StoreRecordsResponse)
+async def query_companies(
+    pdl_id: list[str] | None = Query(None, description="PDL company IDs"),
+    run_id: str | None = Query(None, description="Run that fetched the companies"),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_STORE_PAGE_SIZE),
+) -> StoreRecordsResponse:
+    """Query stored (enriched) companies."""
+    records, next_cursor = await asyncio.to_thread(
+        _store().query_companies,
+        pdl_ids=pdl_id,
+        run_id=run_id,
+        after=cursor,
+        limit=limit,
+    )
+    return StoreRecordsResponse(
+        count=len(records), records=records, next_cursor=next_cursor
+    )
+
+
+@router.get("/runs", response_model=StoreRunsResponse)
+async def list_runs(
+    limit: int = Query(100, ge=1, le=MAX_STORE_PAGE_SIZE),
+) -> StoreRunsResponse:
+    """List the most recent generate and enrich runs in the store."""
+    runs = await asyncio.to_thread(_store().list_runs, limit)
+    return StoreRunsResponse(runs=[StoreRun(**run) for run in runs])
+
+
+def _store() -> ProspectStore:
+    store = get_prospect_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Prospect store is disabled")
+    return store
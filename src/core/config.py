@@ -13,6 +13,49 @@ class Settings(BaseSettings):
 
     # PDL API Configuration
     pdl_api_key: str = os.getenv("PDL_KEY", "")
+    pdl_max_connections: int = 20
+    pdl_max_keepalive_connections: int = 10
+    pdl_timeout_seconds: float = 30.0
+    pdl_enrichment_concurrency: int = 10
+
+    # PDL Client State (shared by all workers on the host)
+    pdl_state_directory: str = ".pdl_state"
+
+    # PDL Rate Limiting (per endpoint family, requests per minute)
+    pdl_rate_limit_enabled: bool = True
+    pdl_rate_limit_search_per_minute: int = 100
+    pdl_rate_limit_enrichment_per_minute: int = 100
+    pdl_rate_limit_bulk_per_minute: int = 100
+    pdl_rate_limit_burst: int = 10
+
+    # PDL Retries (per endpoint family) and Circuit Breaker
+    pdl_retry_search: int = 3
+    pdl_retry_enrichment: int = 3
+    pdl_retry_bulk: int = 2
+    pdl_retry_base_delay_seconds: float = 0.5
+    pdl_retry_max_delay_seconds: float = 20.0
+    pdl_circuit_failure_threshold: int = 5
+    pdl_circuit_reset_seconds: float = 30.0
+
+    # PDL Enrichment Cache (persistent, keyed by PDL ID)
+    pdl_enrichment_cache_enabled: bool = True
+    pdl_enrichment_cache_ttl_seconds: float = 7 * 24 * 3600
+    pdl_enrichment_cache_max_entries: int = 50_000
+
+    # PDL Search Cache (in-process LRU, optional shared on-disk tier)
+    pdl_search_cache_enabled: bool = True
+    pdl_search_cache_ttl_seconds: float = 900
+    pdl_search_cache_max_entries: int = 256
+    pdl_search_cache_disk_enabled: bool = False
+
+    # Background Jobs (in-process worker pool)
+    job_workers: int = 2
+    job_queue_limit: int = 100
+    job_retention: int = 500
+
+    # Prospect Store (local SQLite copy of fetched persons and companies)
+    prospect_store_enabled: bool = True
+    prospect_store_batch_size: int = 500
 
     # API Settings
     api_host: str = "0.0.0.0"
@@ -24,12 +67,32 @@ class Settings(BaseSettings):
     max_preview_prospects: int = 100
     min_preview_prospects: int = 10
 
+    # SIC Pipeline (company search → person search → enrichment stages)
+    sic_company_batch_size: int = 25
+    sic_person_query_max_length: int = 4000
+    sic_person_search_concurrency: int = 4
+    sic_pipeline_queue_size: int = 4
+
+    # Fill-to-target (top-up) mode: search budget and concurrency window
+    top_up_max_search_calls: int = 10
+    top_up_max_search_credits: int = 1000
+    top_up_window: int = 3
+
     # Export Settings
     export_directory: str = "exports"
+    # Shard rotation thresholds for sharded (non-"json") export formats
+    export_shard_max_records: int = 100_000
+    export_shard_max_bytes: int = 256 * 1024 * 1024
+    # Experience entries included as numbered columns in "detailed" CSVs
+    csv_top_experiences: int = 3
+    # Prefix CSV cells starting with =, +, -, @ with "'" so spreadsheets
+    # show them as text instead of running them as formulas
+    csv_escape_formulas: bool = True
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
+        extra = "ignore"
 
 
 @lru_cache()
@@ -25,6 +25,14 @@ load_dotenv()
 from src.api.companies import router as companies_router
 from src.api.persons import router as persons_router
 from src.api.prospects import router as prospects_router
+from src.api.store import router as store_router
+from src.utils.jobs import close_job_manager, get_job_manager
+from src.utils.pdl_client import (
+    close_async_pdl_client,
+    get_async_pdl_client,
+    peek_async_pdl_client,
+)
+from src.utils.prospect_store import close_prospect_store
 
 
 @asynccontextmanager
@@ -32,8 +40,18 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     print("🚀 PDL-POC API Starting...")
+    try:
+        # Open the pooled PDL client once for the lifetime of the worker
+        get_async_pdl_client()
+    except ValueError as e:
+        print(f"⚠️  PDL client not initialized: {e}")
+    # Start the background job workers on this event loop
+    get_job_manager().start()
     yield
     # Shutdown
+    await close_job_manager()
+    await close_async_pdl_client()
+    close_prospect_store()
     print("👋 PDL-POC API Shutting down...")
 
 
@@ -57,6 +75,7 @@ app.add_middleware(
 app.include_router(persons_router, prefix="/api/v1", tags=["persons"])
 app.include_router(companies_router)
 app.include_router(prospects_router)
+app.include_router(store_router)
 
 
 @app.get("/health")
@@ -65,6 +84,21 @@ async def health_check():
     return {"status": "healthy", "service": "pdl-poc"}
 
 
+@app.get("/health/pdl")
+async def pdl_health():
+    """PDL client counters: retries, short-circuits and breaker states."""
+    client = peek_async_pdl_client()
+    if client is None:
+        return {"status": "not_initialized"}
+    return {"status": "ok", **client.metrics()}
+
+
+@app.get("/health/jobs")
+async def jobs_health():
+    """Background job queue depth and job counts by status."""
+    return {"status": "ok", **get_job_manager().metrics()}
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
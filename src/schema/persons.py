@@ -10,6 +10,10 @@ from typing import Any
 from pydantic import BaseModel, Field
 
 from src.schema.icp import ICP
+from src.utils.enrichment_cache import CacheMode
+from src.utils.export_writer import ExportFormat
+from src.utils.flatten import CSVColumns, CSVProfile
+from src.utils.field_profiles import FieldProfile
 
 
 # === Search Persons Schemas ===
@@ -18,10 +22,18 @@ class SearchPersonsRequest(BaseModel):
     """Request schema for search_persons endpoint."""
 
     number_of_persons: int = Field(
-        default=10, ge=1, le=100, description="Number of persons to search (1-100)"
+        default=10, ge=1, le=1000, description="Number of persons to search (1-1000)"
     )
     icp: ICP = Field(..., description="Ideal Customer Profile criteria for search")
     scroll_token: str | None = Field(None, description="Token for fetching next page")
+    cache_mode: CacheMode = Field(
+        default="use",
+        description="Search cache: use cached pages, refresh them, or bypass the cache",
+    )
+    field_profile: FieldProfile = Field(
+        default="full",
+        description="Person fields to return: minimal, outreach, or full records",
+    )
 
 
 class SearchPersonsResponse(BaseModel):
@@ -51,6 +63,32 @@ class EnrichPersonsRequest(BaseModel):
     person_ids: list[str] | None = Field(
         None, description="Optional list of PDL IDs to enrich directly"
     )
+    cache_mode: CacheMode = Field(
+        default="use",
+        description="Result caches (search and enrichment): use, refresh, or bypass",
+    )
+    field_profile: FieldProfile = Field(
+        default="full",
+        description="Person fields to return: minimal, outreach, or full records",
+    )
+    export_format: ExportFormat = Field(
+        default="json",
+        description=(
+            "Export format: json (single document), json_compact, jsonl, "
+            "jsonl_gzip or jsonl_zstd (sharded), csv, parquet or arrow (columnar)"
+        ),
+    )
+    csv_profile: CSVProfile = Field(
+        default="crm",
+        description="Column set for csv exports: minimal, crm, or detailed",
+    )
+    csv_columns: CSVColumns | None = Field(
+        default=None,
+        description=(
+            "Custom csv columns as 'header=expression' specs "
+            "(e.g. 'email=work_email || emails[0].address'); overrides csv_profile"
+        ),
+    )
 
 
 class EnrichPersonsResponse(BaseModel):
@@ -64,5 +102,10 @@ class EnrichPersonsResponse(BaseModel):
     persons: list[dict[str, Any]] | None = Field(
         None, description="List of PDL person records"
     )
-    export_file: str | None = Field(None, description="Path to exported JSON file")
+    export_file: str | None = Field(
+        None, description="Path to the export file (the manifest for sharded formats)"
+    )
+    run_id: str | None = Field(
+        None, description="Prospect store run holding the enriched persons"
+    )
 
@@ -9,9 +9,15 @@ Uses CombinedICP for unified company/person criteria with automatic mode detecti
 Reference: docs/PROSPECTS_FLOW_DESIGN.md
 """
 
-from pydantic import BaseModel, ConfigDict, Field
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from src.schema.combined_icp import CombinedICP
+from src.utils.enrichment_cache import CacheMode
+from src.utils.export_writer import ExportFormat
+from src.utils.flatten import CSVColumns, CSVProfile
+from src.utils.field_profiles import FieldProfile
 
 
 class ProspectSearchRequest(BaseModel):
@@ -35,12 +41,54 @@ class ProspectSearchRequest(BaseModel):
     )
     scroll_token: str | None = Field(
         default=None,
-        description="Pagination token for fetching next page of results",
+        description=(
+            "Pagination token for fetching next page of results "
+            "(an opaque cursor covering both search stages in SIC-based mode)"
+        ),
     )
     icp: CombinedICP = Field(
         default_factory=CombinedICP,
         description="Combined ICP with company and person criteria",
     )
+    cache_mode: CacheMode = Field(
+        default="use",
+        description="Result caches (search and enrichment): use, refresh, or bypass",
+    )
+    field_profile: FieldProfile = Field(
+        default="full",
+        description="Person fields to return: minimal, outreach, or full records",
+    )
+    fill_to_target: bool = Field(
+        default=False,
+        description=(
+            "Keep pulling company and person pages until `size` qualifying "
+            "prospects are found or the search budget is spent"
+        ),
+    )
+    max_search_calls: int | None = Field(
+        default=None,
+        ge=1,
+        le=100,
+        description="Search call budget for fill_to_target (defaults to settings)",
+    )
+    export_format: ExportFormat = Field(
+        default="json",
+        description=(
+            "Export format for generate: json (single document), json_compact, jsonl, "
+            "jsonl_gzip or jsonl_zstd (sharded), csv, parquet or arrow (columnar)"
+        ),
+    )
+    csv_profile: CSVProfile = Field(
+        default="crm",
+        description="Column set for csv exports: minimal, crm, or detailed",
+    )
+    csv_columns: CSVColumns | None = Field(
+        default=None,
+        description=(
+            "Custom csv columns as 'header=expression' specs "
+            "(e.g. 'email=work_email || emails[0].address'); overrides csv_profile"
+        ),
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -63,6 +111,34 @@ class ProspectSearchRequest(BaseModel):
     )
 
 
+class ProspectJobRequest(ProspectSearchRequest):
+    """
+    Request schema for a background generate job.
+
+    The job aims for size * max_pages persons within a budget of max_pages
+    person search calls and checkpoints after every page, so an interrupted
+    run can be resumed. fill_to_target is rejected; max_pages bounds the
+    job instead.
+    """
+
+    max_pages: int = Field(
+        default=1,
+        ge=1,
+        le=100,
+        description="Maximum number of person search pages to generate",
+    )
+
+    @field_validator("fill_to_target")
+    @classmethod
+    def reject_fill_to_target(cls, v: bool) -> bool:
+        """Jobs page with max_pages; fill_to_target is not supported."""
+        if v:
+            raise ValueError(
+                "fill_to_target is not supported for jobs; use max_pages"
+            )
+        return v
+
+
 class ProspectPreviewResponse(BaseModel):
     """Response schema for prospect preview endpoint."""
 
@@ -99,13 +175,35 @@ class ProspectGenerateResponse(BaseModel):
     persons_generated: int = Field(..., description="Number of persons generated")
     export_path: str | None = Field(
         default=None,
-        description="Path to the exported JSON file",
+        description="Path to the export file (the manifest for sharded formats)",
     )
     scroll_token: str | None = Field(
         default=None,
         description="Pagination token for fetching next page",
     )
+    run_id: str | None = Field(
+        default=None,
+        description="Prospect store run holding the generated persons",
+    )
     message: str | None = Field(
         default=None,
         description="Optional message or error details",
     )
+
+
+class ProspectJobResponse(BaseModel):
+    """Status of a background prospect generation job."""
+
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job type")
+    status: str = Field(
+        ..., description="queued, running, succeeded, failed or cancelled"
+    )
+    stage: str | None = Field(default=None, description="Current job stage")
+    progress: dict[str, Any] = Field(
+        default_factory=dict, description="Progress counters for the job"
+    )
+    error: str | None = Field(default=None, description="Failure details")
+    created_at: float = Field(..., description="Submission time (epoch seconds)")
+    started_at: float | None = Field(default=None, description="Start time")
+    finished_at: float | None = Field(default=None, description="Finish time")
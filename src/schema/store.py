@@ -0,0 +1,42 @@
+"""
+Store Schema for the local prospect store API.
+
+Response models for querying persons and companies previously fetched by
+generate and enrich calls (see src/utils/prospect_store.py).
+"""
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class StoreRecordsResponse(BaseModel):
+    """A page of stored person or company records."""
+
+    count: int = Field(..., description="Number of records in this page")
+    records: list[dict[str, Any]] = Field(
+        default_factory=list, description="Stored PDL records, ordered by PDL ID"
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the next page (None on the last page)",
+    )
+
+
+class StoreRun(BaseModel):
+    """A generate or enrich call recorded in the store."""
+
+    run_id: str = Field(..., description="Run ID")
+    kind: str = Field(..., description="Call that produced the run")
+    icp: dict[str, Any] | None = Field(
+        default=None, description="Criteria the run searched with"
+    )
+    created_at: float = Field(..., description="Unix time the run started")
+    persons: int = Field(default=0, description="Persons stored by the run")
+    companies: int = Field(default=0, description="Companies stored by the run")
+
+
+class StoreRunsResponse(BaseModel):
+    """Most recent runs recorded in the store."""
+
+    runs: list[StoreRun] = Field(default_factory=list, description="Runs, newest first")
@@ -0,0 +1,119 @@
+"""
+Tests for the write-ahead run checkpoint.
+"""
+
+import pytest
+
+from src.utils.checkpoint import (
+    CheckpointLease,
+    CheckpointLeaseHeldError,
+    RunCheckpoint,
+)
+
+
+class TestRunCheckpoint:
+    """Test cases for RunCheckpoint."""
+
+    def test_replay_restores_state_ids_and_records(self, tmp_path):
+        """Test a reopened checkpoint recovers everything committed."""
+        checkpoint = RunCheckpoint(str(tmp_path), "run1")
+        checkpoint.begin({"size": 2})
+        checkpoint.commit(
+            [{"id": "p1"}, {"id": "p2"}],
+            enriched_ids=["p1", "p2"],
+            token="t1",
+            pages=1,
+        )
+        checkpoint.commit([{"id": "p3"}], enriched_ids=["p3"], token="t2", pages=2)
+
+        reopened = RunCheckpoint(str(tmp_path), "run1")
+
+        assert reopened.exists
+        assert reopened.request == {"size": 2}
+        assert reopened.state == {"token": "t2", "pages": 2}
+        assert reopened.enriched_ids == {"p1", "p2", "p3"}
+        assert reopened.records == 3
+        assert [r["id"] for r in reopened.iter_records()] == ["p1", "p2", "p3"]
+
+    def test_uncommitted_records_and_torn_wal_line_are_dropped(self, tmp_path):
+        """Test records without a WAL commit and a torn last line are ignored."""
+        checkpoint = RunCheckpoint(str(tmp_path), "run1")
+        checkpoint.begin({})
+        checkpoint.commit([{"id": "p1"}], enriched_ids=["p1"], token="t1")
+
+        # Crash after writing records but before the WAL line was complete
+        with open(checkpoint.export_path, "ab") as f:
+            f.write(b'{"id":"p2"}\n')
+        with open(checkpoint.wal_path, "ab") as f:
+            f.write(b'{"type":"commit","state":{"token":"t2"')
+
+        reopened = RunCheckpoint(str(tmp_path), "run1")
+
+        assert reopened.state == {"token": "t1"}
+        assert [r["id"] for r in reopened.iter_records()] == ["p1"]
+
+        reopened.commit([{"id": "p2"}], enriched_ids=["p2"], token="t2")
+        again = RunCheckpoint(str(tmp_path), "run1")
+        assert again.state == {"token": "t2"}
+        assert [r["id"] for r in again.iter_records()] == ["p1", "p2"]
+
+    def test_finish_records_result_and_drops_partial_export(self, tmp_path):
+        """Test a finished run keeps its result and removes the partial export."""
+        checkpoint = RunCheckpoint(str(tmp_path), "run1")
+        checkpoint.begin({})
+        checkpoint.commit([{"id": "p1"}], enriched_ids=["p1"])
+        checkpoint.finish({"export_path": "/exports/x.json"})
+
+        reopened = RunCheckpoint(str(tmp_path), "run1")
+
+        assert reopened.finished
+        assert reopened.result == {"export_path": "/exports/x.json"}
+        assert list(reopened.iter_records()) == []
+
+    def test_new_run_does_not_exist(self, tmp_path):
+        """Test opening an unknown run does not create a WAL."""
+        checkpoint = RunCheckpoint(str(tmp_path), "missing")
+
+        assert not checkpoint.exists
+        assert not (tmp_path / "missing.wal").exists()
+
+    def test_readonly_open_does_not_truncate(self, tmp_path):
+        """Test a read-only open skips uncommitted data without removing it."""
+        checkpoint = RunCheckpoint(str(tmp_path), "run1")
+        checkpoint.begin({})
+        checkpoint.commit([{"id": "p1"}], enriched_ids=["p1"])
+        # A record being written by the running worker, not yet committed
+        with open(checkpoint.export_path, "ab") as f:
+            f.write(b'{"id": "p2"}\n')
+
+        view = RunCheckpoint(str(tmp_path), "run1", readonly=True)
+
+        assert view.records == 1
+        assert [r["id"] for r in view.iter_records()] == ["p1"]
+        assert view.created_at is not None
+        with open(checkpoint.export_path, "rb") as f:
+            assert f.read().count(b"\n") == 2
+
+
+class TestCheckpointLease:
+    """Test cases for CheckpointLease."""
+
+    def test_lease_is_exclusive(self, tmp_path):
+        """Test a held lease cannot be taken again until released."""
+        lease = CheckpointLease(str(tmp_path), "run1")
+        other = CheckpointLease(str(tmp_path), "run1")
+
+        with lease:
+            assert other.held_elsewhere()
+            with pytest.raises(CheckpointLeaseHeldError):
+                other.acquire()
+
+        assert not other.held_elsewhere()
+        other.acquire()
+        assert other.held
+        other.release()
+
+    def test_leases_are_per_run(self, tmp_path):
+        """Test leases on different runs do not conflict."""
+        with CheckpointLease(str(tmp_path), "run1"):
+            assert not CheckpointLease(str(tmp_path), "run2").held_elsewhere()
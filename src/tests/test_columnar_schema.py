@@ -0,0 +1,166 @@
+"""
+Tests for the columnar table layout of PDL person and company records.
+"""
+
+import os
+import re
+
+import pytest
+
+from src.utils.columnar_schema import COMPANY_SCHEMA, PERSON_SCHEMA
+
+DOCS_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "..", "docs")
+
+
+def _documented_fields(file_name: str) -> dict[str, str]:
+    """Top-level field name → data type, as listed in a PDL schema doc."""
+    with open(os.path.join(DOCS_DIRECTORY, file_name), encoding="utf-8") as f:
+        text = f.read()
+    fields = re.findall(
+        r"^### `([^`]+)`\s*<table>.*?Data Type</th>\s*<td>(.*?)</td>",
+        text,
+        re.S | re.M,
+    )
+    return {
+        name: re.sub(r"<[^>]+>", "", data_type).replace("\\", "").strip()
+        for name, data_type in fields
+    }
+
+
+class TestColumnarSchema:
+    """Test cases for ColumnarSchema.to_columns."""
+
+    def test_base_columns_are_typed_and_stable(self):
+        """Test every record yields every column, coerced to its type."""
+        base, _ = PERSON_SCHEMA.to_columns(
+            [
+                {
+                    "id": "p1",
+                    "full_name": "sean thorne",
+                    "birth_year": 1990,
+                    "skills": ["python", "sql"],
+                    "unknown_field": "dropped",
+                },
+                {"id": "p2"},
+            ]
+        )
+
+        assert "unknown_field" not in base
+        assert base["id"] == ["p1", "p2"]
+        assert base["full_name"] == ["sean thorne", None]
+        assert base["birth_year"] == [1990, None]
+        assert base["skills"] == [["python", "sql"], None]
+        assert all(len(values) == 2 for values in base.values())
+
+    def test_free_plan_booleans_and_bad_types(self):
+        """Test true/false contact flags and mistyped values do not break columns."""
+        base, _ = PERSON_SCHEMA.to_columns(
+            [
+                {
+                    "id": "p1",
+                    "work_email": True,
+                    "personal_emails": True,
+                    "linkedin_connections": "500+",
+                }
+            ]
+        )
+
+        assert base["work_email"] == ["true"]
+        assert base["personal_emails"] == [None]
+        assert base["linkedin_connections"] == [None]
+
+    def test_arrays_of_objects_become_child_tables(self):
+        """Test experience elements become keyed, flattened child rows."""
+        _, children = PERSON_SCHEMA.to_columns(
+            [
+                {
+                    "id": "p1",
+                    "experience": [
+                        {
+                            "is_primary": True,
+                            "company": {
+                                "name": "people data labs",
+                                "location": {"country": "united states"},
+                            },
+                            "title": {"name": "ceo", "levels": ["cxo"]},
+                        },
+                        {"company": None, "title": {"name": "engineer"}},
+                    ],
+                    "possible_emails": [{"address": "a@b.com"}],
+                },
+                {"id": "p2", "experience": []},
+            ]
+        )
+
+        experience = children["experience"]
+        assert experience["person_id"] == ["p1", "p1"]
+        assert experience["position"] == [0, 1]
+        assert experience["is_primary"] == [True, None]
+        assert experience["company_name"] == ["people data labs", None]
+        assert experience["company_location_country"] == ["united states", None]
+        assert experience["title_levels"] == [["cxo"], None]
+        # Undocumented element fields are kept as one JSON string
+        assert children["possible_emails"]["record"] == ['{"address":"a@b.com"}']
+        assert children["education"]["person_id"] == []
+
+    def test_company_objects(self):
+        """Test fixed objects are flattened and keyed objects kept as JSON."""
+        base, children = COMPANY_SCHEMA.to_columns(
+            [
+                {
+                    "id": "c1",
+                    "location": {"country": "united states"},
+                    "employee_count_by_country": {"united states": 10},
+                    "sic": [{"sic_code": "7371"}],
+                }
+            ]
+        )
+
+        assert base["location_country"] == ["united states"]
+        assert base["employee_count_by_country"] == ['{"united states":10}']
+        assert children["sic"]["company_id"] == ["c1"]
+        assert children["sic"]["sic_code"] == ["7371"]
+
+
+class TestColumnarSchemaMatchesDocs:
+    """The columnar layout covers every documented PDL field."""
+
+    @pytest.mark.parametrize(
+        "schema, file_name",
+        [(PERSON_SCHEMA, "PERSON_SCHEMA.md"), (COMPANY_SCHEMA, "COMPANY_SCHEMA.md")],
+    )
+    def test_every_documented_field_is_exported(self, schema, file_name):
+        """Test each documented field maps to a column or a child table."""
+        documented = _documented_fields(file_name)
+        covered = {column.path[0] for column in schema.columns}
+        children = {child.field for child in schema.children}
+
+        assert documented
+        for name, data_type in documented.items():
+            if data_type.startswith("Array [Object]"):
+                assert name in children, name
+            else:
+                assert name in covered, name
+        assert children <= set(documented)
+
+    @pytest.mark.parametrize(
+        "schema, file_name",
+        [(PERSON_SCHEMA, "PERSON_SCHEMA.md"), (COMPANY_SCHEMA, "COMPANY_SCHEMA.md")],
+    )
+    def test_column_types_follow_docs(self, schema, file_name):
+        """Test top-level column types agree with the documented data types."""
+        documented = _documented_fields(file_name)
+        expected = {
+            "Array": "list_string",
+            "Object": "json",
+            "Integer": "int64",
+            "Float": "float64",
+            "String": "string",
+            "Enum": "string",
+        }
+
+        for column in schema.columns:
+            if len(column.path) > 1:
+                continue
+            prefix = documented[column.name].split(" ")[0]
+            assert column.type == expected[prefix], column.name
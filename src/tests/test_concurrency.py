@@ -0,0 +1,60 @@
+"""
+Tests for concurrency helpers.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.concurrency import gather_bounded
+
+
+class TestGatherBounded:
+    """Test cases for gather_bounded."""
+
+    @pytest.mark.asyncio
+    async def test_preserves_input_order(self):
+        """Test results come back in input order regardless of completion order."""
+
+        async def work(n: int) -> int:
+            await asyncio.sleep(0.001 * (5 - n))
+            return n * 10
+
+        results = await gather_bounded(range(5), work, limit=5)
+
+        assert [r.value for r in results] == [0, 10, 20, 30, 40]
+        assert all(r.ok for r in results)
+
+    @pytest.mark.asyncio
+    async def test_respects_limit(self):
+        """Test no more than `limit` calls are in flight at once."""
+        in_flight = 0
+        peak = 0
+
+        async def work(n: int) -> int:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return n
+
+        await gather_bounded(range(20), work, limit=3)
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_captures_errors_and_latency(self):
+        """Test a failing item is captured without failing the batch."""
+
+        async def work(n: int) -> int:
+            if n == 1:
+                raise RuntimeError("boom")
+            return n
+
+        results = await gather_bounded([0, 1, 2], work, limit=2)
+
+        assert results[0].ok and results[2].ok
+        assert not results[1].ok
+        assert isinstance(results[1].error, RuntimeError)
+        assert all(r.latency_ms >= 0 for r in results)
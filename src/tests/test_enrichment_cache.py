@@ -0,0 +1,159 @@
+"""
+Tests for the persistent enrichment cache and its use in AsyncPDLClient.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from src.utils.enrichment_cache import EnrichmentCache
+from src.utils.pdl_client import AsyncPDLClient
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EnrichmentCache(
+        db_path=str(tmp_path / "enrichment_cache.sqlite3"),
+        ttl_seconds=100,
+        max_entries=3,
+    )
+    yield cache
+    cache.close()
+
+
+class TestEnrichmentCache:
+    """Test cases for EnrichmentCache."""
+
+    def test_hit_and_miss(self, cache):
+        """Test stored results are returned and unknown IDs are misses."""
+        cache.put_many("person", {"p1": {"status": 200, "data": {"id": "p1"}}})
+
+        hits = cache.get_many("person", ["p1", "p2"])
+
+        assert hits == {"p1": {"status": 200, "data": {"id": "p1"}}}
+        assert cache.metrics()["hits"] == 1
+        assert cache.metrics()["misses"] == 1
+
+    def test_namespaces_are_isolated(self, cache):
+        """Test person and company entries with the same ID do not collide."""
+        cache.put_many("person", {"x": {"kind": "person"}})
+
+        assert cache.get_many("company", ["x"]) == {}
+
+    def test_entries_expire_after_ttl(self, cache):
+        """Test entries older than the TTL are misses and get purged."""
+        cache.put_many("person", {"p1": {"status": 200}}, now=1_000)
+
+        assert cache.get_many("person", ["p1"], now=1_050) != {}
+        assert cache.get_many("person", ["p1"], now=1_101) == {}
+        assert cache.metrics()["expirations"] == 1
+
+    def test_lru_eviction_over_max_entries(self, cache):
+        """Test the least recently used entries are evicted first."""
+        cache.put_many("person", {"p1": {}}, now=1_000)
+        cache.put_many("person", {"p2": {}}, now=1_001)
+        cache.put_many("person", {"p3": {}}, now=1_002)
+        cache.get_many("person", ["p1"], now=1_010)
+
+        cache.put_many("person", {"p4": {}}, now=1_020)
+
+        remaining = cache.get_many("person", ["p1", "p2", "p3", "p4"], now=1_030)
+        assert set(remaining) == {"p1", "p3", "p4"}
+        assert cache.metrics()["evictions"] == 1
+
+    def test_shared_between_instances(self, cache, tmp_path):
+        """Test a second process (instance) sees entries written by the first."""
+        cache.put_many("company", {"c1": {"status": 200}})
+        other = EnrichmentCache(
+            db_path=cache.db_path, ttl_seconds=100, max_entries=3
+        )
+
+        assert other.get_many("company", ["c1"]) == {"c1": {"status": 200}}
+        other.close()
+
+
+class TestAsyncPDLClientEnrichmentCache:
+    """Test cases for cache integration in AsyncPDLClient."""
+
+    @staticmethod
+    def _recording_client(cache, requested: list[list[str]]) -> AsyncPDLClient:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.method == "GET":
+                pdl_id = request.url.params["pdl_id"]
+                requested.append([pdl_id])
+                return httpx.Response(
+                    200, json={"status": 200, "data": {"id": pdl_id}}
+                )
+            body = json.loads(request.content)
+            ids = [r["params"]["pdl_id"] for r in body["requests"]]
+            requested.append(ids)
+            return httpx.Response(
+                200, json=[{"status": 200, "data": {"id": i}} for i in ids]
+            )
+
+        return AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            enrichment_cache=cache,
+        )
+
+    @pytest.mark.asyncio
+    async def test_bulk_only_sends_misses(self, cache):
+        """Test cached IDs are served locally and only misses hit PDL."""
+        requested: list[list[str]] = []
+        client = self._recording_client(cache, requested)
+
+        await client.person_enrichment(pdl_id="p1")
+        response = await client.person_bulk_enrichment(pdl_ids=["p1", "p2"])
+
+        assert requested == [["p1"], ["p2"]]
+        assert [item["data"]["id"] for item in response] == ["p1", "p2"]
+        await client.http.aclose()
+
+    @pytest.mark.asyncio
+    async def test_full_hit_skips_network(self, cache):
+        """Test a fully cached bulk call makes no requests."""
+        requested: list[list[str]] = []
+        client = self._recording_client(cache, requested)
+
+        await client.person_bulk_enrichment(pdl_ids=["p1", "p2"])
+        await client.person_bulk_enrichment(pdl_ids=["p2", "p1"])
+
+        assert requested == [["p1", "p2"]]
+        await client.http.aclose()
+
+    @pytest.mark.asyncio
+    async def test_refresh_and_bypass_modes(self, cache):
+        """Test refresh re-fetches and rewrites; bypass neither reads nor writes."""
+        requested: list[list[str]] = []
+        client = self._recording_client(cache, requested)
+
+        await client.company_enrichment(pdl_id="c1")
+        await client.company_enrichment(pdl_id="c1", cache_mode="refresh")
+        await client.company_enrichment(pdl_id="c1", cache_mode="bypass")
+        await client.company_bulk_enrichment(pdl_ids=["c2"], cache_mode="bypass")
+        await client.company_enrichment(pdl_id="c1")
+
+        assert requested == [["c1"], ["c1"], ["c1"], ["c2"]]
+        assert cache.get_many("company", ["c2"]) == {}
+        await client.http.aclose()
+
+    @pytest.mark.asyncio
+    async def test_failed_results_are_not_cached(self, cache):
+        """Test non-200 results are returned but never stored."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404, json={"status": 404})
+
+        client = AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            enrichment_cache=cache,
+        )
+
+        response = await client.person_enrichment(pdl_id="missing")
+
+        assert response["status"] == 404
+        assert cache.metrics()["writes"] == 0
+        await client.http.aclose()
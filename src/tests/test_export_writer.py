@@ -0,0 +1,474 @@
+"""
+Tests for the incremental JSON export writer.
+"""
+
+import asyncio
+import csv
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from src.utils import export_writer
+from src.utils.flatten import compile_columns
+from src.utils.export_writer import (
+    AsyncExportWriter,
+    ColumnarExportWriter,
+    CSVExportWriter,
+    ExportFormat,
+    JSONExportWriter,
+    ShardedExportWriter,
+    export_directory,
+    export_records,
+)
+
+
+def _records(count):
+    return [{"id": f"p{i}", "skills": ["python", "sql"]} for i in range(count)]
+
+
+requires_pyarrow = pytest.mark.skipif(
+    export_writer.pyarrow is None, reason="pyarrow is not installed"
+)
+
+
+def _read_manifest(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TestJSONExportWriter:
+    """Test cases for JSONExportWriter."""
+
+    def test_writes_records_and_patches_count_into_header(self, tmp_path):
+        """Test the document loads with its records and header count."""
+        path = str(tmp_path / "prospects.json")
+        records = [{"id": "p1", "name": "Zoë"}, {"id": "p2", "skills": ["a", "b"]}]
+
+        writer = JSONExportWriter(path, "prospects")
+        writer.write(records[:1])
+        writer.write(records[1:])
+        assert writer.close() == path
+
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        assert list(document) == ["generated_at", "total_prospects", "prospects"]
+        assert document["total_prospects"] == 2
+        assert document["prospects"] == records
+        # Non-ASCII characters are written as-is, like ensure_ascii=False
+        assert "Zoë" in open(path, encoding="utf-8").read()
+
+    def test_empty_export(self, tmp_path):
+        """Test an export without records is still valid JSON."""
+        path = str(tmp_path / "persons.json")
+
+        JSONExportWriter(path, "persons").close()
+
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        assert document["total_persons"] == 0
+        assert document["persons"] == []
+
+    def test_abort_removes_file(self, tmp_path):
+        """Test an aborted export leaves no partial file behind."""
+        path = tmp_path / "persons.json"
+
+        writer = JSONExportWriter(str(path), "persons")
+        writer.write([{"id": "p1"}])
+        writer.abort()
+
+        assert not path.exists()
+
+
+class TestAsyncExport:
+    """Test cases for the off-loop export helpers."""
+
+    @pytest.mark.asyncio
+    async def test_async_writer_appends_batches(self, tmp_path):
+        """Test batches written through the async writer end up in order."""
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            async with AsyncExportWriter("persons", "persons") as writer:
+                await writer.write([{"id": "p1"}])
+                await writer.write([{"id": "p2"}, {"id": "p3"}])
+        assert writer.count == 3
+
+        (path,) = tmp_path.iterdir()
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        assert [p["id"] for p in document["persons"]] == ["p1", "p2", "p3"]
+
+    @pytest.mark.asyncio
+    async def test_export_records_consumes_lazy_iterable(self, tmp_path):
+        """Test export_records streams a generator without a list in between."""
+
+        def records():
+            for i in range(1000):
+                yield {"id": f"p{i}"}
+
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            path = await export_records("prospects", "prospects", records())
+
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        assert document["total_prospects"] == 1000
+        assert document["prospects"][-1] == {"id": "p999"}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_exports_get_separate_files(self, tmp_path):
+        """Test exports started in the same second never share a file."""
+        with (
+            patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)),
+            patch("src.utils.export_writer.datetime") as mock_datetime,
+        ):
+            mock_datetime.now.return_value = datetime(2026, 1, 20, 12, 0, 0)
+            paths = await asyncio.gather(
+                *(
+                    export_records("prospects", "prospects", iter(_records(n)))
+                    for n in (100, 200, 300)
+                ),
+                export_records(
+                    "prospects",
+                    "prospects",
+                    _records(5),
+                    "csv",
+                    compile_columns(("id",)),
+                ),
+            )
+
+        assert len(set(paths)) == 4
+        assert paths[3].endswith("prospects_20260120_120000.csv")
+        totals = []
+        for path in paths[:3]:
+            with open(path, encoding="utf-8") as f:
+                totals.append(json.load(f)["total_prospects"])
+        assert sorted(totals) == [100, 200, 300]
+
+    @pytest.mark.asyncio
+    async def test_export_records_failure_removes_file(self, tmp_path):
+        """Test a failing record source leaves no partial export."""
+
+        def records():
+            yield {"id": "p1"}
+            raise RuntimeError("source failed")
+
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            with pytest.raises(RuntimeError):
+                await export_records("prospects", "prospects", records())
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestShardedExportWriter:
+    """Test cases for sharded exports and their manifest."""
+
+    def test_rotates_on_record_threshold(self, tmp_path):
+        """Test shards hold at most max_records records each."""
+        writer = ShardedExportWriter(str(tmp_path), "persons", "jsonl", max_records=2)
+        writer.write(_records(5))
+        manifest = _read_manifest(writer.close())
+
+        assert manifest["format"] == "jsonl"
+        assert manifest["total_persons"] == 5
+        assert [s["path"] for s in manifest["shards"]] == [
+            "part-00000.jsonl", "part-00001.jsonl", "part-00002.jsonl"
+        ]
+        assert [s["records"] for s in manifest["shards"]] == [2, 2, 1]
+
+        lines = []
+        for shard in manifest["shards"]:
+            lines.extend((tmp_path / shard["path"]).read_text().splitlines())
+        assert [json.loads(line) for line in lines] == _records(5)
+
+    def test_rotates_on_size_threshold(self, tmp_path):
+        """Test a shard is closed once it reaches max_bytes."""
+        line_length = len(json.dumps(_records(1)[0], separators=(",", ":"))) + 1
+
+        writer = ShardedExportWriter(
+            str(tmp_path), "persons", "jsonl", max_bytes=line_length * 3
+        )
+        writer.write(_records(7))
+        manifest = _read_manifest(writer.close())
+
+        assert [s["records"] for s in manifest["shards"]] == [3, 3, 1]
+        assert all(s["bytes"] <= line_length * 3 for s in manifest["shards"])
+
+    def test_gzip_shards_and_checksums(self, tmp_path):
+        """Test gzip shards decompress and match their manifest checksums."""
+        writer = ShardedExportWriter(
+            str(tmp_path), "prospects", "jsonl_gzip", max_records=3
+        )
+        writer.write(_records(4))
+        manifest = _read_manifest(writer.close())
+
+        records = []
+        for shard in manifest["shards"]:
+            data = (tmp_path / shard["path"]).read_bytes()
+            assert shard["path"].endswith(".jsonl.gz")
+            assert shard["bytes"] == len(data)
+            assert shard["sha256"] == hashlib.sha256(data).hexdigest()
+            records.extend(
+                json.loads(line) for line in gzip.decompress(data).splitlines()
+            )
+        assert records == _records(4)
+
+    def test_compact_json_shards_are_documents(self, tmp_path):
+        """Test json_compact shards are complete documents with their count."""
+        writer = ShardedExportWriter(
+            str(tmp_path), "companies", "json_compact", max_records=2
+        )
+        writer.write(_records(3))
+        manifest = _read_manifest(writer.close())
+
+        documents = [
+            json.loads((tmp_path / s["path"]).read_text()) for s in manifest["shards"]
+        ]
+        assert [d["total_companies"] for d in documents] == [2, 1]
+        assert documents[0]["companies"] + documents[1]["companies"] == _records(3)
+        assert "\n" not in (tmp_path / "part-00000.json").read_text().rstrip()
+        data = (tmp_path / "part-00000.json").read_bytes()
+        assert manifest["shards"][0]["sha256"] == hashlib.sha256(data).hexdigest()
+
+    def test_empty_export_has_no_shards(self, tmp_path):
+        """Test an export without records writes only the manifest."""
+        writer = ShardedExportWriter(str(tmp_path), "persons", "jsonl")
+        manifest = _read_manifest(writer.close())
+
+        assert manifest["total_persons"] == 0
+        assert manifest["shards"] == []
+
+    def test_abort_removes_directory(self, tmp_path):
+        """Test an aborted sharded export leaves nothing behind."""
+        directory = tmp_path / "export"
+        directory.mkdir()
+
+        writer = ShardedExportWriter(str(directory), "persons", "jsonl", max_records=1)
+        writer.write(_records(3))
+        writer.abort()
+
+        assert not directory.exists()
+
+    def test_export_directories_are_unique(self, tmp_path):
+        """Test two exports started in the same second get separate directories."""
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            first = export_directory("persons")
+            second = export_directory("persons")
+
+        assert first != second
+
+    @pytest.mark.asyncio
+    async def test_export_records_returns_manifest_path(self, tmp_path):
+        """Test a sharded export_records call returns its manifest."""
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            path = await export_records(
+                "prospects", "prospects", iter(_records(3)), "jsonl"
+            )
+
+        assert path.endswith("manifest.json")
+        assert _read_manifest(path)["total_prospects"] == 3
+
+
+class TestCSVExportWriter:
+    """Test cases for flat CSV exports."""
+
+    def test_writes_header_and_rows(self, tmp_path):
+        """Test records are flattened into rows under the column headers."""
+        path = str(tmp_path / "persons.csv")
+        columns = compile_columns(
+            ("id", "skills", "company=experience[0].company.name")
+        )
+
+        writer = CSVExportWriter(path, columns)
+        writer.write(
+            [
+                {
+                    "id": "p1",
+                    "skills": ["a", "b"],
+                    "experience": [{"company": {"name": "x, y"}}],
+                },
+                {"id": "p2"},
+            ]
+        )
+        assert writer.close() == path
+
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows == [
+            ["id", "skills", "company"],
+            ["p1", "a; b", "x, y"],
+            ["p2", "", ""],
+        ]
+        assert writer.count == 2
+
+    @pytest.mark.parametrize("escape_formulas", [True, False])
+    def test_formula_cells_are_escaped(self, tmp_path, escape_formulas):
+        """Test cells a spreadsheet would evaluate are prefixed when enabled."""
+        path = str(tmp_path / "persons.csv")
+        columns = compile_columns(("id", "headline", "summary", "score"))
+
+        writer = CSVExportWriter(path, columns, escape_formulas=escape_formulas)
+        writer.write(
+            [
+                {
+                    "id": "p1",
+                    "headline": "=HYPERLINK(\"http://x\")",
+                    "summary": "@SUM(A1)",
+                    "score": -5,
+                },
+                {"id": "p2", "headline": "+1 555", "summary": "- hi", "score": 3},
+            ]
+        )
+        writer.close()
+
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))[1:]
+        if escape_formulas:
+            assert rows == [
+                ["p1", "'=HYPERLINK(\"http://x\")", "'@SUM(A1)", "-5"],
+                ["p2", "'+1 555", "'- hi", "3"],
+            ]
+        else:
+            assert rows[0] == ["p1", "=HYPERLINK(\"http://x\")", "@SUM(A1)", "-5"]
+
+    @pytest.mark.asyncio
+    async def test_export_records_defaults_to_crm_profile(self, tmp_path):
+        """Test a csv export without columns uses the collection's crm profile."""
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            path = await export_records(
+                "prospects", "prospects", [{"id": "p1", "job_title": "ceo"}], "csv"
+            )
+
+        assert path.endswith(".csv")
+        with open(path, encoding="utf-8", newline="") as f:
+            (row,) = list(csv.DictReader(f))
+        assert row["id"] == "p1"
+        assert row["title"] == "ceo"
+        assert row["email"] == ""
+
+
+@requires_pyarrow
+class TestColumnarExportWriter:
+    """Test cases for Parquet / Arrow exports."""
+
+    @staticmethod
+    def _persons(count):
+        return [
+            {
+                "id": f"p{i}",
+                "full_name": f"person {i}",
+                "skills": ["python"],
+                "experience": [
+                    {"company": {"name": "acme"}, "title": {"levels": ["vp"]}},
+                    {"company": {"name": "initech"}},
+                ],
+            }
+            for i in range(count)
+        ]
+
+    def test_parquet_tables_and_row_groups(self, tmp_path):
+        """Test base and child tables are written one row group per batch."""
+        import pyarrow.parquet as pq
+
+        writer = ColumnarExportWriter(
+            str(tmp_path), "prospects", "parquet", batch_size=2
+        )
+        writer.write(self._persons(3))
+        writer.write(self._persons(1))
+        manifest = _read_manifest(writer.close())
+
+        tables = {table["name"]: table for table in manifest["tables"]}
+        assert manifest["total_prospects"] == 4
+        assert tables["prospects"]["rows"] == 4
+        assert tables["prospects_experience"]["rows"] == 8
+        assert tables["prospects_education"]["rows"] == 0
+
+        base = pq.ParquetFile(tmp_path / "prospects.parquet")
+        # 2 + 1 records from the first call, 1 from the second
+        assert base.metadata.num_row_groups == 3
+        assert base.schema_arrow.field("skills").type.value_type == "string"
+
+        experience = pq.read_table(tmp_path / "prospects_experience.parquet")
+        assert experience.column("person_id").to_pylist()[:2] == ["p0", "p0"]
+        assert experience.column("company_name").to_pylist()[:2] == [
+            "acme", "initech"
+        ]
+        assert experience.column("title_levels").to_pylist()[:2] == [["vp"], None]
+
+        data = (tmp_path / "prospects.parquet").read_bytes()
+        assert tables["prospects"]["sha256"] == hashlib.sha256(data).hexdigest()
+
+    def test_schema_is_stable_across_exports(self, tmp_path):
+        """Test exports of differently shaped records share one schema."""
+        import pyarrow.parquet as pq
+
+        first, second = tmp_path / "first", tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+
+        writer = ColumnarExportWriter(str(first), "persons", "parquet")
+        writer.write(self._persons(1))
+        writer.close()
+        writer = ColumnarExportWriter(str(second), "persons", "parquet")
+        writer.write([{"id": "p9"}])
+        writer.close()
+
+        assert pq.read_schema(first / "persons.parquet") == pq.read_schema(
+            second / "persons.parquet"
+        )
+
+    def test_arrow_ipc_companies(self, tmp_path):
+        """Test company records are written as Arrow IPC files."""
+        import pyarrow.ipc
+
+        writer = ColumnarExportWriter(str(tmp_path), "companies", "arrow")
+        writer.write([{"id": "c1", "name": "acme", "sic": [{"sic_code": "7371"}]}])
+        writer.close()
+
+        base = pyarrow.ipc.open_file(tmp_path / "companies.arrow").read_all()
+        sic = pyarrow.ipc.open_file(tmp_path / "companies_sic.arrow").read_all()
+        assert base.column("name").to_pylist() == ["acme"]
+        assert sic.column("company_id").to_pylist() == ["c1"]
+
+    @pytest.mark.asyncio
+    async def test_failed_export_removes_directory(self, tmp_path):
+        """Test a failing record source leaves no partial columnar export."""
+
+        def records():
+            yield from self._persons(150)
+            raise RuntimeError("source failed")
+
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            with pytest.raises(RuntimeError):
+                await export_records("persons", "persons", records(), "parquet")
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestExportFormat:
+    """Test cases for export format validation."""
+
+    def test_zstd_requires_zstandard(self):
+        """Test jsonl_zstd is rejected when zstandard is not installed."""
+        adapter = TypeAdapter(ExportFormat)
+
+        with patch.object(export_writer, "zstandard", None):
+            with pytest.raises(ValidationError):
+                adapter.validate_python("jsonl_zstd")
+        assert adapter.validate_python("jsonl_gzip") == "jsonl_gzip"
+
+    def test_columnar_formats_require_pyarrow(self):
+        """Test parquet and arrow are rejected when pyarrow is not installed."""
+        adapter = TypeAdapter(ExportFormat)
+
+        with patch.object(export_writer, "pyarrow", None):
+            for export_format in ("parquet", "arrow"):
+                with pytest.raises(ValidationError):
+                    adapter.validate_python(export_format)
+
+    def test_unknown_format_is_rejected(self):
+        """Test formats outside the supported set fail validation."""
+        with pytest.raises(ValidationError):
+            TypeAdapter(ExportFormat).validate_python("xml")
@@ -0,0 +1,163 @@
+"""
+Tests for the record flattening engine used by CSV exports.
+"""
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from src.utils.flatten import (
+    CSVColumns,
+    compile_columns,
+    compile_expression,
+    csv_columns,
+    escape_formula,
+    experience_columns,
+    parse_column,
+)
+
+PERSON = {
+    "id": "p1",
+    "full_name": "sean thorne",
+    "work_email": None,
+    "emails": [
+        {"address": "sean@gmail.com", "type": "personal"},
+        {"address": "sean@pdl.com", "type": "current_professional"},
+    ],
+    "skills": ["python", "sql"],
+    "experience": [
+        {
+            "is_primary": False,
+            "company": {"name": "old co"},
+            "title": {"name": "engineer", "levels": ["senior"]},
+        },
+        {
+            "is_primary": True,
+            "company": {"name": "people data labs", "location": {"country": "us"}},
+            "title": {"name": "ceo", "levels": ["cxo", "owner"]},
+            "start_date": "2015-03",
+        },
+    ],
+}
+
+
+class TestExpressions:
+    """Test cases for compiled column expressions."""
+
+    @pytest.mark.parametrize(
+        "expression, expected",
+        [
+            ("full_name", "sean thorne"),
+            ("experience[0].title.name", "engineer"),
+            ("experience[1].company.location.country", "us"),
+            ("experience[is_primary].company.name", "people data labs"),
+            ("emails[type=current_professional].address", "sean@pdl.com"),
+            ("experience[*].company.name", ["old co", "people data labs"]),
+            ("experience[*].title.levels", ["senior", "cxo", "owner"]),
+            ("work_email || emails[0].address", "sean@gmail.com"),
+            ("experience[5].title.name", None),
+            ("full_name.first", None),
+            ("missing.nested[0]", None),
+        ],
+    )
+    def test_expression_values(self, expression, expected):
+        """Test each expression form resolves against a nested record."""
+        assert compile_expression(expression)(PERSON) == expected
+
+    @pytest.mark.parametrize(
+        "expression", ["", "a..b", "[0]", "a[", "a.", "a[x=]", "a || "]
+    )
+    def test_malformed_expressions_raise(self, expression):
+        """Test malformed expressions are rejected at compile time."""
+        with pytest.raises(ValueError):
+            compile_expression(expression)
+
+
+class TestColumns:
+    """Test cases for column specs and compiled column sets."""
+
+    def test_parse_column_headers(self):
+        """Test headers are optional and selector '=' is not a header."""
+        assert parse_column("title=job_title") == ("title", "job_title")
+        assert parse_column("job_title") == ("job_title", "job_title")
+        assert parse_column("emails[type=personal].address") == (
+            "emails[type=personal].address",
+            "emails[type=personal].address",
+        )
+
+    def test_row_formats_cells(self):
+        """Test lists are joined, booleans lowered and missing values empty."""
+        columns = compile_columns(
+            (
+                "id",
+                "skills",
+                "primary=experience[1].is_primary",
+                "company=experience[1].company",
+                "missing=job_title",
+            )
+        )
+
+        assert columns.headers == ("id", "skills", "primary", "company", "missing")
+        assert columns.row(PERSON) == [
+            "p1",
+            "python; sql",
+            "true",
+            '{"name":"people data labs","location":{"country":"us"}}',
+            "",
+        ]
+
+    @pytest.mark.parametrize(
+        "cell, expected",
+        [
+            ("=1+1", "'=1+1"),
+            ("+1 555 0100", "'+1 555 0100"),
+            ("-2+3", "'-2+3"),
+            ("@SUM(A1)", "'@SUM(A1)"),
+            ("\tx", "'\tx"),
+            ("-5", "-5"),
+            ("+1.5e3", "+1.5e3"),
+            ("sales = growth", "sales = growth"),
+            ("", ""),
+        ],
+    )
+    def test_escape_formula(self, cell, expected):
+        """Test formula-like cells are prefixed and plain numbers are not."""
+        assert escape_formula(cell) == expected
+
+    def test_compiled_column_sets_are_cached(self):
+        """Test a column set is compiled once and reused."""
+        assert compile_columns(("id", "full_name")) is compile_columns(
+            ("id", "full_name")
+        )
+
+    def test_duplicate_headers_raise(self):
+        """Test a column set with repeated headers is rejected."""
+        with pytest.raises(ValueError):
+            compile_columns(("name=full_name", "name=first_name"))
+
+    def test_profiles(self):
+        """Test named profiles resolve per collection and custom columns win."""
+        crm = csv_columns("prospects", "crm")
+        assert crm.row(PERSON)[crm.headers.index("email")] == "sean@pdl.com"
+        assert "sic_codes" in csv_columns("companies", "crm").headers
+        assert csv_columns("persons", "crm", ["id"]).headers == ("id",)
+
+    def test_experience_columns(self):
+        """Test top-N experience columns are numbered from 1."""
+        columns = compile_columns(experience_columns(2))
+
+        row = dict(zip(columns.headers, columns.row(PERSON)))
+        assert row["experience_1_company"] == "old co"
+        assert row["experience_2_title"] == "ceo"
+        assert row["experience_2_start_date"] == "2015-03"
+
+    def test_csv_columns_request_validation(self):
+        """Test custom columns are validated when the request is parsed."""
+
+        class Request(BaseModel):
+            csv_columns: CSVColumns | None = None
+
+        assert Request(csv_columns=["id"]).csv_columns == ["id"]
+        with pytest.raises(ValidationError):
+            Request(csv_columns=["title=job_title[0"])
+        with pytest.raises(ValidationError):
+            Request(csv_columns=[])
@@ -0,0 +1,130 @@
+"""
+Tests for the background job engine.
+"""
+
+import asyncio
+
+import pytest
+
+from src.utils.jobs import JobManager, JobQueueFullError
+
+
+async def _wait_finished(manager: JobManager, job_id: str) -> None:
+    for _ in range(100):
+        if manager.get(job_id).finished:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestJobManager:
+    """Test cases for JobManager."""
+
+    @pytest.mark.asyncio
+    async def test_runs_job_and_records_result_and_progress(self):
+        """Test a submitted job runs to completion with its progress."""
+        manager = JobManager(workers=1, queue_limit=10, retention=10)
+
+        async def work(job):
+            job.report("working", done=1)
+            return "result"
+
+        job = manager.submit("test", work)
+        assert job.status == "queued"
+        await _wait_finished(manager, job.id)
+
+        assert job.status == "succeeded"
+        assert job.result == "result"
+        assert job.stage == "working"
+        assert job.progress == {"done": 1}
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(self):
+        """Test an exception marks the job failed with its message."""
+        manager = JobManager(workers=1, queue_limit=10, retention=10)
+
+        async def work(job):
+            raise RuntimeError("boom")
+
+        job = manager.submit("test", work)
+        await _wait_finished(manager, job.id)
+
+        assert job.status == "failed"
+        assert job.error == "boom"
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_bounds_concurrency(self):
+        """Test no more than `workers` jobs run at once."""
+        manager = JobManager(workers=2, queue_limit=10, retention=10)
+        running = 0
+        peak = 0
+
+        async def work(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        jobs = [manager.submit("test", work) for _ in range(5)]
+        for job in jobs:
+            await _wait_finished(manager, job.id)
+
+        assert peak == 2
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_queue_limit_rejects_submissions(self):
+        """Test submitting beyond the queue depth limit raises."""
+        manager = JobManager(workers=1, queue_limit=1, retention=10)
+        release = asyncio.Event()
+
+        async def work(job):
+            await release.wait()
+
+        manager.submit("test", work)
+        await asyncio.sleep(0)  # first job leaves the queue and starts
+        manager.submit("test", work)
+
+        with pytest.raises(JobQueueFullError):
+            manager.submit("test", work)
+
+        release.set()
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_and_queued_jobs(self):
+        """Test cancelling marks running and queued jobs cancelled."""
+        manager = JobManager(workers=1, queue_limit=10, retention=10)
+
+        async def work(job):
+            await asyncio.sleep(10)
+
+        running = manager.submit("test", work)
+        queued = manager.submit("test", work)
+        await asyncio.sleep(0)
+
+        manager.cancel(queued.id)
+        manager.cancel(running.id)
+        await _wait_finished(manager, running.id)
+
+        assert running.status == "cancelled"
+        assert queued.status == "cancelled"
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_retention_evicts_oldest_finished_jobs(self):
+        """Test only `retention` finished jobs are kept."""
+        manager = JobManager(workers=1, queue_limit=10, retention=2)
+
+        async def work(job):
+            return None
+
+        jobs = [manager.submit("test", work) for _ in range(3)]
+        await _wait_finished(manager, jobs[2].id)
+
+        assert manager.get(jobs[0].id) is None
+        assert manager.get(jobs[2].id) is not None
+        await manager.stop()
@@ -0,0 +1,462 @@
+"""
+Tests for AsyncPDLClient.
+
+Uses httpx.MockTransport so no network calls are made.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.utils import fast_json
+from src.utils.enrichment_cache import EnrichmentCache
+from src.utils.field_profiles import company_fields, data_include, person_fields
+from src.utils.pdl_client import (
+    AsyncPDLClient,
+    PDLRateLimiter,
+    _iter_search_pages,
+    _parse_per_minute,
+    collect_search_pages,
+)
+
+
+def _make_client(handler, **kwargs) -> AsyncPDLClient:
+    """Build an AsyncPDLClient whose HTTP layer is served by handler."""
+    return AsyncPDLClient(
+        api_key="test-key", transport=httpx.MockTransport(handler), **kwargs
+    )
+
+
+class TestAsyncPDLClient:
+    """Test cases for the asyncio PDL client."""
+
+    def test_requires_api_key(self, monkeypatch):
+        """Test that a missing API key raises ValueError."""
+        monkeypatch.delenv("PDL_KEY", raising=False)
+        with pytest.raises(ValueError):
+            AsyncPDLClient()
+
+    @pytest.mark.asyncio
+    async def test_person_search_posts_sql(self):
+        """Test person search POSTs the SQL body with the API key header."""
+        seen: dict = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["path"] = request.url.path
+            seen["api_key"] = request.headers["X-Api-Key"]
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(
+                200, json={"status": 200, "data": [{"id": "p1"}], "total": 1}
+            )
+
+        async with _make_client(handler) as client:
+            response = await client.person_search(
+                sql_query="SELECT * FROM person", size=500, scroll_token="tok"
+            )
+
+        assert response["data"] == [{"id": "p1"}]
+        assert seen["path"] == "/v5/person/search"
+        assert seen["api_key"] == "test-key"
+        assert seen["body"]["size"] == 100
+        assert seen["body"]["scroll_token"] == "tok"
+
+    @pytest.mark.asyncio
+    async def test_person_enrichment_uses_query_params(self):
+        """Test person enrichment GETs with lowercase boolean params."""
+        seen: dict = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["path"] = request.url.path
+            seen["params"] = dict(request.url.params)
+            return httpx.Response(200, json={"status": 200, "data": {"id": "p1"}})
+
+        async with _make_client(handler) as client:
+            response = await client.person_enrichment(pdl_id="p1")
+
+        assert response["status"] == 200
+        assert seen["path"] == "/v5/person/enrich"
+        assert seen["params"]["pdl_id"] == "p1"
+        assert seen["params"]["titlecase"] == "true"
+
+    @pytest.mark.asyncio
+    async def test_error_status_returned_as_body(self):
+        """Test that PDL error responses are returned, not raised."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                404, json={"status": 404, "error": {"message": "Not found"}}
+            )
+
+        async with _make_client(handler) as client:
+            response = await client.company_enrichment(pdl_id="missing")
+
+        assert response["status"] == 404
+
+    @pytest.mark.asyncio
+    async def test_company_enrichment_requires_identifier(self):
+        """Test that company enrichment validates identifiers before calling PDL."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise AssertionError("PDL should not be called")
+
+        async with _make_client(handler) as client:
+            with pytest.raises(ValueError):
+                await client.company_enrichment()
+
+    @pytest.mark.asyncio
+    async def test_bulk_enrichment_request_format(self):
+        """Test bulk enrichment sends PDL's requests/params format."""
+        seen: dict = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["path"] = request.url.path
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, json=[{"status": 200, "data": {"id": "c1"}}])
+
+        async with _make_client(handler) as client:
+            response = await client.company_bulk_enrichment(pdl_ids=["c1"])
+
+        assert response == [{"status": 200, "data": {"id": "c1"}}]
+        assert seen["path"] == "/v5/company/enrich/bulk"
+        assert seen["body"]["requests"] == [{"params": {"pdl_id": "c1"}}]
+
+
+class TestCompactWireFormat:
+    """Test cases for compact request/response encoding."""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_compact_and_accept_gzip(self):
+        """Test no pretty flag is sent and compressed responses are accepted."""
+        seen: dict = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["body"] = request.content
+            seen["accept_encoding"] = request.headers["Accept-Encoding"]
+            return httpx.Response(200, json={"status": 200, "data": []})
+
+        async with _make_client(handler) as client:
+            await client.company_search(sql_query="SELECT * FROM company")
+
+        assert "pretty" not in json.loads(seen["body"])
+        assert b": " not in seen["body"]
+        assert "gzip" in seen["accept_encoding"]
+
+    @pytest.mark.asyncio
+    async def test_non_json_error_body_is_wrapped(self):
+        """Test a non-JSON error body decodes to a PDL-style error dict."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(400, content=b"<html>Bad Request</html>")
+
+        async with _make_client(handler) as client:
+            response = await client.person_search(sql_query="SELECT * FROM person")
+
+        assert response["status"] == 400
+        assert "Bad Request" in response["error"]["message"]
+
+    def test_fast_json_round_trip(self):
+        """Test fast_json encodes compactly and decodes bytes and str."""
+        document = {"name": "José", "tags": ["a", "b"], "n": 1}
+
+        encoded = fast_json.dumps(document)
+
+        assert isinstance(encoded, bytes)
+        assert b" " not in encoded.replace("José".encode(), b"")
+        assert fast_json.loads(encoded) == document
+        assert fast_json.loads(encoded.decode("utf-8")) == document
+
+
+class TestFieldProjection:
+    """Test cases for server-side field projection (data_include)."""
+
+    def test_profiles_always_include_id(self):
+        """Test named profiles request the record ID; full means no projection."""
+        assert person_fields("full") is None
+        assert company_fields("full") is None
+        assert "id" in person_fields("minimal")
+        assert set(person_fields("minimal")) < set(person_fields("outreach"))
+        assert data_include(["work_email"]) == "id,work_email"
+        assert data_include(None) is None
+
+    @pytest.mark.asyncio
+    async def test_search_and_bulk_send_data_include(self):
+        """Test fields become data_include on search and on each bulk item."""
+        bodies: dict = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            bodies[request.url.path] = body
+            if request.url.path.endswith("/bulk"):
+                return httpx.Response(
+                    200, json=[{"status": 200, "data": {"id": "p1"}}]
+                )
+            return httpx.Response(200, json={"status": 200, "data": []})
+
+        async with _make_client(handler) as client:
+            await client.person_search(
+                sql_query="SELECT * FROM person", fields=["full_name"]
+            )
+            await client.person_bulk_enrichment(pdl_ids=["p1"], fields=["full_name"])
+
+        assert bodies["/v5/person/search"]["data_include"] == "id,full_name"
+        assert bodies["/v5/person/bulk"]["requests"] == [
+            {"params": {"pdl_id": "p1", "data_include": "id,full_name"}}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_projected_enrichments_are_cached_separately(self, tmp_path):
+        """Test a projected record is never served for a full-record request."""
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.params.get("data_include"))
+            return httpx.Response(200, json={"status": 200, "data": {"id": "p1"}})
+
+        cache = EnrichmentCache(str(tmp_path / "cache.sqlite3"), 3600, 100)
+        async with _make_client(handler, enrichment_cache=cache) as client:
+            await client.person_enrichment(pdl_id="p1", fields=["full_name"])
+            await client.person_enrichment(pdl_id="p1", fields=["full_name"])
+            await client.person_enrichment(pdl_id="p1")
+
+        assert calls == ["id,full_name", None]
+
+
+def _paged_search(pages: int, calls: list):
+    """Fake search callable serving `pages` pages of up to the requested size."""
+
+    async def search(size: int, token: str | None) -> dict:
+        index = int(token or 0)
+        calls.append((size, token))
+        await asyncio.sleep(0)
+        return {
+            "status": 200,
+            "total": pages * 100,
+            "data": [{"id": f"p{index}-{i}"} for i in range(size)],
+            "scroll_token": str(index + 1) if index + 1 < pages else None,
+        }
+
+    return search
+
+
+class TestSearchPagination:
+    """Test cases for the scroll-following search iterators."""
+
+    @pytest.mark.asyncio
+    async def test_stops_at_limit_with_trimmed_last_page(self):
+        """Test pages are followed until limit, asking only for what remains."""
+        calls: list = []
+
+        pages = [
+            page async for page in _iter_search_pages(_paged_search(5, calls), 250)
+        ]
+
+        assert [len(page["data"]) for page in pages] == [100, 100, 50]
+        assert calls == [(100, None), (100, "1"), (50, "2")]
+
+    @pytest.mark.asyncio
+    async def test_prefetches_next_page(self):
+        """Test the next page is requested while the current one is consumed."""
+        calls: list = []
+        pages = _iter_search_pages(_paged_search(3, calls), 300)
+
+        await pages.__anext__()
+        await asyncio.sleep(0)
+
+        assert len(calls) == 2
+        await pages.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stops_on_last_page(self):
+        """Test iteration ends when PDL returns no scroll token."""
+        calls: list = []
+
+        response = await collect_search_pages(
+            _iter_search_pages(_paged_search(2, calls), 1000)
+        )
+
+        assert len(response["data"]) == 200
+        assert response["scroll_token"] is None
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_collect_keeps_records_before_a_failed_page(self):
+        """Test a later page error returns earlier records plus the error."""
+
+        async def search(size: int, token: str | None) -> dict:
+            if token:
+                return {"status": 500, "error": {"message": "boom"}}
+            return {"status": 200, "data": [{"id": "p1"}], "scroll_token": "t1"}
+
+        response = await collect_search_pages(_iter_search_pages(search, 200))
+
+        assert response["status"] == 200
+        assert response["data"] == [{"id": "p1"}]
+        assert response["scroll_token"] == "t1"
+        assert response["error"] == {"message": "boom"}
+
+    @pytest.mark.asyncio
+    async def test_iter_person_search_over_http(self):
+        """Test iter_person_search sends scroll tokens from page to page."""
+        bodies: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            bodies.append(body)
+            token = "next" if "scroll_token" not in body else None
+            return httpx.Response(
+                200,
+                json={
+                    "status": 200,
+                    "data": [{"id": str(i)} for i in range(body["size"])],
+                    "scroll_token": token,
+                },
+            )
+
+        async with _make_client(handler) as client:
+            response = await collect_search_pages(
+                client.iter_person_search(sql_query="SELECT * FROM person", limit=150)
+            )
+
+        assert len(response["data"]) == 150
+        assert [body.get("scroll_token") for body in bodies] == [None, "next"]
+        assert [body["size"] for body in bodies] == [100, 50]
+
+
+class TestAsyncPDLClientBulkChunking:
+    """Test cases for transparent bulk chunking."""
+
+    @pytest.mark.asyncio
+    async def test_person_bulk_splits_into_chunks_of_100(self):
+        """Test 250 IDs become three requests merged back in input order."""
+        chunk_sizes: list[int] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            ids = [r["params"]["pdl_id"] for r in body["requests"]]
+            chunk_sizes.append(len(ids))
+            return httpx.Response(
+                200, json=[{"status": 200, "data": {"id": i}} for i in ids]
+            )
+
+        pdl_ids = [f"p{i}" for i in range(250)]
+        async with _make_client(handler, bulk_concurrency=2) as client:
+            response = await client.person_bulk_enrichment(pdl_ids=pdl_ids)
+
+        assert sorted(chunk_sizes) == [50, 100, 100]
+        assert [item["data"]["id"] for item in response] == pdl_ids
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_becomes_per_id_errors(self):
+        """Test a failed chunk keeps the merged list aligned with the input."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            ids = [r["params"]["pdl_id"] for r in body["requests"]]
+            if ids[0] == "c100":
+                return httpx.Response(
+                    400, json={"status": 400, "error": {"message": "Bad request"}}
+                )
+            return httpx.Response(200, json=[{"status": 200, "id": i} for i in ids])
+
+        pdl_ids = [f"c{i}" for i in range(150)]
+        async with _make_client(handler) as client:
+            response = await client.company_bulk_enrichment(pdl_ids=pdl_ids)
+
+        assert len(response) == 150
+        assert response[99] == {"status": 200, "id": "c99"}
+        assert all(item["status"] == 400 for item in response[100:])
+
+    @pytest.mark.asyncio
+    async def test_empty_ids_make_no_requests(self):
+        """Test bulk enrichment with no IDs returns an empty list."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise AssertionError("PDL should not be called")
+
+        async with _make_client(handler) as client:
+            assert await client.person_bulk_enrichment(pdl_ids=[]) == []
+
+
+class TestPDLRateLimiter:
+    """Test cases for the cross-process token-bucket rate limiter."""
+
+    @staticmethod
+    def _limiter(tmp_path, per_minute: float = 60, burst: int = 2) -> PDLRateLimiter:
+        return PDLRateLimiter(
+            db_path=str(tmp_path / "rate_limits.sqlite3"),
+            rates_per_minute={"search": per_minute, "enrichment": per_minute},
+            burst=burst,
+        )
+
+    def test_burst_then_wait(self, tmp_path):
+        """Test the bucket allows `burst` calls, then asks callers to wait."""
+        limiter = self._limiter(tmp_path, per_minute=60, burst=2)
+        now = 1_000.0
+
+        assert limiter.reserve("search", now=now) == 0
+        assert limiter.reserve("search", now=now) == 0
+        assert limiter.reserve("search", now=now) == pytest.approx(1.0)
+        # One token refills after a second at 60/minute
+        assert limiter.reserve("search", now=now + 1) == 0
+
+    def test_state_is_shared_between_instances(self, tmp_path):
+        """Test two limiters on the same file (e.g. two workers) share tokens."""
+        first = self._limiter(tmp_path, burst=1)
+        second = self._limiter(tmp_path, burst=1)
+        now = 1_000.0
+
+        assert first.reserve("search", now=now) == 0
+        assert second.reserve("search", now=now) > 0
+
+    def test_429_blocks_only_that_family(self, tmp_path):
+        """Test a 429 with Retry-After blocks the family until it expires."""
+        limiter = self._limiter(tmp_path, burst=5)
+        now = 1_000.0
+
+        limiter.update_from_response("search", 429, {"retry-after": "30"}, now=now)
+
+        assert limiter.reserve("search", now=now) == pytest.approx(30.0)
+        assert limiter.reserve("enrichment", now=now) == 0
+        assert limiter.reserve("search", now=now + 30) == 0
+
+    def test_headers_set_rate_and_cap_tokens(self, tmp_path):
+        """Test X-RateLimit-Limit sets the rate and Remaining caps tokens."""
+        limiter = self._limiter(tmp_path, per_minute=60, burst=5)
+        now = 1_000.0
+
+        limiter.update_from_response(
+            "search",
+            200,
+            {"x-ratelimit-limit": "{'minute': 600}", "x-ratelimit-remaining": "0"},
+            now=now,
+        )
+
+        # No tokens left, refill at 10/second
+        assert limiter.reserve("search", now=now) == pytest.approx(0.1)
+
+    def test_parse_per_minute_formats(self):
+        """Test both plain and dict-style rate-limit header values."""
+        assert _parse_per_minute("100") == 100
+        assert _parse_per_minute("{'minute': 42}") == 42
+        assert _parse_per_minute('{"minute": 7}') == 7
+        assert _parse_per_minute(None) is None
+
+    @pytest.mark.asyncio
+    async def test_client_feeds_response_headers_to_limiter(self, tmp_path):
+        """Test AsyncPDLClient reports 429 responses to the limiter."""
+        limiter = self._limiter(tmp_path, burst=5)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                429,
+                headers={"Retry-After": "120"},
+                json={"status": 429, "error": {"message": "Rate limited"}},
+            )
+
+        async with _make_client(handler, rate_limiter=limiter) as client:
+            response = await client.person_search(sql_query="SELECT * FROM person")
+
+        assert response["status"] == 429
+        assert limiter.reserve("search") > 100
@@ -2,28 +2,41 @@
 Tests for Persons API endpoints.
 """
 
+import asyncio
+import gzip
 import json
 import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
 from src.main import app
 from src.schema.icp import ICP
+from src.utils.field_profiles import person_fields
+from src.utils.prospect_store import ProspectStore
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def prospect_store(tmp_path):
+    """Point the prospect store at a temporary database."""
+    store = ProspectStore(str(tmp_path / "prospect_store.sqlite3"))
+    with patch("src.utils.prospect_store._prospect_store", store):
+        yield store
+    store.close()
+
+
 class TestSearchPersonsAPI:
     """Test cases for search_persons endpoint."""
 
-    @patch("src.api.persons.get_pdl_client")
+    @patch("src.api.persons.get_async_pdl_client")
     def test_search_persons_success(self, mock_get_client):
         """Test successful search persons request."""
         # Mock PDL client response
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_client.person_search.return_value = {
             "status": 200,
             "total": 2,
@@ -71,10 +84,54 @@ class TestSearchPersonsAPI:
         assert data["persons"][0]["id"] == "pdl-123"
         assert data["scroll_token"] == "next_page_token"
 
-    @patch("src.api.persons.get_pdl_client")
+    @patch("src.api.persons.get_async_pdl_client")
+    def test_search_persons_field_profile(self, mock_get_client):
+        """Test a named field profile is passed to PDL as a field projection."""
+        mock_client = AsyncMock()
+        mock_client.person_search.return_value = {"status": 200, "data": []}
+        mock_get_client.return_value = mock_client
+
+        request_data = {"number_of_persons": 5, "icp": {}, "field_profile": "minimal"}
+
+        response = client.post("/api/v1/search_persons", json=request_data)
+
+        assert response.status_code == 200
+        fields = mock_client.person_search.call_args.kwargs["fields"]
+        assert fields == person_fields("minimal")
+
+    @patch("src.api.persons.get_async_pdl_client")
+    def test_search_persons_over_one_page_follows_scroll(self, mock_get_client):
+        """Test more than 100 persons are collected across scroll pages."""
+
+        async def pages():
+            for token, count in (("t1", 100), ("t2", 50)):
+                yield {
+                    "status": 200,
+                    "total": 500,
+                    "data": [{"id": token}] * count,
+                    "scroll_token": token,
+                }
+
+        mock_client = AsyncMock()
+        mock_client.iter_person_search = MagicMock(return_value=pages())
+        mock_get_client.return_value = mock_client
+
+        response = client.post(
+            "/api/v1/search_persons", json={"number_of_persons": 150, "icp": {}}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["persons"]) == 150
+        assert data["persons_found"] == 500
+        assert data["scroll_token"] == "t2"
+        assert mock_client.iter_person_search.call_args.kwargs["limit"] == 150
+        mock_client.person_search.assert_not_called()
+
+    @patch("src.api.persons.get_async_pdl_client")
     def test_search_persons_pdl_error(self, mock_get_client):
         """Test search persons when PDL returns error."""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_client.person_search.return_value = {
             "status": 400,
             "error": {"message": "Invalid query"},
@@ -106,11 +163,13 @@ class TestSearchPersonsAPI:
 class TestEnrichPersonsAPI:
     """Test cases for enrich_persons endpoint."""
 
-    @patch("src.api.persons.get_pdl_client")
+    @patch("src.api.persons.get_async_pdl_client")
     @patch("src.api.persons._export_persons_to_json")
-    def test_enrich_persons_success(self, mock_export, mock_get_client):
+    def test_enrich_persons_success(
+        self, mock_export, mock_get_client, prospect_store
+    ):
         """Test successful enrich persons request."""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_client.person_search.return_value = {
             "status": 200,
             "total": 1,
@@ -158,9 +217,240 @@ class TestEnrichPersonsAPI:
         assert data["export_file"] is not None
         # Verify bulk enrichment was called with the PDL IDs from search
         mock_client.person_bulk_enrichment.assert_called_once_with(
-            pdl_ids=["pdl-789"]
+            pdl_ids=["pdl-789"], fields=None, cache_mode="use"
+        )
+        # Enriched persons are kept in the store under the returned run
+        stored, _ = prospect_store.query_persons(work_email_domain="example.com")
+        assert [person["id"] for person in stored] == ["pdl-789"]
+        assert prospect_store.list_runs()[0]["run_id"] == data["run_id"]
+
+    @patch("src.api.persons.get_async_pdl_client")
+    @patch("src.api.persons._export_persons_to_json")
+    def test_enrich_persons_by_ids_uses_bulk(self, mock_export, mock_get_client):
+        """Test person_ids are enriched with one bulk call, not per-ID calls."""
+        mock_client = AsyncMock(bulk_concurrency=10)
+        mock_client.person_bulk_enrichment.return_value = [
+            {"status": 200, "data": {"id": "pdl-1"}},
+            {"status": 404, "error": {"message": "Not found"}},
+        ]
+        mock_get_client.return_value = mock_client
+        mock_export.return_value = "/exports/persons_20260120_120000.json"
+
+        request_data = {
+            "number_of_persons": 2,
+            "icp": {},
+            "person_ids": ["pdl-1", "pdl-2", "pdl-3"],
+        }
+
+        response = client.post("/api/v1/enrich_persons", json=request_data)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["persons_enriched"] == 1
+        mock_client.person_bulk_enrichment.assert_called_once_with(
+            pdl_ids=["pdl-1", "pdl-2"], fields=None, cache_mode="use"
+        )
+        mock_client.person_search.assert_not_called()
+        mock_client.person_enrichment.assert_not_called()
+
+    @patch("src.api.persons.get_async_pdl_client")
+    @patch("src.api.persons._export_persons_to_json")
+    def test_enrich_persons_by_ids_bounds_bulk_batches(
+        self, mock_export, mock_get_client
+    ):
+        """Test person_ids batches respect the client's bulk concurrency."""
+        in_flight = peak = 0
+
+        async def bulk(pdl_ids, fields, cache_mode):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [{"status": 200, "data": {"id": pdl_id}} for pdl_id in pdl_ids]
+
+        mock_client = AsyncMock(bulk_concurrency=2)
+        mock_client.person_bulk_enrichment.side_effect = bulk
+        mock_get_client.return_value = mock_client
+        mock_export.return_value = "/exports/persons_20260120_120000.json"
+
+        person_ids = [f"pdl-{i}" for i in range(500)]
+        response = client.post(
+            "/api/v1/enrich_persons",
+            json={"number_of_persons": 500, "icp": {}, "person_ids": person_ids},
+        )
+
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()["persons"]] == person_ids
+        assert mock_client.person_bulk_enrichment.call_count == 5
+        assert peak == 2
+
+    @patch("src.api.persons.get_async_pdl_client")
+    @patch("src.api.persons._export_persons_to_json")
+    def test_enrich_persons_pipelines_pages_into_bulk(
+        self, mock_export, mock_get_client
+    ):
+        """Test each search page is enriched while the next page is fetched."""
+        events: list[str] = []
+
+        async def pages():
+            for page in range(3):
+                events.append(f"page{page}")
+                yield {
+                    "status": 200,
+                    "data": [{"id": f"p{page}-{i}"} for i in range(100)],
+                    "scroll_token": f"t{page}",
+                }
+                await asyncio.sleep(0)
+
+        async def bulk(pdl_ids, fields, cache_mode):
+            events.append(f"bulk:{pdl_ids[0]}")
+            return [{"status": 200, "data": {"id": pdl_id}} for pdl_id in pdl_ids]
+
+        mock_client = AsyncMock(bulk_concurrency=10)
+        mock_client.iter_person_search = MagicMock(return_value=pages())
+        mock_client.person_bulk_enrichment.side_effect = bulk
+        mock_get_client.return_value = mock_client
+        mock_export.return_value = "/exports/persons_20260120_120000.json"
+
+        response = client.post(
+            "/api/v1/enrich_persons", json={"number_of_persons": 300, "icp": {}}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["persons_enriched"] == 300
+        assert data["persons"][0]["id"] == "p0-0"
+        assert data["persons"][-1]["id"] == "p2-99"
+        assert mock_client.person_bulk_enrichment.call_count == 3
+        assert events.index("bulk:p0-0") < events.index("page1")
+        mock_client.person_search.assert_not_called()
+
+    @patch("src.api.persons.get_async_pdl_client")
+    @patch("src.api.persons._export_persons_to_json")
+    def test_enrich_persons_pages_bound_bulk_enrichment(
+        self, mock_export, mock_get_client
+    ):
+        """Test page enrichments respect the client's bulk concurrency."""
+        in_flight = peak = 0
+
+        async def pages():
+            for page in range(5):
+                yield {
+                    "status": 200,
+                    "data": [{"id": f"p{page}-{i}"} for i in range(100)],
+                    "scroll_token": f"t{page}",
+                }
+
+        async def bulk(pdl_ids, fields, cache_mode):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [{"status": 200, "data": {"id": pdl_id}} for pdl_id in pdl_ids]
+
+        mock_client = AsyncMock(bulk_concurrency=2)
+        mock_client.iter_person_search = MagicMock(return_value=pages())
+        mock_client.person_bulk_enrichment.side_effect = bulk
+        mock_get_client.return_value = mock_client
+        mock_export.return_value = "/exports/persons_20260120_120000.json"
+
+        response = client.post(
+            "/api/v1/enrich_persons", json={"number_of_persons": 500, "icp": {}}
         )
 
+        assert response.status_code == 200
+        persons = response.json()["persons"]
+        assert len(persons) == 500
+        assert persons[0]["id"] == "p0-0"
+        assert persons[-1]["id"] == "p4-99"
+        assert mock_client.person_bulk_enrichment.call_count == 5
+        assert peak == 2
+
+    @patch("src.api.persons.get_async_pdl_client")
+    def test_enrich_persons_pipeline_first_page_error(self, mock_get_client):
+        """Test a failed first search page reports a search failure."""
+
+        async def pages():
+            yield {"status": 402, "error": {"message": "Out of credits"}}
+
+        mock_client = AsyncMock(bulk_concurrency=10)
+        mock_client.iter_person_search = MagicMock(return_value=pages())
+        mock_get_client.return_value = mock_client
+
+        response = client.post(
+            "/api/v1/enrich_persons", json={"number_of_persons": 500, "icp": {}}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert data["status_code"] == 402
+        mock_client.person_bulk_enrichment.assert_not_called()
+
+    @patch("src.api.persons.get_async_pdl_client")
+    def test_enrich_persons_stream(self, mock_get_client, tmp_path, prospect_store):
+        """Test the NDJSON variant streams records, then a summary line."""
+        mock_client = AsyncMock(bulk_concurrency=10)
+        mock_client.person_bulk_enrichment.return_value = [
+            {"status": 200, "data": {"id": "pdl-1"}},
+            {"status": 404, "error": {"message": "Not found"}},
+        ]
+        mock_get_client.return_value = mock_client
+
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            response = client.post(
+                "/api/v1/enrich_persons/stream",
+                json={
+                    "number_of_persons": 2,
+                    "icp": {},
+                    "person_ids": ["pdl-1", "pdl-2"],
+                },
+            )
+
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {"record": {"id": "pdl-1"}}
+        assert lines[1]["summary"]["persons_enriched"] == 1
+        # Batches are written to the export as they are streamed
+        with open(lines[1]["summary"]["export_file"], encoding="utf-8") as f:
+            exported = json.load(f)
+        assert exported["total_persons"] == 1
+        assert exported["persons"] == [{"id": "pdl-1"}]
+        stored, _ = prospect_store.query_persons(run_id=lines[1]["summary"]["run_id"])
+        assert stored == [{"id": "pdl-1"}]
+
+    @patch("src.api.persons.get_async_pdl_client")
+    def test_enrich_persons_stream_sharded_export(self, mock_get_client, tmp_path):
+        """Test the stream writes a gzip JSONL export when requested."""
+        mock_client = AsyncMock(bulk_concurrency=10)
+        mock_client.person_bulk_enrichment.return_value = [
+            {"status": 200, "data": {"id": "pdl-1"}},
+            {"status": 200, "data": {"id": "pdl-2"}},
+        ]
+        mock_get_client.return_value = mock_client
+
+        with patch("src.utils.export_writer.EXPORTS_DIRECTORY", str(tmp_path)):
+            response = client.post(
+                "/api/v1/enrich_persons/stream",
+                json={
+                    "number_of_persons": 2,
+                    "icp": {},
+                    "person_ids": ["pdl-1", "pdl-2"],
+                    "export_format": "jsonl_gzip",
+                },
+            )
+
+        summary = json.loads(response.text.splitlines()[-1])["summary"]
+        with open(summary["export_file"], encoding="utf-8") as f:
+            manifest = json.load(f)
+        assert manifest["total_persons"] == 2
+        (shard,) = manifest["shards"]
+        shard_path = os.path.join(os.path.dirname(summary["export_file"]), shard["path"])
+        with gzip.open(shard_path, "rt", encoding="utf-8") as f:
+            assert [json.loads(line)["id"] for line in f] == ["pdl-1", "pdl-2"]
+
     def test_enrich_persons_validation_error(self):
         """Test enrich persons with invalid request."""
         request_data = {
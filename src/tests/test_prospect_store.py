@@ -0,0 +1,298 @@
+"""
+Tests for the local prospect store and its query API.
+"""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.utils.prospect_store import (
+    ProspectStore,
+    store_companies,
+    store_persons,
+    work_email_domain,
+)
+
+
+client = TestClient(app)
+
+
+def person(pdl_id: str, company_id: str = "c1", email: str | None = None) -> dict:
+    return {
+        "id": pdl_id,
+        "full_name": f"Person {pdl_id}",
+        "job_company_id": company_id,
+        "work_email": email,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProspectStore(str(tmp_path / "prospect_store.sqlite3"), batch_size=2)
+    with patch("src.utils.prospect_store._prospect_store", store):
+        yield store
+    store.close()
+
+
+class TestProspectStore:
+    """Test cases for ProspectStore."""
+
+    def test_upsert_and_lookup_by_pdl_id(self, store):
+        """Test persons are stored once and returned by PDL ID."""
+        written = store.upsert_persons([person("p1"), person("p2"), person("p3")])
+
+        records, cursor = store.query_persons(pdl_ids=["p3", "p1"])
+
+        assert written == 3
+        assert [record["id"] for record in records] == ["p1", "p3"]
+        assert cursor is None
+
+    def test_upsert_keeps_latest_payload_and_first_seen(self, store):
+        """Test re-fetched persons are updated in place."""
+        store.upsert_persons([person("p1", company_id="c1")], now=100)
+        store.upsert_persons([person("p1", company_id="c2")], now=200)
+
+        records, _ = store.query_persons(job_company_ids=["c2"])
+        row = store._conn.execute(
+            "SELECT first_seen_at, updated_at FROM persons WHERE pdl_id = 'p1'"
+        ).fetchone()
+
+        assert [record["job_company_id"] for record in records] == ["c2"]
+        assert store.query_persons(job_company_ids=["c1"])[0] == []
+        assert row == (100, 200)
+
+    def test_smaller_payload_does_not_drop_stored_fields(self, store):
+        """Test a later minimal or search-only record is merged, not swapped in."""
+        enriched = person("p1", email="ann@acme.com") | {
+            "headline": "VP Sales",
+            "skills": ["sales"],
+        }
+        store.upsert_persons([enriched])
+        # Minimal profile: fewer fields, one of them refreshed
+        store.upsert_persons([{"id": "p1", "full_name": "Ann Smith"}])
+        # Search-only fallback: no email on file
+        store.upsert_persons([{"id": "p1", "work_email": None, "skills": None}])
+
+        (record,), _ = store.query_persons(pdl_ids=["p1"])
+        by_domain, _ = store.query_persons(work_email_domain="acme.com")
+
+        assert record == enriched | {"full_name": "Ann Smith"}
+        assert [r["id"] for r in by_domain] == ["p1"]
+
+    def test_repeated_record_in_one_batch_is_merged(self, store):
+        """Test duplicates within a batch merge into each other."""
+        store.upsert_persons(
+            [{"id": "p1", "headline": "VP"}, {"id": "p1", "full_name": "Ann"}]
+        )
+
+        assert store.query_persons()[0] == [
+            {"id": "p1", "headline": "VP", "full_name": "Ann"}
+        ]
+
+    def test_records_without_id_are_skipped(self, store):
+        """Test records PDL returned without an ID are not stored."""
+        assert store.upsert_persons([{"full_name": "No ID"}, person("p1")]) == 1
+
+    def test_lookup_by_work_email_domain(self, store):
+        """Test the work email domain is indexed case-insensitively."""
+        store.upsert_persons(
+            [
+                person("p1", email="Ann@Acme.com"),
+                person("p2", email="bob@other.io"),
+                # Free plans return a flag instead of the address
+                {"id": "p3", "work_email": True},
+            ]
+        )
+
+        records, _ = store.query_persons(work_email_domain="ACME.COM")
+
+        assert [record["id"] for record in records] == ["p1"]
+
+    def test_filters_by_run(self, store):
+        """Test persons are linked to every run that fetched them."""
+        store.start_run("r1", "prospects_generate", {"job_title_role": ["sales"]})
+        store.start_run("r2", "persons_enrich", None)
+        store.upsert_persons([person("p1"), person("p2")], run_id="r1")
+        store.upsert_persons([person("p2"), person("p3")], run_id="r2")
+
+        records, _ = store.query_persons(run_id="r2")
+        runs = {run["run_id"]: run for run in store.list_runs()}
+
+        assert [record["id"] for record in records] == ["p2", "p3"]
+        assert runs["r1"]["persons"] == 2
+        assert runs["r1"]["icp"] == {"job_title_role": ["sales"]}
+        assert runs["r2"]["icp"] is None
+
+    def test_filters_combine(self, store):
+        """Test filters are combined with AND."""
+        store.upsert_persons(
+            [
+                person("p1", company_id="c1", email="a@acme.com"),
+                person("p2", company_id="c2", email="b@acme.com"),
+            ]
+        )
+
+        records, _ = store.query_persons(
+            job_company_ids=["c1", "c2"], work_email_domain="acme.com", pdl_ids=["p2"]
+        )
+
+        assert [record["id"] for record in records] == ["p2"]
+
+    def test_cursor_pages_through_results(self, store):
+        """Test keyset paging returns every record exactly once."""
+        store.upsert_persons([person(f"p{i}") for i in range(5)])
+
+        seen, cursor = [], None
+        while True:
+            records, cursor = store.query_persons(after=cursor, limit=2)
+            seen += [record["id"] for record in records]
+            if cursor is None:
+                break
+
+        assert seen == ["p0", "p1", "p2", "p3", "p4"]
+
+    def test_failed_batch_is_rolled_back(self, store):
+        """Test an upsert batch is written in one transaction."""
+        with patch.object(
+            store, "_link", side_effect=sqlite3.OperationalError("disk full")
+        ):
+            with pytest.raises(sqlite3.OperationalError):
+                store.upsert_persons([person("p1")], run_id="r1")
+
+        assert store.query_persons()[0] == []
+
+    def test_companies(self, store):
+        """Test companies are upserted and looked up by ID and run."""
+        store.start_run("r1", "companies_enrich", {"company_ids": ["c1", "c2"]})
+        store.upsert_companies(
+            [{"id": "c1", "name": "Acme"}, {"id": "c2", "name": "Globex"}],
+            run_id="r1",
+        )
+
+        by_id, _ = store.query_companies(pdl_ids=["c2"])
+        by_run, _ = store.query_companies(run_id="r1")
+
+        assert by_id == [{"id": "c2", "name": "Globex"}]
+        assert len(by_run) == 2
+        assert store.list_runs()[0]["companies"] == 2
+
+    def test_company_payloads_are_merged(self, store):
+        """Test a re-fetched company keeps fields the new record lacks."""
+        store.upsert_companies([{"id": "c1", "name": "Acme", "size": "51-200"}])
+        store.upsert_companies([{"id": "c1", "name": "Acme Inc", "size": None}])
+
+        assert store.query_companies()[0] == [
+            {"id": "c1", "name": "Acme Inc", "size": "51-200"}
+        ]
+
+    def test_work_email_domain(self):
+        """Test the domain is taken from the work email only."""
+        assert work_email_domain({"work_email": "x@Sub.Example.com "}) == "sub.example.com"
+        assert work_email_domain({"work_email": None}) is None
+        assert work_email_domain({"work_email": False}) is None
+        assert work_email_domain({}) is None
+
+
+class TestStoreHelpers:
+    """Test cases for the async store helpers."""
+
+    @pytest.mark.asyncio
+    async def test_store_persons_reuses_run(self, store):
+        """Test later batches are added to the run of the first."""
+        run_id = await store_persons([person("p1")], "persons_enrich", {})
+        again = await store_persons([person("p2")], "persons_enrich", {}, run_id)
+
+        records, _ = store.query_persons(run_id=run_id)
+
+        assert again == run_id
+        assert len(store.list_runs()) == 1
+        assert [record["id"] for record in records] == ["p1", "p2"]
+
+    @pytest.mark.asyncio
+    async def test_store_companies(self, store):
+        """Test companies are stored under a new run."""
+        run_id = await store_companies([{"id": "c1"}], "companies_enrich", None)
+
+        assert store.query_companies(run_id=run_id)[0] == [{"id": "c1"}]
+
+    @pytest.mark.asyncio
+    async def test_disabled_store_is_skipped(self, store):
+        """Test nothing is stored when the store is disabled."""
+        with patch("src.utils.prospect_store.settings.prospect_store_enabled", False):
+            run_id = await store_persons([person("p1")], "persons_enrich", {})
+
+        assert run_id is None
+        assert store.query_persons()[0] == []
+
+
+class TestStoreAPI:
+    """Test cases for the /api/v1/store endpoints."""
+
+    def test_query_prospects(self, store):
+        """Test stored persons are queried without calling PDL."""
+        store.upsert_persons(
+            [
+                person("p1", company_id="c1", email="a@acme.com"),
+                person("p2", company_id="c2"),
+                person("p3", company_id="c1"),
+            ]
+        )
+
+        response = client.get(
+            "/api/v1/store/prospects",
+            params={"job_company_id": ["c1"], "limit": 1},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 1
+        assert data["records"][0]["id"] == "p1"
+        assert data["next_cursor"] == "p1"
+
+        next_page = client.get(
+            "/api/v1/store/prospects",
+            params={"job_company_id": ["c1"], "cursor": data["next_cursor"]},
+        ).json()
+        assert [record["id"] for record in next_page["records"]] == ["p3"]
+        assert next_page["next_cursor"] is None
+
+    def test_query_prospects_by_domain_and_id(self, store):
+        """Test the work email domain and PDL ID filters."""
+        store.upsert_persons(
+            [person("p1", email="a@acme.com"), person("p2", email="b@acme.com")]
+        )
+
+        response = client.get(
+            "/api/v1/store/prospects",
+            params={"work_email_domain": "acme.com", "pdl_id": ["p2", "p9"]},
+        )
+
+        assert [record["id"] for record in response.json()["records"]] == ["p2"]
+
+    def test_query_companies_and_runs(self, store):
+        """Test stored companies and runs are listed."""
+        store.start_run("r1", "companies_enrich", {"company_ids": ["c1"]})
+        store.upsert_companies([{"id": "c1", "name": "Acme"}], run_id="r1")
+
+        companies = client.get("/api/v1/store/companies", params={"run_id": "r1"})
+        runs = client.get("/api/v1/store/runs")
+
+        assert companies.json()["records"] == [{"id": "c1", "name": "Acme"}]
+        assert runs.json()["runs"][0]["run_id"] == "r1"
+        assert runs.json()["runs"][0]["companies"] == 1
+
+    def test_limit_is_bounded(self, store):
+        """Test page sizes above the maximum are rejected."""
+        response = client.get("/api/v1/store/prospects", params={"limit": 5000})
+
+        assert response.status_code == 422
+
+    def test_disabled_store_returns_404(self, store):
+        """Test the endpoints report a disabled store."""
+        with patch("src.utils.prospect_store.settings.prospect_store_enabled", False):
+            response = client.get("/api/v1/store/prospects")
+
+        assert response.status_code == 404
@@ -8,23 +8,43 @@ The new API uses CombinedICP which automatically detects mode:
 - Otherwise → Direct flow
 """
 
+import asyncio
+import json
+import re
+import time
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 
+from src.api.prospects import _stream_prospects
+from src.core.config import settings
 from src.main import app
+from src.schema.prospects import ProspectSearchRequest
+from src.utils.checkpoint import CheckpointLease, RunCheckpoint
+from src.utils.prospect_store import ProspectStore
+from src.utils.resilience import PDLUnavailableError
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def prospect_store(tmp_path):
+    """Point the prospect store at a temporary database."""
+    store = ProspectStore(str(tmp_path / "prospect_store.sqlite3"))
+    with patch("src.utils.prospect_store._prospect_store", store):
+        yield store
+    store.close()
+
+
 class TestProspectsPreviewAPI:
     """Test cases for POST /api/v1/prospects/preview endpoint."""
 
-    @patch("src.api.prospects.get_pdl_client")
+    @patch("src.api.prospects.get_async_pdl_client")
     def test_preview_sic_based_success(self, mock_get_client):
         """Test SIC-based mode (with sic_code) preview returns companies and persons."""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_get_client.return_value = mock_client
 
         # Mock company search response
@@ -65,10 +85,55 @@ class TestProspectsPreviewAPI:
         assert data["companies_found"] == 2
         assert data["persons_found"] == 2
 
-    @patch("src.api.prospects.get_pdl_client")
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_preview_sic_based_returns_resumable_cursor(self, mock_get_client):
+        """Test the SIC scroll_token resumes the person stage on the next page."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.company_search.return_value = {
+            "status": 200,
+            "data": [{"id": "company1"}],
+            "scroll_token": "company-page-2",
+        }
+        mock_client.person_search.return_value = {
+            "status": 200,
+            "data": [{"id": "person1"}],
+            "scroll_token": "person-page-2",
+        }
+        body = {"size": 1, "icp": {"sic_code": ["7371"]}}
+
+        first = client.post("/api/v1/prospects/preview", json=body).json()
+        second = client.post(
+            "/api/v1/prospects/preview",
+            json={**body, "scroll_token": first["scroll_token"]},
+        ).json()
+
+        assert first["scroll_token"].startswith("sic1.")
+        assert second["persons_found"] == 1
+        # The pending shard resumed; no company page was re-fetched
+        assert mock_client.company_search.call_count == 1
+        assert mock_client.person_search.call_args.kwargs["scroll_token"] == (
+            "person-page-2"
+        )
+
+    def test_preview_rejects_malformed_sic_cursor(self):
+        """Test a corrupted SIC cursor returns 400."""
+        with patch("src.api.prospects.get_async_pdl_client", return_value=AsyncMock()):
+            response = client.post(
+                "/api/v1/prospects/preview",
+                json={
+                    "size": 1,
+                    "scroll_token": "sic1.garbage",
+                    "icp": {"sic_code": ["7371"]},
+                },
+            )
+
+        assert response.status_code == 400
+
+    @patch("src.api.prospects.get_async_pdl_client")
     def test_preview_direct_mode_success(self, mock_get_client):
         """Test direct mode (without sic/naics codes) searches persons WITHOUT enrichment."""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_get_client.return_value = mock_client
 
         # Mock person search response
@@ -104,8 +169,8 @@ class TestProspectsPreviewAPI:
     def test_preview_empty_icp_is_valid(self):
         """Test that empty ICP is valid (direct mode)."""
         # This should fail at PDL call level, not validation level
-        with patch("src.api.prospects.get_pdl_client") as mock_get_client:
-            mock_client = MagicMock()
+        with patch("src.api.prospects.get_async_pdl_client") as mock_get_client:
+            mock_client = AsyncMock()
             mock_get_client.return_value = mock_client
             mock_client.person_search.return_value = {
                 "status": 200,
@@ -127,10 +192,10 @@ class TestProspectsPreviewAPI:
 class TestProspectsGenerateAPI:
     """Test cases for POST /api/v1/prospects/generate endpoint."""
 
-    @patch("src.api.prospects.get_pdl_client")
+    @patch("src.api.prospects.get_async_pdl_client")
     def test_generate_sic_based_with_enrichment(self, mock_get_client):
         """Test SIC-based generate includes enrichment and exports to file."""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_get_client.return_value = mock_client
 
         # Mock company search response
@@ -150,15 +215,25 @@ class TestProspectsGenerateAPI:
             ],
         }
 
-        # Mock person enrichment response
-        mock_client.person_enrichment.return_value = {
-            "status": 200,
-            "data": {
-                "id": "person1",
-                "full_name": "John Doe",
-                "work_email": "john@company.com",
+        # Mock bulk person enrichment response
+        mock_client.person_bulk_enrichment.return_value = [
+            {
+                "status": 200,
+                "data": {
+                    "id": "person1",
+                    "full_name": "John Doe",
+                    "work_email": "john@company.com",
+                },
             },
-        }
+            {
+                "status": 200,
+                "data": {
+                    "id": "person2",
+                    "full_name": "Jane Smith",
+                    "work_email": "jane@company.com",
+                },
+            },
+        ]
 
         response = client.post(
             "/api/v1/prospects/generate",
@@ -177,13 +252,16 @@ class TestProspectsGenerateAPI:
         assert data["mode"] == "sic_based"
         assert data["export_path"] is not None
         assert "prospects_" in data["export_path"]
-        # Generate SHOULD call enrichment for SIC-based mode too
-        assert mock_client.person_enrichment.call_count == 2
+        # Generate SHOULD call enrichment for SIC-based mode too, in one bulk call
+        mock_client.person_bulk_enrichment.assert_called_once_with(
+            pdl_ids=["person1", "person2"], fields=None, cache_mode="use"
+        )
+        mock_client.person_enrichment.assert_not_called()
 
-    @patch("src.api.prospects.get_pdl_client")
-    def test_generate_direct_mode_with_enrichment(self, mock_get_client):
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_generate_direct_mode_with_enrichment(self, mock_get_client, prospect_store):
         """Test direct mode generate includes enrichment and exports to file."""
-        mock_client = MagicMock()
+        mock_client = AsyncMock()
         mock_get_client.return_value = mock_client
 
         # Mock person search response
@@ -196,15 +274,25 @@ class TestProspectsGenerateAPI:
             ],
         }
 
-        # Mock person enrichment response
-        mock_client.person_enrichment.return_value = {
-            "status": 200,
-            "data": {
-                "id": "person1",
-                "full_name": "John Doe",
-                "work_email": "john@company.com",
+        # Mock bulk person enrichment response
+        mock_client.person_bulk_enrichment.return_value = [
+            {
+                "status": 200,
+                "data": {
+                    "id": "person1",
+                    "full_name": "John Doe",
+                    "work_email": "john@company.com",
+                },
             },
-        }
+            {
+                "status": 200,
+                "data": {
+                    "id": "person2",
+                    "full_name": "Jane Smith",
+                    "work_email": "jane@company.com",
+                },
+            },
+        ]
 
         response = client.post(
             "/api/v1/prospects/generate",
@@ -223,5 +311,522 @@ class TestProspectsGenerateAPI:
         assert data["mode"] == "direct"
         assert data["export_path"] is not None
         assert "prospects_" in data["export_path"]
-        # Generate SHOULD call enrichment for direct mode
-        assert mock_client.person_enrichment.call_count == 2
+        # Generate SHOULD call enrichment for direct mode, in one bulk call
+        mock_client.person_bulk_enrichment.assert_called_once_with(
+            pdl_ids=["person1", "person2"], fields=None, cache_mode="use"
+        )
+        # Generated persons are kept in the store under the returned run
+        stored, _ = prospect_store.query_persons(run_id=data["run_id"])
+        assert [person["id"] for person in stored] == ["person1", "person2"]
+        run = prospect_store.list_runs()[0]
+        assert run["kind"] == "prospects_generate"
+        assert run["icp"]["job_title_role"] == ["engineering"]
+
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_generate_enrichment_falls_back_to_search_data(self, mock_get_client):
+        """Test failed enrichments keep search data and preserve order."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+
+        mock_client.person_search.return_value = {
+            "status": 200,
+            "total": 3,
+            "data": [
+                {"id": "person1", "full_name": "John Doe"},
+                {"id": "person2", "full_name": "Jane Smith"},
+                {"id": "person3", "full_name": "Sam Lee"},
+            ],
+        }
+
+        # person2 is not matched, person3 has no enrichment data
+        mock_client.person_bulk_enrichment.return_value = [
+            {"status": 200, "data": {"id": "person1", "work_email": "j@x.com"}},
+            {"status": 404, "error": {"message": "Not found"}},
+            {"status": 200, "data": None},
+        ]
+
+        with patch("src.api.prospects._export_prospects_to_json") as mock_export:
+            mock_export.return_value = "/exports/prospects_test.json"
+            response = client.post(
+                "/api/v1/prospects/generate",
+                json={"size": 10, "icp": {"job_title_role": ["engineering"]}},
+            )
+
+        assert response.status_code == 200
+        exported = mock_export.call_args.args[0]
+        assert [p["id"] for p in exported] == ["person1", "person2", "person3"]
+        assert exported[0]["work_email"] == "j@x.com"
+        assert exported[1] == {"id": "person2", "full_name": "Jane Smith"}
+        assert exported[2] == {"id": "person3", "full_name": "Sam Lee"}
+
+
+class TestProspectsFillToTarget:
+    """Test cases for fill_to_target (top-up) mode."""
+
+    @staticmethod
+    def _paged_person_search(mock_client, pages):
+        async def person_search(size, scroll_token=None, **kwargs):
+            offset = int(scroll_token) if scroll_token else 0
+            end = min(offset + size, pages)
+            data = [{"id": f"person{i}"} for i in range(offset, end)]
+            next_offset = offset + len(data)
+            return {
+                "status": 200,
+                "data": data,
+                "scroll_token": str(next_offset) if next_offset < pages else None,
+            }
+
+        mock_client.person_search.side_effect = person_search
+
+    @patch("src.api.prospects._export_prospects_to_json")
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_generate_direct_replaces_unenrichable_persons(
+        self, mock_get_client, mock_export
+    ):
+        """Test persons whose enrichment fails are replaced from later pages."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_export.return_value = "/exports/prospects_test.json"
+        self._paged_person_search(mock_client, pages=20)
+
+        async def bulk(pdl_ids, fields, cache_mode):
+            # Every other person cannot be enriched
+            return [
+                {"status": 200 if int(i[6:]) % 2 == 0 else 404, "data": {"id": i}}
+                for i in pdl_ids
+            ]
+
+        mock_client.person_bulk_enrichment.side_effect = bulk
+
+        response = client.post(
+            "/api/v1/prospects/generate",
+            json={
+                "size": 4,
+                "fill_to_target": True,
+                "icp": {"job_title_role": ["engineering"]},
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["persons_generated"] == 4
+        assert data["message"] is None
+        exported = mock_export.call_args.args[0]
+        assert [p["id"] for p in exported] == [
+            "person0", "person2", "person4", "person6"
+        ]
+
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_preview_stops_at_search_budget(self, mock_get_client):
+        """Test top-up stops at max_search_calls and explains the shortfall."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.company_search.side_effect = [
+            {"status": 200, "data": [{"id": f"company{i}"}], "scroll_token": f"t{i}"}
+            for i in range(10)
+        ]
+        mock_client.person_search.return_value = {"status": 200, "data": []}
+
+        response = client.post(
+            "/api/v1/prospects/preview",
+            json={
+                "size": 5,
+                "fill_to_target": True,
+                "max_search_calls": 4,
+                "icp": {"sic_code": ["7371"]},
+            },
+        )
+
+        data = response.json()
+        assert data["success"] is True
+        assert data["persons_found"] == 0
+        assert "search budget was exhausted" in data["message"]
+        total_calls = (
+            mock_client.company_search.call_count
+            + mock_client.person_search.call_count
+        )
+        assert total_calls == 4
+
+
+class TestProspectsPDLUnavailable:
+    """Test behavior when the PDL circuit breaker is open."""
+
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_preview_returns_503_when_breaker_open(self, mock_get_client):
+        """Test an open circuit breaker maps to 503 Service Unavailable."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.person_search.side_effect = PDLUnavailableError("breaker open")
+
+        response = client.post(
+            "/api/v1/prospects/preview",
+            json={"size": 10, "icp": {"job_title_role": ["engineering"]}},
+        )
+
+        assert response.status_code == 503
+
+
+class TestProspectsStreamingAPI:
+    """Test cases for the NDJSON streaming preview/generate endpoints."""
+
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_preview_stream_emits_records_then_summary(self, mock_get_client):
+        """Test one record per line followed by a trailing summary line."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.person_search.return_value = {
+            "status": 200,
+            "data": [{"id": "person1"}, {"id": "person2"}],
+            "scroll_token": "next",
+        }
+
+        response = client.post(
+            "/api/v1/prospects/preview/stream",
+            json={"size": 2, "icp": {"job_title_role": ["engineering"]}},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[:2] == [
+            {"record": {"id": "person1"}},
+            {"record": {"id": "person2"}},
+        ]
+        summary = lines[-1]["summary"]
+        assert summary["success"] is True
+        assert summary["mode"] == "direct"
+        assert summary["persons_found"] == 2
+        assert summary["scroll_token"] == "next"
+        assert "preview_data" not in summary
+
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_generate_stream_emits_enriched_records(self, mock_get_client):
+        """Test generate streams enriched records and reports the export path."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.person_search.return_value = {
+            "status": 200,
+            "data": [{"id": "person1"}],
+        }
+        mock_client.person_bulk_enrichment.return_value = [
+            {"status": 200, "data": {"id": "person1", "work_email": "j@x.com"}}
+        ]
+
+        with patch("src.api.prospects._export_prospects_to_json") as mock_export:
+            mock_export.return_value = "/exports/prospects_test.json"
+            response = client.post(
+                "/api/v1/prospects/generate/stream",
+                json={"size": 1, "icp": {"job_title_role": ["engineering"]}},
+            )
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {"record": {"id": "person1", "work_email": "j@x.com"}}
+        assert lines[-1]["summary"]["persons_generated"] == 1
+        assert lines[-1]["summary"]["export_path"] == "/exports/prospects_test.json"
+
+    @pytest.mark.asyncio
+    @patch("src.api.prospects.get_async_pdl_client")
+    async def test_stream_sends_pages_before_the_flow_finishes(self, mock_get_client):
+        """Test each page is streamed while later pages are still searched."""
+        second_page = asyncio.Event()
+        calls = 0
+
+        async def search(**kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                await second_page.wait()
+            return {
+                "status": 200,
+                "data": [{"id": f"person{calls}"}],
+                "scroll_token": f"t{calls}",
+            }
+
+        mock_client = AsyncMock()
+        mock_client.person_search.side_effect = search
+        mock_get_client.return_value = mock_client
+        request = ProspectSearchRequest(
+            size=2, fill_to_target=True, icp={"job_title_role": ["engineering"]}
+        )
+
+        lines = _stream_prospects(request, generate=False).body_iterator
+        first = await asyncio.wait_for(anext(lines), timeout=5)
+
+        # The first page arrives while the second search is still blocked
+        assert json.loads(first) == {"record": {"id": "person1"}}
+        assert not second_page.is_set()
+        second_page.set()
+        rest = [json.loads(line) async for line in lines]
+        assert rest[0] == {"record": {"id": "person2"}}
+        assert rest[-1]["summary"]["persons_found"] == 2
+
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_stream_reports_errors_in_summary(self, mock_get_client):
+        """Test a failure after the stream starts ends with a failed summary."""
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.person_search.side_effect = PDLUnavailableError("search")
+
+        response = client.post(
+            "/api/v1/prospects/preview/stream",
+            json={"size": 10, "icp": {"job_title_role": ["engineering"]}},
+        )
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 1
+        assert lines[0]["summary"]["success"] is False
+
+
+def _wait_for_job(jobs_client: TestClient, job_id: str) -> dict:
+    """Poll a job until it has finished and return its status."""
+    for _ in range(200):
+        status = jobs_client.get(f"/api/v1/prospects/jobs/{job_id}").json()
+        if status["status"] in ("succeeded", "failed", "cancelled"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestProspectsJobsAPI:
+    """Test cases for background generate jobs."""
+
+    @patch("src.api.prospects._runs_directory")
+    @patch("src.api.prospects._export_prospects_to_json")
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_submit_poll_and_fetch_result(
+        self, mock_get_client, mock_export, mock_runs_dir, tmp_path, prospect_store
+    ):
+        """Test a job is accepted, runs in the background and yields a result."""
+        mock_runs_dir.return_value = str(tmp_path)
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.person_search.return_value = {
+            "status": 200,
+            "data": [{"id": "person1"}],
+        }
+        mock_client.person_bulk_enrichment.return_value = [
+            {"status": 200, "data": {"id": "person1", "work_email": "j@x.com"}}
+        ]
+        mock_export.return_value = "/exports/prospects_test.json"
+
+        with TestClient(app) as jobs_client:
+            response = jobs_client.post(
+                "/api/v1/prospects/jobs",
+                json={"size": 1, "icp": {"job_title_role": ["engineering"]}},
+            )
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            status = _wait_for_job(jobs_client, job_id)
+
+            assert status["stage"] == "done"
+            assert status["progress"]["persons_found"] == 1
+            result = jobs_client.get(f"/api/v1/prospects/jobs/{job_id}/result")
+            # The job ID is the store run ID (checked before shutdown
+            # closes the store)
+            stored, _ = prospect_store.query_persons(run_id=job_id)
+
+        assert result.status_code == 200
+        assert result.json()["persons_generated"] == 1
+        assert result.json()["export_path"] == "/exports/prospects_test.json"
+        assert result.json()["run_id"] == job_id
+        assert stored == [{"id": "person1", "work_email": "j@x.com"}]
+
+    @patch("src.api.prospects._runs_directory")
+    @patch("src.api.prospects._export_prospects_to_json")
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_failed_job_resumes_from_checkpoint(
+        self, mock_get_client, mock_export, mock_runs_dir, tmp_path
+    ):
+        """Test a resumed job continues after its last committed page."""
+        mock_runs_dir.return_value = str(tmp_path)
+        exported = []
+
+        async def export(prospects, request):
+            # The job streams its export from the checkpoint's partial file
+            exported.extend(prospects)
+            return "/exports/prospects_test.json"
+
+        mock_export.side_effect = export
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        pages = {
+            None: {"status": 200, "data": [{"id": "p1"}], "scroll_token": "t1"},
+            "t1": {"status": 200, "data": [{"id": "p2"}], "scroll_token": None},
+        }
+        outage = {"active": True}
+
+        async def person_search(scroll_token=None, **kwargs):
+            if scroll_token == "t1" and outage["active"]:
+                return {"status": 503, "error": {"message": "PDL outage"}}
+            return pages[scroll_token]
+
+        async def bulk(pdl_ids, fields, cache_mode):
+            return [{"status": 200, "data": {"id": i, "enriched": 1}} for i in pdl_ids]
+
+        mock_client.person_search.side_effect = person_search
+        mock_client.person_bulk_enrichment.side_effect = bulk
+        body = {"size": 1, "max_pages": 5, "icp": {"job_title_role": ["engineering"]}}
+
+        with TestClient(app) as jobs_client:
+            submitted = jobs_client.post("/api/v1/prospects/jobs", json=body)
+            job_id = submitted.json()["job_id"]
+            status = _wait_for_job(jobs_client, job_id)
+            assert status["status"] == "failed"
+            assert "PDL outage" in status["error"]
+
+            outage["active"] = False
+            resumed = jobs_client.post(f"/api/v1/prospects/jobs/{job_id}/resume")
+            assert resumed.status_code == 202
+            status = _wait_for_job(jobs_client, job_id)
+            result = jobs_client.get(f"/api/v1/prospects/jobs/{job_id}/result").json()
+
+        assert status["status"] == "succeeded"
+        assert result["persons_generated"] == 2
+        assert [p["id"] for p in exported] == ["p1", "p2"]
+        enriched_batches = [
+            call.kwargs["pdl_ids"]
+            for call in mock_client.person_bulk_enrichment.call_args_list
+        ]
+        assert enriched_batches == [["p1"], ["p2"]]
+        # The first page was fetched once; the resumed run started at "t1"
+        tokens = [
+            call.kwargs.get("scroll_token")
+            for call in mock_client.person_search.call_args_list
+        ]
+        assert tokens == [None, "t1", "t1"]
+
+    @patch.object(settings, "sic_company_batch_size", 1)
+    @patch("src.api.prospects._runs_directory")
+    @patch("src.api.prospects._export_prospects_to_json")
+    @patch("src.api.prospects.get_async_pdl_client")
+    def test_sic_job_pipelines_shards_and_resumes_from_cursor(
+        self, mock_get_client, mock_export, mock_runs_dir, tmp_path
+    ):
+        """Test a SIC job searches shards concurrently and resumes its cursor."""
+        mock_runs_dir.return_value = str(tmp_path)
+        exported = []
+
+        async def export(prospects, request):
+            exported.extend(p["id"] for p in prospects)
+            return "/exports/prospects_test.json"
+
+        mock_export.side_effect = export
+        mock_client = AsyncMock()
+        mock_get_client.return_value = mock_client
+        mock_client.company_search.return_value = {
+            "status": 200,
+            "data": [{"id": f"c{i}"} for i in range(1, 5)],
+        }
+        outage = {"active": True}
+        in_flight = peak = 0
+        searched = []
+
+        async def person_search(sql_query, **kwargs):
+            nonlocal in_flight, peak
+            (company_id,) = re.findall(r"'(c\d)'", sql_query)
+            searched.append(company_id)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if company_id == "c2" and outage["active"]:
+                return {"status": 503, "error": {"message": "PDL outage"}}
+            return {
+                "status": 200,
+                "data": [{"id": f"{company_id}-p{i}"} for i in range(2)],
+            }
+
+        async def bulk(pdl_ids, fields, cache_mode):
+            return [{"status": 200, "data": {"id": i}} for i in pdl_ids]
+
+        mock_client.person_search.side_effect = person_search
+        mock_client.person_bulk_enrichment.side_effect = bulk
+        # Target 300 persons, at most 3 person searches per attempt
+        body = {"size": 100, "max_pages": 3, "icp": {"sic_code": ["7371"]}}
+
+        with TestClient(app) as jobs_client:
+            job_id = jobs_client.post("/api/v1/prospects/jobs", json=body).json()[
+                "job_id"
+            ]
+            status = _wait_for_job(jobs_client, job_id)
+            assert status["status"] == "failed"
+            assert "PDL outage" in status["error"]
+            assert status["progress"]["persons_found"] == 4
+
+            outage["active"] = False
+            jobs_client.post(f"/api/v1/prospects/jobs/{job_id}/resume")
+            status = _wait_for_job(jobs_client, job_id)
+            result = jobs_client.get(f"/api/v1/prospects/jobs/{job_id}/result").json()
+
+        assert status["status"] == "succeeded"
+        assert peak > 1
+        # Budget of 3 person searches, less the 2 pages already committed:
+        # the resume retries only the failed shard, and c4 is left for later
+        assert searched == ["c1", "c2", "c3", "c2"]
+        assert mock_client.company_search.call_count == 1
+        assert sorted(exported) == ["c1-p0", "c1-p1", "c2-p0", "c2-p1", "c3-p0", "c3-p1"]
+        assert result["persons_generated"] == 6
+        assert result["companies_found"] == 4
+        assert result["scroll_token"] is not None
+
+    def test_resume_unknown_job_returns_404(self, tmp_path):
+        """Test resuming a job without a checkpoint returns 404."""
+        with patch("src.api.prospects._runs_directory", return_value=str(tmp_path)):
+            response = client.post("/api/v1/prospects/jobs/missing/resume")
+
+        assert response.status_code == 404
+
+    def test_job_rejects_fill_to_target(self):
+        """Test jobs reject fill_to_target instead of ignoring it."""
+        response = client.post(
+            "/api/v1/prospects/jobs",
+            json={"size": 1, "fill_to_target": True, "icp": {}},
+        )
+
+        assert response.status_code == 422
+
+    def test_resume_leased_job_returns_409(self, tmp_path):
+        """Test a job running on another worker cannot be resumed."""
+        checkpoint = RunCheckpoint(str(tmp_path), "job1")
+        checkpoint.begin({"size": 1, "icp": {}})
+
+        with patch("src.api.prospects._runs_directory", return_value=str(tmp_path)):
+            with CheckpointLease(str(tmp_path), "job1"):
+                response = client.post("/api/v1/prospects/jobs/job1/resume")
+
+        assert response.status_code == 409
+
+    def test_status_falls_back_to_checkpoint(self, tmp_path):
+        """Test jobs of other workers are reported from their checkpoints."""
+        finished = RunCheckpoint(str(tmp_path), "done1")
+        finished.begin({"size": 1, "icp": {}})
+        finished.commit([{"id": "p1"}], enriched_ids=["p1"], pages=1)
+        finished.finish(
+            {"success": True, "mode": "direct", "persons_generated": 1}
+        )
+        for job_id in ("running1", "stopped1"):
+            RunCheckpoint(str(tmp_path), job_id).begin({"size": 1, "icp": {}})
+
+        with patch("src.api.prospects._runs_directory", return_value=str(tmp_path)):
+            with CheckpointLease(str(tmp_path), "running1"):
+                done = client.get("/api/v1/prospects/jobs/done1").json()
+                result = client.get("/api/v1/prospects/jobs/done1/result").json()
+                running = client.get("/api/v1/prospects/jobs/running1").json()
+                cancel = client.delete("/api/v1/prospects/jobs/running1")
+            stopped = client.get("/api/v1/prospects/jobs/stopped1").json()
+
+        assert done["status"] == "succeeded"
+        assert done["progress"] == {"pages_done": 1, "persons_found": 1}
+        assert result["persons_generated"] == 1
+        assert running["status"] == "running"
+        assert cancel.status_code == 409
+        assert stopped["status"] == "failed"
+        assert "resume" in stopped["error"]
+
+    def test_unknown_job_returns_404(self, tmp_path):
+        """Test polling an unknown job ID returns 404."""
+        with patch("src.api.prospects._runs_directory", return_value=str(tmp_path)):
+            response = client.get("/api/v1/prospects/jobs/missing")
+
+        assert response.status_code == 404
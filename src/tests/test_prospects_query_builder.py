@@ -128,3 +128,35 @@ class TestProspectsQueryBuilderWithCompanyIds:
         query = builder.build_person_query_with_company_ids(company_ids)
 
         assert "job_company_id IN ('RRaBQHrRdGzKrWpBkSdyeAxluorX')" in query
+
+
+class TestProspectsQueryBuilderShardCompanyIds:
+    """Test sharding company IDs across person queries."""
+
+    def test_spreads_ids_evenly_within_max_ids(self):
+        """Test shards respect max_ids and are balanced, preserving order."""
+        builder = ProspectsQueryBuilder(CombinedICP())
+        company_ids = [f"company{i}" for i in range(51)]
+
+        shards = builder.shard_company_ids(company_ids, 25, 100_000)
+
+        assert [len(shard) for shard in shards] == [17, 17, 17]
+        assert [cid for shard in shards for cid in shard] == company_ids
+
+    def test_keeps_each_query_within_max_length(self):
+        """Test no shard's person query exceeds max_query_length."""
+        builder = ProspectsQueryBuilder(CombinedICP(job_title_role=["engineering"]))
+        company_ids = [f"{i:032d}" for i in range(100)]
+
+        shards = builder.shard_company_ids(company_ids, 100, 1000)
+
+        assert len(shards) > 1
+        assert [cid for shard in shards for cid in shard] == company_ids
+        for shard in shards:
+            assert len(builder.build_person_query_with_company_ids(shard)) <= 1000
+
+    def test_empty_ids(self):
+        """Test no shards for no company IDs."""
+        builder = ProspectsQueryBuilder(CombinedICP())
+
+        assert builder.shard_company_ids([], 25, 4000) == []
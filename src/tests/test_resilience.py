@@ -0,0 +1,250 @@
+"""
+Tests for PDL resilience primitives and their use in AsyncPDLClient.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.utils.pdl_client import AsyncPDLClient
+from src.utils.resilience import CircuitBreaker, PDLUnavailableError, RetryPolicy
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _no_wait_policy(retries: int = 2) -> RetryPolicy:
+    return RetryPolicy(
+        max_retries={"search": retries, "enrichment": retries, "bulk": retries},
+        base_delay=0,
+        max_delay=5,
+    )
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy."""
+
+    def test_backoff_is_capped_exponential_with_jitter(self):
+        """Test delays stay within [0, min(max_delay, base * 2**attempt)]."""
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+
+        for attempt, cap in [(0, 1), (1, 2), (2, 4), (5, 5)]:
+            delays = [policy.backoff(attempt) for _ in range(50)]
+            assert all(0 <= d <= cap for d in delays)
+
+    def test_retry_after_is_honored_up_to_max_delay(self):
+        """Test Retry-After overrides backoff unless it exceeds max_delay."""
+        policy = RetryPolicy(base_delay=1, max_delay=10)
+
+        assert policy.backoff(0, retry_after=7) == 7
+        assert policy.backoff(0, retry_after=60) is None
+
+    def test_budgets_are_per_family(self):
+        """Test each endpoint family has its own retry budget."""
+        policy = RetryPolicy(max_retries={"search": 4, "bulk": 1})
+
+        assert policy.retries_for("search") == 4
+        assert policy.retries_for("bulk") == 1
+        assert policy.retries_for("unknown") == 0
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        """Test consecutive failures open the breaker."""
+        clock = FakeClock()
+        breaker = CircuitBreaker("search", failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        with pytest.raises(PDLUnavailableError):
+            breaker.before_call()
+
+    def test_half_open_allows_one_trial(self):
+        """Test a single trial call after the cool-down decides the state."""
+        clock = FakeClock()
+        breaker = CircuitBreaker("search", failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.state == "half_open"
+        breaker.before_call()
+        with pytest.raises(PDLUnavailableError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        """Test a failed half-open trial re-opens the breaker."""
+        clock = FakeClock()
+        breaker = CircuitBreaker("search", failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 10
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+
+    def test_released_trial_allows_another(self):
+        """Test a trial that ends without an outcome frees the trial slot."""
+        clock = FakeClock()
+        breaker = CircuitBreaker("search", failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.before_call() is True
+        breaker.release_trial()
+
+        assert breaker.state == "half_open"
+        assert breaker.before_call() is True
+
+
+class TestAsyncPDLClientResilience:
+    """Test cases for retries and circuit breaking inside AsyncPDLClient."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors_then_succeeds(self):
+        """Test a 503 and a network error are retried transparently."""
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                return httpx.Response(503, json={"status": 503})
+            if calls == 2:
+                raise httpx.ConnectError("connection reset")
+            return httpx.Response(200, json={"status": 200, "data": []})
+
+        async with AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            retry_policy=_no_wait_policy(retries=2),
+        ) as client:
+            response = await client.person_search(sql_query="SELECT * FROM person")
+
+            assert response["status"] == 200
+            assert calls == 3
+            assert client.metrics()["retries"] == {"search": 2}
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_returns_last_response(self):
+        """Test non-recovering errors come back after the retry budget."""
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(500, json={"status": 500, "error": {"message": "x"}})
+
+        async with AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            retry_policy=_no_wait_policy(retries=1),
+        ) as client:
+            response = await client.company_search(sql_query="SELECT * FROM company")
+
+        assert response["status"] == 500
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        """Test 4xx responses (other than 429) are returned immediately."""
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(404, json={"status": 404})
+
+        async with AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            retry_policy=_no_wait_policy(retries=3),
+        ) as client:
+            await client.person_enrichment(pdl_id="missing")
+
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_short_circuits(self):
+        """Test an open breaker raises without calling PDL."""
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(502, json={"status": 502})
+
+        async with AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            retry_policy=_no_wait_policy(retries=0),
+        ) as client:
+            client.breakers["search"].failure_threshold = 2
+            for _ in range(2):
+                await client.person_search(sql_query="SELECT * FROM person")
+
+            with pytest.raises(PDLUnavailableError):
+                await client.person_search(sql_query="SELECT * FROM person")
+
+            metrics = client.metrics()
+
+        assert calls == 2
+        assert metrics["circuit_breakers"]["search"] == "open"
+        assert metrics["circuit_breakers"]["enrichment"] == "closed"
+        assert metrics["short_circuits"] == {"search": 1}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_does_not_wedge_breaker(self):
+        """Test cancelling the half-open trial lets the next call probe PDL."""
+        clock = FakeClock()
+        started = asyncio.Event()
+        hang = True
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if hang:
+                started.set()
+                await asyncio.sleep(3600)
+            return httpx.Response(200, json={"status": 200, "data": []})
+
+        async with AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            retry_policy=_no_wait_policy(retries=0),
+        ) as client:
+            client.breakers["search"] = CircuitBreaker(
+                "search", failure_threshold=1, reset_timeout=10, clock=clock
+            )
+            client.breakers["search"].record_failure()
+            clock.now = 10
+
+            # _send directly: searches run under single-flight, which shields
+            # the shared request from its callers' cancellation
+            trial = asyncio.create_task(client._send("POST", "/person/search"))
+            await asyncio.wait_for(started.wait(), timeout=5)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+            hang = False
+            response = await asyncio.wait_for(
+                client._send("POST", "/person/search"), timeout=5
+            )
+
+        assert response.status_code == 200
+        assert client.breakers["search"].state == "closed"
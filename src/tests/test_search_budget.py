@@ -0,0 +1,38 @@
+"""
+Tests for the per-request search budget.
+"""
+
+from src.utils.search_budget import SearchBudget
+
+
+class TestSearchBudget:
+    """Test cases for SearchBudget."""
+
+    def test_unlimited_by_default(self):
+        """Test a budget without limits never runs out."""
+        budget = SearchBudget()
+
+        for _ in range(1000):
+            assert budget.acquire(100) == 100
+        assert not budget.exhausted
+
+    def test_call_limit(self):
+        """Test the budget is exhausted after max_calls calls."""
+        budget = SearchBudget(max_calls=2)
+
+        assert budget.acquire(10) == 10
+        assert budget.acquire(10) == 10
+        assert budget.exhausted
+        assert budget.acquire(10) == 0
+
+    def test_credit_limit_caps_page_size_and_refunds_unused(self):
+        """Test page sizes are capped by remaining credits, refunded on settle."""
+        budget = SearchBudget(max_credits=150)
+
+        assert budget.acquire(100) == 100
+        assert budget.acquire(100) == 50
+        assert budget.exhausted
+
+        budget.settle(50, 20)
+        assert budget.credits == 120
+        assert budget.acquire(100) == 30
@@ -0,0 +1,165 @@
+"""
+Tests for the search result cache and its use in AsyncPDLClient.
+"""
+
+import threading
+
+import httpx
+import pytest
+
+from src.utils.pdl_client import AsyncPDLClient
+from src.utils.search_cache import SearchCache, normalize_sql, search_cache_key
+
+
+class TestSearchCacheKey:
+    """Test cases for SQL normalization and cache keys."""
+
+    def test_normalize_sql_collapses_whitespace_outside_literals(self):
+        """Test formatting differences normalize but literals are preserved."""
+        sql = "SELECT *   FROM person\n  WHERE job_title IN ('vp  sales');"
+
+        assert normalize_sql(sql) == "SELECT * FROM person WHERE job_title IN ('vp  sales')"
+
+    def test_key_depends_on_page_params(self):
+        """Test size, titlecase and scroll token are part of the key."""
+        base = {"sql": "SELECT * FROM person", "size": 10, "titlecase": True}
+
+        assert search_cache_key("person", base) == search_cache_key(
+            "person", {**base, "sql": "SELECT *  FROM person", "pretty": True}
+        )
+        assert search_cache_key("person", base) != search_cache_key("company", base)
+        assert search_cache_key("person", base) != search_cache_key(
+            "person", {**base, "size": 20}
+        )
+        assert search_cache_key("person", base) != search_cache_key(
+            "person", {**base, "scroll_token": "next"}
+        )
+
+
+class TestSearchCache:
+    """Test cases for SearchCache tiers."""
+
+    def test_memory_lru_eviction(self):
+        """Test the least recently used entry is evicted over max_entries."""
+        cache = SearchCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", {"status": 200})
+        cache.put("b", {"status": 200})
+        cache.get_memory("a")
+        cache.put("c", {"status": 200})
+
+        assert cache.get_memory("b") is None
+        assert cache.get_memory("a") is not None
+        assert cache.metrics()["evictions"] == 1
+
+    def test_memory_ttl(self):
+        """Test entries older than the TTL are misses."""
+        cache = SearchCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", {"status": 200}, now=1_000)
+
+        assert cache.get_memory("a", now=1_059) is not None
+        assert cache.get_memory("a", now=1_061) is None
+
+    def test_disk_tier_is_shared_and_promotes(self, tmp_path):
+        """Test a second instance finds entries on disk and promotes them."""
+        db_path = str(tmp_path / "search_cache.sqlite3")
+        writer = SearchCache(max_entries=2, ttl_seconds=60, db_path=db_path)
+        reader = SearchCache(max_entries=2, ttl_seconds=60, db_path=db_path)
+        writer.put("a", {"status": 200, "data": [1]})
+
+        assert reader.get_memory("a") is None
+        assert reader.get_disk("a") == {"status": 200, "data": [1]}
+        assert reader.get_memory("a") == {"status": 200, "data": [1]}
+        writer.close()
+        reader.close()
+
+    def test_hits_return_independent_copies(self):
+        """Test changing a returned response does not change the cache."""
+        cache = SearchCache(max_entries=2, ttl_seconds=60)
+        response = {"status": 200, "data": [{"id": "p1"}]}
+        cache.put("a", response)
+        response["data"].append({"id": "p2"})
+
+        hit = cache.get_memory("a")
+        hit["data"][0]["id"] = "changed"
+
+        assert cache.get_memory("a") == {"status": 200, "data": [{"id": "p1"}]}
+
+    def test_concurrent_lookups_and_evictions(self):
+        """Test lookups racing evictions from worker threads never raise."""
+        cache = SearchCache(max_entries=4, ttl_seconds=60)
+        errors: list[BaseException] = []
+
+        def churn(offset: int) -> None:
+            try:
+                for i in range(2_000):
+                    cache.put(f"k{(i + offset) % 8}", {"status": 200})
+                    cache.get_memory(f"k{(i + offset + 3) % 8}")
+            except BaseException as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=churn, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert cache.metrics()["memory_entries"] <= 4
+
+
+class TestAsyncPDLClientSearchCache:
+    """Test cases for search cache integration in AsyncPDLClient."""
+
+    @staticmethod
+    def _client(status: int = 200) -> tuple[AsyncPDLClient, list[int]]:
+        calls: list[int] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(1)
+            return httpx.Response(
+                status, json={"status": status, "data": [{"id": "p1"}]}
+            )
+
+        client = AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            search_cache=SearchCache(max_entries=10, ttl_seconds=60),
+        )
+        return client, calls
+
+    @pytest.mark.asyncio
+    async def test_repeated_page_is_served_from_cache(self):
+        """Test an identical search only reaches PDL once."""
+        client, calls = self._client()
+
+        first = await client.person_search(sql_query="SELECT * FROM person", size=10)
+        second = await client.person_search(sql_query="SELECT *\n FROM person", size=10)
+        await client.person_search(sql_query="SELECT * FROM person", size=20)
+
+        assert first == second
+        assert len(calls) == 2
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_refresh_and_bypass(self):
+        """Test refresh re-fetches and bypass skips the cache."""
+        client, calls = self._client()
+
+        await client.company_search(sql_query="SELECT * FROM company")
+        await client.company_search(sql_query="SELECT * FROM company", cache_mode="refresh")
+        await client.company_search(sql_query="SELECT * FROM company", cache_mode="bypass")
+        await client.company_search(sql_query="SELECT * FROM company")
+
+        assert len(calls) == 3
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test failed searches are retried on the next call."""
+        client, calls = self._client(status=400)
+
+        await client.person_search(sql_query="SELECT * FROM person")
+        await client.person_search(sql_query="SELECT * FROM person")
+
+        assert len(calls) == 2
+        await client.aclose()
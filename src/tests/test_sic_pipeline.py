@@ -0,0 +1,433 @@
+"""
+Tests for the pipelined SIC-based prospect flow.
+"""
+
+import asyncio
+import base64
+import re
+import zlib
+
+import pytest
+
+from src.schema.combined_icp import CombinedICP
+from src.utils import fast_json
+from src.utils.prospects_query_builder import ProspectsQueryBuilder
+from src.utils.resilience import PDLUnavailableError
+from src.utils.search_budget import SearchBudget
+from src.utils.sic_pipeline import CompanyShard, SICCursor, SICPipeline
+
+
+def _company_ids(sql_query: str) -> list[str]:
+    return re.findall(r"'(c\d+)'", sql_query)
+
+
+class FakeClient:
+    """
+    Fake async PDL client.
+
+    Company pages are served from company_pages (scroll token "c<n>" is
+    page n); every company has persons_per_company persons "<company>-p<i>",
+    paged by offset scroll tokens.
+    """
+
+    def __init__(self, company_pages, persons_per_company=1):
+        self.company_pages = company_pages
+        self.persons_per_company = persons_per_company
+        self.company_calls = []
+        self.person_calls = []
+        self.person_tokens = []
+        self.company_gate: dict[int, asyncio.Event] = {}
+        self.person_started = asyncio.Event()
+
+    async def company_search(self, sql_query, size, scroll_token=None, **kwargs):
+        page = int(scroll_token[1:]) if scroll_token else 0
+        self.company_calls.append(page)
+        if page in self.company_gate:
+            await self.company_gate[page].wait()
+        ids = self.company_pages[page]
+        next_token = f"c{page + 1}" if page + 1 < len(self.company_pages) else None
+        return {
+            "status": 200,
+            "data": [{"id": cid} for cid in ids],
+            "scroll_token": next_token,
+        }
+
+    async def person_search(self, sql_query, size, scroll_token=None, **kwargs):
+        self.person_calls.append((_company_ids(sql_query), size))
+        self.person_tokens.append((tuple(_company_ids(sql_query)), scroll_token))
+        self.person_started.set()
+        await asyncio.sleep(0)
+        persons = [
+            {"id": f"{cid}-p{i}"}
+            for cid in _company_ids(sql_query)
+            for i in range(self.persons_per_company)
+        ]
+        offset = int(scroll_token) if scroll_token else 0
+        next_offset = offset + size
+        return {
+            "status": 200,
+            "data": persons[offset:next_offset],
+            "scroll_token": str(next_offset) if next_offset < len(persons) else None,
+        }
+
+
+def _pipeline(client, target=100, company_limit=100, **kwargs):
+    query_builder = ProspectsQueryBuilder(CombinedICP(sic_code=["7371"]))
+    kwargs.setdefault("batch_size", 2)
+    kwargs.setdefault("concurrency", 2)
+    kwargs.setdefault("queue_size", 2)
+    return SICPipeline(
+        client, query_builder, target=target, company_limit=company_limit, **kwargs
+    )
+
+
+class TestSICPipeline:
+    """Test cases for SICPipeline."""
+
+    @pytest.mark.asyncio
+    async def test_collects_persons_from_all_batches(self):
+        """Test every company batch is searched and its persons collected."""
+        client = FakeClient([["c1", "c2", "c3"], ["c4", "c5"]])
+
+        result = await _pipeline(client).run()
+
+        assert result.companies_found == 5
+        assert sorted(p["id"] for p in result.persons) == [
+            "c1-p0", "c2-p0", "c3-p0", "c4-p0", "c5-p0"
+        ]
+        assert sorted(ids for ids, _ in client.person_calls) == [
+            ["c1", "c2"], ["c3"], ["c4", "c5"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_shards_are_balanced_and_length_bounded(self):
+        """Test a company page is split into even shards under both limits."""
+        client = FakeClient([[f"c{i}" for i in range(1, 8)]])
+
+        await _pipeline(client, batch_size=3).run()
+
+        assert sorted(len(ids) for ids, _ in client.person_calls) == [2, 2, 3]
+
+        client = FakeClient([[f"c{i}" for i in range(1, 8)]])
+        pipeline = _pipeline(client, batch_size=100)
+        pipeline.max_query_length = len(
+            pipeline.query_builder.build_person_query_with_company_ids(
+                ["c1", "c2", "c3"]
+            )
+        )
+        await pipeline.run()
+
+        assert all(len(ids) <= 3 for ids, _ in client.person_calls)
+        assert sum(len(ids) for ids, _ in client.person_calls) == 7
+
+    @pytest.mark.asyncio
+    async def test_person_search_starts_before_company_paging_finishes(self):
+        """Test a company page's batches are searched while the next page loads."""
+        client = FakeClient([["c1", "c2"], ["c3"]])
+        client.company_gate[1] = client.person_started
+
+        result = await asyncio.wait_for(_pipeline(client).run(), timeout=1)
+
+        # Company page 1 is only served once a person search has started
+        assert client.company_calls == [0, 1]
+        assert len(result.persons) == 3
+
+    @pytest.mark.asyncio
+    async def test_stops_at_target_without_over_requesting(self):
+        """Test collection stops at the target and page sizes stay within it."""
+        client = FakeClient(
+            [["c1", "c2", "c3", "c4"], ["c5", "c6"]], persons_per_company=3
+        )
+
+        result = await _pipeline(client, target=5).run()
+
+        assert len(result.persons) == 5
+        assert sum(size for _, size in client.person_calls) <= 5
+
+    @pytest.mark.asyncio
+    async def test_dedupes_persons_across_batches(self):
+        """Test a person returned by several batches is collected once."""
+        client = FakeClient([["c1", "c2", "c3", "c4"]])
+
+        async def person_search(sql_query, size, scroll_token=None, **kwargs):
+            return {"status": 200, "data": [{"id": "same"}]}
+
+        client.person_search = person_search
+        result = await _pipeline(client).run()
+
+        assert result.persons == [{"id": "same"}]
+
+    @pytest.mark.asyncio
+    async def test_enriches_each_person_page(self):
+        """Test enrich is called per person page and replaces its records."""
+        client = FakeClient([["c1", "c2", "c3"]])
+        enriched_pages = []
+
+        async def enrich(persons):
+            enriched_pages.append([p["id"] for p in persons])
+            return [{**p, "enriched": True} for p in persons]
+
+        result = await _pipeline(client, enrich=enrich).run()
+
+        assert len(enriched_pages) == 2
+        assert all(p["enriched"] for p in result.persons)
+
+    @pytest.mark.asyncio
+    async def test_reports_each_collected_page(self):
+        """Test on_page sees every collected page, in result order."""
+        client = FakeClient([["c1", "c2", "c3"], ["c4"]])
+        pages = []
+
+        async def on_page(persons, cursor):
+            pages.append(persons)
+
+        result = await _pipeline(client, on_page=on_page).run()
+
+        assert len(pages) == 3
+        assert [p for page in pages for p in page] == result.persons
+
+    @pytest.mark.asyncio
+    async def test_slow_enrichment_backpressures_person_searches(self):
+        """Test person searches stop running ahead of a stalled enrich stage."""
+        client = FakeClient([[f"c{i}" for i in range(20)]])
+        release = asyncio.Event()
+
+        async def enrich(persons):
+            await release.wait()
+            return persons
+
+        run = asyncio.ensure_future(
+            _pipeline(client, enrich=enrich, batch_size=1, queue_size=1).run()
+        )
+        await asyncio.sleep(0.05)
+
+        # 1 page in enrichment + 1 queued + 1 blocked per worker
+        assert len(client.person_calls) <= 4
+        release.set()
+        result = await asyncio.wait_for(run, timeout=1)
+        assert len(result.persons) == 20
+
+    @pytest.mark.asyncio
+    async def test_records_search_errors(self):
+        """Test company and person search errors are recorded, not raised."""
+        client = FakeClient([["c1"]])
+
+        async def company_search(**kwargs):
+            return {"status": 400, "error": {"message": "bad company query"}}
+
+        client.company_search = company_search
+        result = await _pipeline(client).run()
+        assert result.company_error == "bad company query"
+        assert result.companies_found == 0
+
+        client = FakeClient([["c1"]])
+
+        async def person_search(**kwargs):
+            return {"status": 400, "error": {"message": "bad person query"}}
+
+        client.person_search = person_search
+        result = await _pipeline(client).run()
+        assert result.person_error == "bad person query"
+        assert result.companies_found == 1
+        assert result.persons == []
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self):
+        """Test a PDLUnavailableError from a stage propagates unwrapped."""
+        client = FakeClient([["c1"]])
+
+        async def person_search(**kwargs):
+            raise PDLUnavailableError("breaker open")
+
+        client.person_search = person_search
+        with pytest.raises(PDLUnavailableError):
+            await _pipeline(client).run()
+
+    @pytest.mark.asyncio
+    async def test_unbounded_company_limit_pages_until_target(self):
+        """Test company_limit=None keeps paging companies until the target."""
+        client = FakeClient([["c1"], ["c2"], ["c3"], ["c4"]])
+
+        result = await _pipeline(client, target=3, company_limit=None).run()
+
+        assert len(result.persons) == 3
+        assert client.company_calls == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_dropped_enrichment_does_not_count_towards_target(self):
+        """Test persons dropped by enrich are replaced by further searches."""
+        client = FakeClient([["c1"], ["c2"], ["c3"]])
+
+        async def enrich(persons):
+            return [p for p in persons if p["id"] != "c1-p0"]
+
+        result = await _pipeline(
+            client, target=2, company_limit=None, enrich=enrich
+        ).run()
+
+        assert [p["id"] for p in result.persons] == ["c2-p0", "c3-p0"]
+
+    @pytest.mark.asyncio
+    async def test_budget_stops_the_run_and_keeps_position(self):
+        """Test a spent budget stops searches and leaves work in the cursor."""
+        client = FakeClient([["c1"], ["c2"], ["c3"], ["c4"]])
+        budget = SearchBudget(max_calls=3)
+
+        result = await _pipeline(
+            client, target=10, company_limit=None, budget=budget
+        ).run()
+
+        assert budget.calls == 3
+        assert result.budget_exhausted
+        assert len(client.company_calls) + len(client.person_calls) == 3
+        assert not result.cursor.exhausted
+
+
+class TestSICCursor:
+    """Test cases for the composite SIC cursor."""
+
+    def test_encode_decode_round_trip(self):
+        """Test a cursor survives encoding as an opaque scroll token."""
+        cursor = SICCursor(
+            company_scroll_token="company-token",
+            shards=[CompanyShard(["c1", "c2"], "person-token"), CompanyShard(["c3"])],
+        )
+
+        token = cursor.encode()
+
+        assert token.startswith("sic1.")
+        assert SICCursor.decode(token) == cursor
+
+    def test_exhausted_cursor_encodes_to_none(self):
+        """Test no scroll token is returned once both stages are exhausted."""
+        assert SICCursor(companies_exhausted=True).encode() is None
+
+    def test_plain_token_is_a_company_scroll_token(self):
+        """Test a raw PDL scroll token resumes the company stage only."""
+        assert SICCursor.decode("raw") == SICCursor(company_scroll_token="raw")
+        assert SICCursor.decode(None) == SICCursor()
+
+    def test_malformed_cursor_raises_value_error(self):
+        """Test a corrupted cursor is rejected."""
+        with pytest.raises(ValueError):
+            SICCursor.decode("sic1.not-a-cursor")
+
+    @pytest.mark.parametrize(
+        "fields",
+        [
+            {"shards": [["c1c2", None]]},
+            {"shards": [[["c1", 2], None]]},
+            {"shards": [[["c1"], {"token": "x"}]]},
+            {"shards": {"c1": None}},
+            {"company_scroll_token": 7},
+            {"companies_exhausted": "no"},
+        ],
+    )
+    def test_mistyped_cursor_raises_value_error(self, fields):
+        """Test a well-formed token with mistyped fields is rejected."""
+        data = SICCursor(shards=[CompanyShard(["c1"])]).to_dict() | fields
+        payload = zlib.compress(fast_json.dumps(data))
+        token = "sic1." + base64.urlsafe_b64encode(payload).decode("ascii")
+
+        with pytest.raises(ValueError, match="Invalid scroll_token"):
+            SICCursor.decode(token)
+
+
+class TestSICPipelineResume:
+    """Test cases for resuming the SIC pipeline from its cursor."""
+
+    @pytest.mark.asyncio
+    async def test_pages_resume_both_stages_without_repeating_calls(self):
+        """Test paging with the cursor covers all persons with no repeated call."""
+        client = FakeClient(
+            [["c1", "c2", "c3"], ["c4", "c5"]], persons_per_company=3
+        )
+        collected = []
+        cursor = None
+
+        for _ in range(20):
+            pipeline = _pipeline(client, target=4, company_limit=3, cursor=cursor)
+            result = await pipeline.run()
+            collected.extend(p["id"] for p in result.persons)
+            cursor = result.cursor
+            if cursor.exhausted:
+                break
+
+        assert sorted(collected) == sorted(
+            f"c{c}-p{i}" for c in range(1, 6) for i in range(3)
+        )
+        assert len(client.person_tokens) == len(set(client.person_tokens))
+        assert client.company_calls == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_page_cursors_resume_without_skipping_persons(self):
+        """Test resuming from any page's cursor covers every later person."""
+        company_pages = [["c1", "c2", "c3"], ["c4", "c5"]]
+        everyone = {f"c{c}-p{i}" for c in range(1, 6) for i in range(3)}
+        pages = []
+
+        async def on_page(persons, cursor):
+            pages.append(([p["id"] for p in persons], cursor.encode()))
+            # Let searches run ahead of the collect stage
+            await asyncio.sleep(0)
+
+        client = FakeClient(company_pages, persons_per_company=3)
+        await _pipeline(client, company_limit=None, on_page=on_page).run()
+
+        assert len(pages) > 2
+        assert pages[-1][1] is None
+        for done, (_, token) in enumerate(pages[:-1], start=1):
+            resumed = await _pipeline(
+                FakeClient(company_pages, persons_per_company=3),
+                company_limit=None,
+                cursor=SICCursor.decode(token),
+            ).run()
+            before = {pdl_id for ids, _ in pages[:done] for pdl_id in ids}
+            after = {p["id"] for p in resumed.persons}
+            assert before | after == everyone
+            assert not before & after
+
+    @pytest.mark.asyncio
+    async def test_company_budget_is_separate(self):
+        """Test company searches can be budgeted apart from person searches."""
+        client = FakeClient([["c1"], ["c2"], ["c3"]], persons_per_company=2)
+        budget = SearchBudget(max_calls=2)
+
+        result = await _pipeline(
+            client,
+            target=10,
+            company_limit=None,
+            budget=budget,
+            company_budget=SearchBudget(),
+            concurrency=1,
+        ).run()
+
+        assert budget.calls == 2
+        assert len(client.person_calls) == 2
+        assert len(result.persons) == 4
+        assert result.budget_exhausted
+
+    @pytest.mark.asyncio
+    async def test_cursor_keeps_partially_read_shard(self):
+        """Test a shard stopped mid-scroll resumes from its person scroll token."""
+        client = FakeClient([["c1"]], persons_per_company=5)
+
+        result = await _pipeline(client, target=2).run()
+
+        assert [p["id"] for p in result.persons] == ["c1-p0", "c1-p1"]
+        assert result.cursor.shards == [CompanyShard(["c1"], "2")]
+        assert result.cursor.companies_exhausted
+        assert result.cursor.encode() is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_shard_stays_in_cursor(self):
+        """Test a shard whose person search failed is retried from the cursor."""
+        client = FakeClient([["c1"]])
+
+        async def person_search(**kwargs):
+            return {"status": 500, "error": {"message": "boom"}}
+
+        client.person_search = person_search
+        result = await _pipeline(client).run()
+
+        assert result.cursor.shards == [CompanyShard(["c1"])]
@@ -0,0 +1,136 @@
+"""
+Tests for single-flight request coalescing.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.utils.pdl_client import AsyncPDLClient
+from src.utils.search_cache import SearchCache
+from src.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test concurrent calls with the same key run func once."""
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work() -> dict:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"status": 200}
+
+        waiters = [asyncio.ensure_future(flight.do("k", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1
+        assert all(r is results[0] for r in results)
+        assert flight.metrics() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_different_keys_and_later_calls_are_separate(self):
+        """Test only concurrent calls with equal keys coalesce."""
+        flight = SingleFlight()
+        calls: list[str] = []
+
+        async def work(key: str) -> str:
+            calls.append(key)
+            return key
+
+        await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+        await flight.do("a", lambda: work("a"))
+
+        assert calls == ["a", "b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        """Test an exception in the shared call is raised to all callers."""
+        flight = SingleFlight()
+
+        async def work() -> None:
+            await asyncio.sleep(0)
+            raise RuntimeError("PDL down")
+
+        results = await asyncio.gather(
+            flight.do("k", work), flight.do("k", work), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_flight(self):
+        """Test the shared call survives one caller being cancelled."""
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
+
+
+class TestAsyncPDLClientSingleFlight:
+    """Test cases for coalescing inside AsyncPDLClient."""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_searches_hit_pdl_once(self):
+        """Test identical searches share one PDL call and fill the cache once."""
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"status": 200, "data": [{"id": "c1"}]})
+
+        async with AsyncPDLClient(
+            api_key="test-key",
+            transport=httpx.MockTransport(handler),
+            search_cache=SearchCache(max_entries=10, ttl_seconds=60),
+        ) as client:
+            results = await asyncio.gather(
+                *(client.company_search(sql_query="SELECT * FROM company") for _ in range(4))
+            )
+            metrics = client.metrics()
+
+        assert calls == 1
+        assert all(r["data"] == [{"id": "c1"}] for r in results)
+        assert metrics["single_flight"]["coalesced"] == 3
+
+    @pytest.mark.asyncio
+    async def test_coalesces_without_a_cache(self):
+        """Test coalescing also works when no search cache is configured."""
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"status": 200, "data": {"id": "p1"}})
+
+        async with AsyncPDLClient(
+            api_key="test-key", transport=httpx.MockTransport(handler)
+        ) as client:
+            await asyncio.gather(
+                client.person_enrichment(pdl_id="p1"),
+                client.person_enrichment(pdl_id="p1"),
+            )
+
+        assert calls == 1
@@ -0,0 +1,268 @@
+"""
+Write-ahead checkpoint log for resumable runs.
+
+Each run owns two files in a checkpoint directory:
+- <run_id>.wal: append-only JSON lines; every line is a state update
+  (scroll tokens, enriched IDs, export offset) that is fsynced before the
+  run moves on
+- <run_id>.partial.jsonl: the partial export, one record per line
+
+A commit appends its records to the partial export and fsyncs it first,
+then appends the WAL line that makes them visible. On reopen the WAL is
+replayed (a torn last line is ignored) and the partial export is truncated
+to the last committed offset, so a restarted run continues exactly where
+the last commit left it.
+
+Workers on the same host share the checkpoint directory. A run is only
+executed (or its checkpoint opened for writing) under a CheckpointLease,
+an exclusive flock on <run_id>.lock, so two processes never replay or
+append to the same run at once. The kernel drops the lock when its holder
+exits, so a crashed worker never leaves a stale lease behind.
+"""
+
+import fcntl
+import os
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from src.utils import fast_json
+
+
+class CheckpointLeaseHeldError(Exception):
+    """Raised when another process (or task) holds a run's checkpoint lease."""
+
+
+class CheckpointLease:
+    """Exclusive cross-process lease on one run's checkpoint."""
+
+    def __init__(self, directory: str, run_id: str):
+        """
+        Args:
+            directory: Directory holding checkpoint files (created if missing).
+            run_id: Identifier of the run.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.run_id = run_id
+        self.path = os.path.join(directory, f"{run_id}.lock")
+        self._fd: int | None = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this lease object holds the lease."""
+        return self._fd is not None
+
+    def acquire(self) -> None:
+        """
+        Take the lease without waiting.
+
+        Raises:
+            CheckpointLeaseHeldError: If the lease is held elsewhere.
+        """
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise CheckpointLeaseHeldError(
+                f"Run {self.run_id} is being run by another worker"
+            ) from None
+        self._fd = fd
+
+    def release(self) -> None:
+        """Release the lease (no-op if not held)."""
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def held_elsewhere(self) -> bool:
+        """Whether another process (or lease object) holds the lease."""
+        if self.held:
+            return False
+        try:
+            self.acquire()
+        except CheckpointLeaseHeldError:
+            return True
+        self.release()
+        return False
+
+    def __enter__(self) -> "CheckpointLease":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class RunCheckpoint:
+    """Write-ahead log plus partial NDJSON export for one resumable run."""
+
+    def __init__(self, directory: str, run_id: str, readonly: bool = False):
+        """
+        Open (or create) the checkpoint for run_id, replaying any existing WAL.
+
+        Args:
+            directory: Directory holding checkpoint files (created if missing).
+            run_id: Identifier of the run; also the file name stem.
+            readonly: Only read the checkpoint (e.g. for a status view):
+                torn lines and uncommitted records are skipped, not
+                truncated, so this is safe while another worker runs it.
+                Writable opens must hold the run's CheckpointLease.
+        """
+        self.readonly = readonly
+        os.makedirs(directory, exist_ok=True)
+        self.run_id = run_id
+        self.wal_path = os.path.join(directory, f"{run_id}.wal")
+        self.export_path = os.path.join(directory, f"{run_id}.partial.jsonl")
+        self.request: dict[str, Any] | None = None
+        self.state: dict[str, Any] = {}
+        self.enriched_ids: set[str] = set()
+        self.records = 0
+        self.export_offset = 0
+        self.result: dict[str, Any] | None = None
+        self.created_at: float | None = None
+        self.finished_at: float | None = None
+        self._replay()
+
+    @property
+    def exists(self) -> bool:
+        """Whether the run has been started (a begin entry was logged)."""
+        return self.request is not None
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None
+
+    def begin(self, request: dict[str, Any]) -> None:
+        """Log the run's request; no-op when resuming an existing run."""
+        if self.exists:
+            return
+        self.created_at = time.time()
+        self._append(
+            {"type": "begin", "request": request, "created_at": self.created_at}
+        )
+        self.request = request
+
+    def commit(
+        self,
+        records: list[dict[str, Any]],
+        enriched_ids: Iterable[str] = (),
+        **state: Any,
+    ) -> None:
+        """
+        Durably append records to the partial export and log the new state.
+
+        Args:
+            records: Records to add to the partial export.
+            enriched_ids: PDL IDs whose enrichment these records hold.
+            **state: State updates (e.g. scroll tokens) merged into state.
+        """
+        enriched_ids = list(enriched_ids)
+        if records:
+            with open(self.export_path, "ab") as f:
+                f.writelines(fast_json.dumps(record) + b"\n" for record in records)
+                f.flush()
+                os.fsync(f.fileno())
+                offset = f.tell()
+        else:
+            offset = self.export_offset
+
+        self._append(
+            {
+                "type": "commit",
+                "state": state,
+                "enriched_ids": enriched_ids,
+                "records": len(records),
+                "export_offset": offset,
+            }
+        )
+        self._apply_commit(state, enriched_ids, len(records), offset)
+
+    def finish(self, result: dict[str, Any]) -> None:
+        """
+        Log the run's final result; the run will not be resumed again.
+
+        The partial export is removed, as the final export supersedes it.
+        """
+        self.finished_at = time.time()
+        self._append(
+            {"type": "finish", "result": result, "finished_at": self.finished_at}
+        )
+        self.result = result
+        if os.path.exists(self.export_path):
+            os.remove(self.export_path)
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Yield the committed records of the partial export in order."""
+        if not os.path.exists(self.export_path):
+            return
+        read = 0
+        with open(self.export_path, "rb") as f:
+            for line in f:
+                # Bytes past the last commit (read-only opens) are not visible
+                read += len(line)
+                if read > self.export_offset:
+                    break
+                yield fast_json.loads(line)
+
+    def discard(self) -> None:
+        """Delete the checkpoint files."""
+        for path in (self.wal_path, self.export_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _replay(self) -> None:
+        if not os.path.exists(self.wal_path):
+            return
+        with open(self.wal_path, "rb") as f:
+            # The last element is an unterminated (torn) line, or b""
+            lines = f.read().split(b"\n")[:-1]
+
+        valid_bytes = 0
+        for line in lines:
+            try:
+                entry = fast_json.loads(line)
+            except ValueError:
+                # Torn write from a crash mid-append; everything after is lost
+                break
+            valid_bytes += len(line) + 1
+            if entry["type"] == "begin":
+                self.request = entry["request"]
+                self.created_at = entry.get("created_at")
+            elif entry["type"] == "commit":
+                self._apply_commit(
+                    entry["state"],
+                    entry["enriched_ids"],
+                    entry["records"],
+                    entry["export_offset"],
+                )
+            elif entry["type"] == "finish":
+                self.result = entry["result"]
+                self.finished_at = entry.get("finished_at")
+
+        if self.readonly:
+            return
+        with open(self.wal_path, "r+b") as f:
+            f.truncate(valid_bytes)
+        if os.path.exists(self.export_path):
+            with open(self.export_path, "r+b") as f:
+                f.truncate(self.export_offset)
+
+    def _apply_commit(
+        self,
+        state: dict[str, Any],
+        enriched_ids: Iterable[str],
+        records: int,
+        offset: int,
+    ) -> None:
+        self.state.update(state)
+        self.enriched_ids.update(enriched_ids)
+        self.records += records
+        self.export_offset = offset
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        with open(self.wal_path, "ab") as f:
+            f.write(fast_json.dumps(entry) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
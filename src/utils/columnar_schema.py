@@ -0,0 +1,556 @@
+"""
+Columnar (Parquet/Arrow) table layout for PDL person and company records.
+
+The columns follow docs/PERSON_SCHEMA.md and docs/COMPANY_SCHEMA.md so an
+export has the same schema whichever fields a given record happens to
+carry (missing fields are null, fields outside the schema are dropped):
+- scalar fields become typed columns (dates stay strings, since PDL dates
+  may be partial such as "2015-03")
+- arrays of strings become list<string> columns
+- fixed-shape objects are flattened into "<field>_<sub_field>" columns
+- keyed objects whose keys vary by record (employee_count_by_country, ...)
+  are stored as JSON strings
+- arrays of objects (experience, education, ...) become child tables with
+  one row per element, keyed by "<entity>_id" and "position"
+
+This module only reshapes records into per-table column lists; the
+pyarrow-backed writer is ColumnarExportWriter in src/utils/export_writer.py.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from src.utils import fast_json
+
+ColumnType = Literal["string", "int64", "float64", "bool", "list_string", "json"]
+
+
+@dataclass(frozen=True)
+class Column:
+    """A table column read from a (dotted) path in the record."""
+
+    name: str
+    path: tuple[str, ...]
+    type: ColumnType
+
+
+@dataclass(frozen=True)
+class ChildTable:
+    """Table for the elements of an array-of-objects field."""
+
+    field: str
+    columns: tuple[Column, ...]
+
+
+@dataclass(frozen=True)
+class ColumnarSchema:
+    """Base table columns plus child tables for one PDL entity."""
+
+    entity: str
+    columns: tuple[Column, ...]
+    children: tuple[ChildTable, ...]
+
+    @property
+    def key_column(self) -> str:
+        """Child table column holding the parent record's id."""
+        return f"{self.entity}_id"
+
+    def to_columns(
+        self, records: Iterable[dict[str, Any]]
+    ) -> tuple[dict[str, list], dict[str, dict[str, list]]]:
+        """
+        Reshape records into column lists.
+
+        Args:
+            records: PDL records.
+
+        Returns:
+            (base, children): the base table's columns, and each child
+            table's columns keyed by its field name.
+        """
+        base: dict[str, list] = {column.name: [] for column in self.columns}
+        children = {
+            child.field: {
+                self.key_column: [],
+                "position": [],
+                **{column.name: [] for column in child.columns},
+            }
+            for child in self.children
+        }
+        for record in records:
+            for column in self.columns:
+                base[column.name].append(_value(record, column))
+            record_id = record.get("id")
+            for child in self.children:
+                elements = record.get(child.field)
+                if not isinstance(elements, list):
+                    continue
+                table = children[child.field]
+                for position, element in enumerate(elements):
+                    table[self.key_column].append(record_id)
+                    table["position"].append(position)
+                    for column in child.columns:
+                        table[column.name].append(_value(element, column))
+        return base, children
+
+
+def _columns(*specs: tuple[str, ColumnType]) -> tuple[Column, ...]:
+    """Columns from ("dotted.path", type) pairs, named with underscores."""
+    return tuple(
+        Column(path.replace(".", "_"), tuple(path.split(".")), column_type)
+        for path, column_type in specs
+    )
+
+
+def _json_string(value: Any) -> str:
+    return fast_json.dumps(value).decode("utf-8")
+
+
+def _to_string(value: Any) -> str | None:
+    # Free plans return true/false instead of contact values
+    return value if isinstance(value, str) else _json_string(value)
+
+
+def _to_int(value: Any) -> int | None:
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        return None
+    return int(value)
+
+
+def _to_float(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, int | float):
+        return None
+    return float(value)
+
+
+def _to_bool(value: Any) -> bool | None:
+    return value if isinstance(value, bool) else None
+
+
+def _to_list_string(value: Any) -> list[str] | None:
+    if not isinstance(value, list):
+        return None
+    return [_to_string(item) for item in value if item is not None]
+
+
+_CONVERTERS = {
+    "string": _to_string,
+    "int64": _to_int,
+    "float64": _to_float,
+    "bool": _to_bool,
+    "list_string": _to_list_string,
+    "json": _json_string,
+}
+
+
+def _value(record: Any, column: Column) -> Any:
+    value = record
+    for key in column.path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    if value is None:
+        return None
+    return _CONVERTERS[column.type](value)
+
+
+_LOCATION = (
+    "name",
+    "locality",
+    "region",
+    "metro",
+    "country",
+    "continent",
+    "street_address",
+    "address_line_2",
+    "postal_code",
+    "geo",
+)
+
+# A child table whose element fields are not documented keeps each element
+# as one JSON string
+_RECORD_JSON = (Column("record", (), "json"),)
+
+PERSON_SCHEMA = ColumnarSchema(
+    entity="person",
+    columns=_columns(
+        ("first_name", "string"),
+        ("full_name", "string"),
+        ("id", "string"),
+        ("last_initial", "string"),
+        ("last_name", "string"),
+        ("middle_initial", "string"),
+        ("middle_name", "string"),
+        ("name_aliases", "list_string"),
+        ("mobile_phone", "string"),
+        ("personal_emails", "list_string"),
+        ("phone_numbers", "list_string"),
+        ("recommended_personal_email", "string"),
+        ("work_email", "string"),
+        ("job_company_12mo_employee_growth_rate", "float64"),
+        ("job_company_facebook_url", "string"),
+        ("job_company_founded", "int64"),
+        ("job_company_employee_count", "int64"),
+        ("job_company_id", "string"),
+        ("job_company_industry", "string"),
+        ("job_company_inferred_revenue", "string"),
+        ("job_company_linkedin_id", "string"),
+        ("job_company_linkedin_url", "string"),
+        ("job_company_location_address_line_2", "string"),
+        ("job_company_location_continent", "string"),
+        ("job_company_location_country", "string"),
+        ("job_company_location_geo", "string"),
+        ("job_company_location_locality", "string"),
+        ("job_company_location_metro", "string"),
+        ("job_company_location_name", "string"),
+        ("job_company_location_postal_code", "string"),
+        ("job_company_location_region", "string"),
+        ("job_company_location_street_address", "string"),
+        ("job_company_name", "string"),
+        ("job_company_size", "string"),
+        ("job_company_ticker", "string"),
+        ("job_company_total_funding_raised", "int64"),
+        ("job_company_twitter_url", "string"),
+        ("job_company_type", "string"),
+        ("job_company_website", "string"),
+        ("inferred_salary", "string"),
+        ("job_last_changed", "string"),
+        ("job_onet_broad_occupation", "string"),
+        ("job_onet_code", "string"),
+        ("job_onet_major_group", "string"),
+        ("job_onet_minor_group", "string"),
+        ("job_onet_specific_occupation", "string"),
+        ("job_onet_specific_occupation_detail", "string"),
+        ("job_start_date", "string"),
+        ("job_summary", "string"),
+        ("job_title", "string"),
+        ("job_title_class", "string"),
+        ("job_title_levels", "list_string"),
+        ("job_title_role", "string"),
+        ("job_title_sub_role", "string"),
+        ("birth_date", "string"),
+        ("birth_year", "int64"),
+        ("countries", "list_string"),
+        ("location_address_line_2", "string"),
+        ("location_continent", "string"),
+        ("location_country", "string"),
+        ("location_geo", "string"),
+        ("location_last_updated", "string"),
+        ("location_locality", "string"),
+        ("location_metro", "string"),
+        ("location_name", "string"),
+        ("location_names", "list_string"),
+        ("location_postal_code", "string"),
+        ("location_region", "string"),
+        ("location_street_address", "string"),
+        ("regions", "list_string"),
+        ("possible_birth_dates", "list_string"),
+        ("possible_location_names", "list_string"),
+        ("facebook_friends", "int64"),
+        ("facebook_id", "string"),
+        ("facebook_url", "string"),
+        ("facebook_username", "string"),
+        ("github_url", "string"),
+        ("github_username", "string"),
+        ("linkedin_connections", "int64"),
+        ("linkedin_id", "string"),
+        ("linkedin_url", "string"),
+        ("linkedin_username", "string"),
+        ("twitter_url", "string"),
+        ("twitter_username", "string"),
+        ("headline", "string"),
+        ("industry", "string"),
+        ("inferred_years_experience", "int64"),
+        ("interests", "list_string"),
+        ("skills", "list_string"),
+        ("summary", "string"),
+        ("dataset_version", "string"),
+        ("first_seen", "string"),
+        ("num_records", "int64"),
+        ("num_sources", "int64"),
+    ),
+    children=(
+        ChildTable(
+            "emails",
+            _columns(
+                ("address", "string"),
+                ("type", "string"),
+                ("first_seen", "string"),
+                ("last_seen", "string"),
+                ("num_sources", "int64"),
+            ),
+        ),
+        ChildTable(
+            "phones",
+            _columns(
+                ("number", "string"),
+                ("first_seen", "string"),
+                ("last_seen", "string"),
+                ("num_sources", "int64"),
+            ),
+        ),
+        ChildTable("languages", _columns(("name", "string"), ("proficiency", "int64"))),
+        ChildTable(
+            "education",
+            _columns(
+                ("school.id", "string"),
+                ("school.name", "string"),
+                ("school.type", "string"),
+                ("school.website", "string"),
+                ("school.domain", "string"),
+                ("school.linkedin_url", "string"),
+                ("school.location.name", "string"),
+                ("school.location.country", "string"),
+                ("degrees", "list_string"),
+                ("majors", "list_string"),
+                ("minors", "list_string"),
+                ("gpa", "float64"),
+                ("start_date", "string"),
+                ("end_date", "string"),
+                ("summary", "string"),
+            ),
+        ),
+        ChildTable(
+            "street_addresses",
+            _columns(
+                *((field, "string") for field in _LOCATION),
+                ("first_seen", "string"),
+                ("last_seen", "string"),
+                ("num_sources", "int64"),
+            ),
+        ),
+        ChildTable("possible_emails", _RECORD_JSON),
+        ChildTable("possible_phones", _RECORD_JSON),
+        ChildTable("possible_profiles", _RECORD_JSON),
+        ChildTable("possible_street_addresses", _RECORD_JSON),
+        ChildTable(
+            "profiles",
+            _columns(
+                ("network", "string"),
+                ("id", "string"),
+                ("url", "string"),
+                ("username", "string"),
+                ("first_seen", "string"),
+                ("last_seen", "string"),
+                ("num_sources", "int64"),
+            ),
+        ),
+        ChildTable(
+            "certifications",
+            _columns(
+                ("name", "string"),
+                ("organization", "string"),
+                ("start_date", "string"),
+                ("end_date", "string"),
+            ),
+        ),
+        ChildTable(
+            "experience",
+            _columns(
+                ("is_primary", "bool"),
+                ("company.id", "string"),
+                ("company.name", "string"),
+                ("company.industry", "string"),
+                ("company.size", "string"),
+                ("company.type", "string"),
+                ("company.founded", "int64"),
+                ("company.website", "string"),
+                ("company.linkedin_url", "string"),
+                ("company.location.name", "string"),
+                ("company.location.country", "string"),
+                ("title.name", "string"),
+                ("title.role", "string"),
+                ("title.sub_role", "string"),
+                ("title.class", "string"),
+                ("title.levels", "list_string"),
+                ("start_date", "string"),
+                ("end_date", "string"),
+                ("location_names", "list_string"),
+                ("summary", "string"),
+                ("first_seen", "string"),
+                ("last_seen", "string"),
+                ("num_sources", "int64"),
+            ),
+        ),
+        ChildTable(
+            "job_history",
+            _columns(
+                ("company_id", "string"),
+                ("company_name", "string"),
+                ("title", "string"),
+                ("first_seen", "string"),
+                ("last_seen", "string"),
+                ("num_sources", "int64"),
+            ),
+        ),
+    ),
+)
+
+COMPANY_SCHEMA = ColumnarSchema(
+    entity="company",
+    columns=_columns(
+        ("id", "string"),
+        ("name", "string"),
+        ("display_name", "string"),
+        ("affiliated_profiles", "list_string"),
+        ("alternative_domains", "list_string"),
+        ("alternative_names", "list_string"),
+        ("employee_count", "int64"),
+        ("employee_count_by_country", "json"),
+        ("founded", "int64"),
+        ("headline", "string"),
+        ("size", "string"),
+        ("summary", "string"),
+        ("tags", "list_string"),
+        ("website", "string"),
+        ("funding_stages", "list_string"),
+        ("last_funding_date", "string"),
+        ("latest_funding_stage", "string"),
+        ("number_funding_rounds", "int64"),
+        ("total_funding_raised", "float64"),
+        ("industry", "string"),
+        ("industry_v2", "string"),
+        ("location.name", "string"),
+        ("location.locality", "string"),
+        ("location.region", "string"),
+        ("location.metro", "string"),
+        ("location.country", "string"),
+        ("location.continent", "string"),
+        ("location.street_address", "string"),
+        ("location.address_line_2", "string"),
+        ("location.postal_code", "string"),
+        ("location.geo", "string"),
+        ("mic_exchange", "string"),
+        ("ticker", "string"),
+        ("type", "string"),
+        ("linkedin_id", "string"),
+        ("linkedin_slug", "string"),
+        ("linkedin_url", "string"),
+        ("facebook_url", "string"),
+        ("twitter_url", "string"),
+        ("profiles", "list_string"),
+        ("dataset_version", "string"),
+        ("average_employee_tenure", "float64"),
+        ("average_tenure_by_level", "json"),
+        ("average_tenure_by_role", "json"),
+        ("employee_count_by_month", "json"),
+        ("employee_count_by_month_by_level", "json"),
+        ("employee_count_by_month_by_role", "json"),
+        ("employee_count_by_class", "json"),
+        ("employee_count_by_role", "json"),
+        ("employee_count_by_sub_role", "json"),
+        ("employee_churn_rate", "json"),
+        ("employee_growth_rate", "json"),
+        ("employee_growth_rate_12_month_by_class", "json"),
+        ("employee_growth_rate_12_month_by_role", "json"),
+        ("employee_growth_rate_12_month_by_sub_role", "json"),
+        ("gross_additions_by_month", "json"),
+        ("gross_departures_by_month", "json"),
+        ("inferred_revenue", "string"),
+        ("top_next_employers", "json"),
+        ("top_next_employers_12_month", "json"),
+        ("top_previous_employers", "json"),
+        ("top_previous_employers_12_month", "json"),
+        ("top_us_employee_metros", "json"),
+        ("linkedin_follower_count", "int64"),
+        ("all_subsidiaries", "list_string"),
+        ("direct_subsidiaries", "list_string"),
+        ("immediate_parent", "string"),
+        ("ultimate_parent", "string"),
+        ("ultimate_parent_ticker", "string"),
+        ("ultimate_parent_mic_exchange", "string"),
+        ("affiliated_entities", "json"),
+        ("locations", "json"),
+        ("num_active_locations", "int64"),
+        ("num_total_locations", "int64"),
+        ("active_job_postings", "int64"),
+        ("deactivated_job_postings", "int64"),
+        ("active_job_postings_by_role", "json"),
+        ("deactivated_job_postings_by_role", "json"),
+        ("active_job_postings_by_class", "json"),
+        ("deactivated_job_postings_by_class", "json"),
+        ("active_job_postings_by_sub_role", "json"),
+        ("deactivated_job_postings_by_sub_role", "json"),
+        ("active_job_postings_by_country", "json"),
+        ("active_job_postings_by_metro", "json"),
+        ("active_job_postings_by_month", "json"),
+        ("deactivated_job_postings_by_month", "json"),
+    ),
+    children=(
+        ChildTable(
+            "naics",
+            _columns(
+                ("naics_code", "string"),
+                ("sector", "string"),
+                ("sub_sector", "string"),
+                ("industry_group", "string"),
+                ("naics_industry", "string"),
+                ("national_industry", "string"),
+            ),
+        ),
+        ChildTable(
+            "sic",
+            _columns(
+                ("sic_code", "string"),
+                ("major_group", "string"),
+                ("industry_group", "string"),
+                ("industry_sector", "string"),
+            ),
+        ),
+        ChildTable(
+            "recent_exec_departures",
+            _columns(
+                ("pdl_id", "string"),
+                ("departed_date", "string"),
+                ("job_title", "string"),
+                ("job_title_role", "string"),
+                ("job_title_sub_role", "string"),
+                ("job_title_class", "string"),
+                ("job_title_levels", "list_string"),
+                ("new_company_id", "string"),
+                ("new_company_job_title", "string"),
+                ("new_company_job_title_role", "string"),
+                ("new_company_job_title_sub_role", "string"),
+                ("new_company_job_title_class", "string"),
+                ("new_company_job_title_levels", "list_string"),
+            ),
+        ),
+        ChildTable(
+            "recent_exec_hires",
+            _columns(
+                ("pdl_id", "string"),
+                ("joined_date", "string"),
+                ("job_title", "string"),
+                ("job_title_role", "string"),
+                ("job_title_sub_role", "string"),
+                ("job_title_class", "string"),
+                ("job_title_levels", "list_string"),
+                ("previous_company_id", "string"),
+                ("previous_company_job_title", "string"),
+                ("previous_company_job_title_role", "string"),
+                ("previous_company_job_title_sub_role", "string"),
+                ("previous_company_job_title_class", "string"),
+                ("previous_company_job_title_levels", "list_string"),
+            ),
+        ),
+        ChildTable(
+            "funding_details",
+            _columns(
+                ("funding_round_date", "string"),
+                ("funding_raised", "float64"),
+                ("funding_currency", "string"),
+                ("funding_type", "string"),
+                ("investing_companies", "list_string"),
+                ("investing_individuals", "list_string"),
+            ),
+        ),
+    ),
+)
+
+# Export collection name → schema of its records
+COLLECTION_SCHEMAS = {
+    "prospects": PERSON_SCHEMA,
+    "persons": PERSON_SCHEMA,
+    "companies": COMPANY_SCHEMA,
+}
@@ -0,0 +1,61 @@
+"""
+Concurrency helpers for fanning out PDL calls.
+
+Provides a bounded, order-preserving gather that captures per-item
+errors and latency instead of failing the whole batch.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class TimedResult(Generic[R]):
+    """Outcome of one item in a bounded gather."""
+
+    value: R | None
+    error: BaseException | None
+    latency_ms: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def gather_bounded(
+    items: Iterable[T],
+    func: Callable[[T], Awaitable[R]],
+    limit: int,
+) -> list[TimedResult[R]]:
+    """
+    Run func over items with at most `limit` calls in flight.
+
+    Args:
+        items: Inputs to process.
+        func: Coroutine function applied to each item.
+        limit: Maximum number of concurrent calls (>= 1).
+
+    Returns:
+        One TimedResult per item, in input order. Exceptions raised by
+        func are captured on the result rather than propagated.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: T) -> TimedResult[R]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                value = await func(item)
+                error = None
+            except Exception as e:
+                value, error = None, e
+            latency_ms = (time.perf_counter() - started) * 1000
+            return TimedResult(value=value, error=error, latency_ms=latency_ms)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
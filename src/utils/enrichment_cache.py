@@ -0,0 +1,173 @@
+"""
+Persistent enrichment cache keyed by PDL ID.
+
+Stores successful person/company enrichment results in SQLite so repeated
+enrichments of the same record skip the network (and PDL credits). Entries
+expire after a TTL and the least recently used entries are evicted once the
+cache exceeds its size limit. The database file is shared by all worker
+processes on the host.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Literal
+
+from src.utils import fast_json
+
+# Per-request cache behavior:
+# - use: read from and write to the cache
+# - refresh: skip the read, always call PDL, then overwrite the cache
+# - bypass: neither read nor write the cache
+CacheMode = Literal["use", "refresh", "bypass"]
+
+
+class EnrichmentCache:
+    """SQLite-backed TTL + LRU cache of enrichment results."""
+
+    def __init__(self, db_path: str, ttl_seconds: float, max_entries: int):
+        """
+        Initialize enrichment cache.
+
+        Args:
+            db_path: SQLite file holding cache entries (created if missing).
+            ttl_seconds: Age after which an entry is treated as a miss.
+            max_entries: Entry count above which LRU entries are evicted.
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(
+            db_path, timeout=10, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS enrichment_cache (
+                namespace TEXT NOT NULL,
+                pdl_id TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, pdl_id)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_enrichment_cache_accessed "
+            "ON enrichment_cache (accessed_at)"
+        )
+
+    def get_many(
+        self, namespace: str, pdl_ids: list[str], now: float | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Look up cached results.
+
+        Args:
+            namespace: Record kind plus any options that change the payload.
+            pdl_ids: PDL IDs to look up.
+
+        Returns:
+            Mapping of PDL ID to cached result for fresh hits only.
+        """
+        now = time.time() if now is None else now
+        unique_ids = list(dict.fromkeys(pdl_ids))
+        if not unique_ids:
+            return {}
+
+        hits: dict[str, dict[str, Any]] = {}
+        expired: list[str] = []
+        with self._lock:
+            for start in range(0, len(unique_ids), 500):
+                batch = unique_ids[start : start + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"""
+                    SELECT pdl_id, payload, created_at FROM enrichment_cache
+                    WHERE namespace = ? AND pdl_id IN ({placeholders})
+                    """,
+                    (namespace, *batch),
+                ).fetchall()
+                for pdl_id, payload, created_at in rows:
+                    if now - created_at > self.ttl_seconds:
+                        expired.append(pdl_id)
+                    else:
+                        hits[pdl_id] = fast_json.loads(payload)
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "UPDATE enrichment_cache SET accessed_at = ? "
+                "WHERE namespace = ? AND pdl_id = ?",
+                [(now, namespace, pdl_id) for pdl_id in hits],
+            )
+            self._conn.executemany(
+                "DELETE FROM enrichment_cache WHERE namespace = ? AND pdl_id = ?",
+                [(namespace, pdl_id) for pdl_id in expired],
+            )
+            self._conn.execute("COMMIT")
+
+        self.counters["hits"] += len(hits)
+        self.counters["misses"] += len(unique_ids) - len(hits)
+        self.counters["expirations"] += len(expired)
+        return hits
+
+    def put_many(
+        self,
+        namespace: str,
+        results: dict[str, dict[str, Any]],
+        now: float | None = None,
+    ) -> None:
+        """Store results by PDL ID, then evict LRU entries over max_entries."""
+        if not results:
+            return
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO enrichment_cache
+                    (namespace, pdl_id, payload, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (namespace, pdl_id, fast_json.dumps(result), now, now)
+                    for pdl_id, result in results.items()
+                ],
+            )
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM enrichment_cache"
+            ).fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM enrichment_cache WHERE rowid IN (
+                        SELECT rowid FROM enrichment_cache
+                        ORDER BY accessed_at LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+            self._conn.execute("COMMIT")
+
+        self.counters["writes"] += len(results)
+        self.counters["evictions"] += max(0, overflow)
+
+    def metrics(self) -> dict[str, int]:
+        """Hit/miss/eviction counters for this process."""
+        return {
+            key: self.counters[key]
+            for key in ("hits", "misses", "writes", "evictions", "expirations")
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
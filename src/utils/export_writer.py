@@ -0,0 +1,738 @@
+"""
+Incremental export writers.
+
+Exports have the shape
+
+    {"generated_at": ..., "total_<collection>": N, "<collection>": [...]}
+
+and used to be built as one dict and dumped in a single json.dump call on
+the event loop. JSONExportWriter streams records to the file as they are
+produced instead: the header is written up front with a fixed-width count
+placeholder that is patched in place when the writer is closed, so neither
+the record list nor the encoded document is ever held in memory.
+
+Besides that legacy pretty-printed document ("json"), exports can be
+written in streaming-friendly formats:
+- json_compact: the same document without indentation
+- jsonl: one compact JSON record per line
+- jsonl_gzip / jsonl_zstd: JSONL compressed with gzip or zstd (zstd needs
+  the optional zstandard package)
+
+These are written by ShardedExportWriter into a directory of shards that
+rotates to a new shard once export_shard_max_records records or
+export_shard_max_bytes bytes on disk are reached, plus a manifest.json
+listing every shard with its record count, size and SHA-256 checksum.
+
+"csv" writes one flat file of rows produced by a compiled column set (see
+src/utils/flatten.py).
+
+The columnar formats ("parquet" and "arrow", needing the optional pyarrow
+package) are written by ColumnarExportWriter into a directory with one
+file per table of the collection's columnar layout (see
+src/utils/columnar_schema.py), plus a manifest.json of the tables.
+
+AsyncExportWriter and export_records run the encoding and file I/O in a
+worker thread so exports do not stall the event loop.
+"""
+
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import shutil
+import zlib
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Annotated, Any, Literal
+
+from pydantic import AfterValidator
+
+from src.core.config import settings
+from src.utils import fast_json
+from src.utils.columnar_schema import COLLECTION_SCHEMAS, Column, ColumnarSchema
+from src.utils.flatten import CompiledColumns, csv_columns, escape_formula
+from src.utils.pdl_client import PDL_SEARCH_PAGE_LIMIT
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without zstandard
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pyarrow = None
+
+EXPORTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "..", "exports")
+
+# Width reserved for the record count in the header (patched on close)
+_COUNT_WIDTH = 20
+
+_SHARD_EXTENSIONS = {
+    "json_compact": "json",
+    "jsonl": "jsonl",
+    "jsonl_gzip": "jsonl.gz",
+    "jsonl_zstd": "jsonl.zst",
+}
+
+_COLUMNAR_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def _check_export_format(export_format: str) -> str:
+    if export_format == "jsonl_zstd" and zstandard is None:
+        raise ValueError("jsonl_zstd exports require the zstandard package")
+    if export_format in _COLUMNAR_EXTENSIONS and pyarrow is None:
+        raise ValueError(f"{export_format} exports require the pyarrow package")
+    return export_format
+
+
+ExportFormat = Annotated[
+    Literal[
+        "json",
+        "json_compact",
+        "jsonl",
+        "jsonl_gzip",
+        "jsonl_zstd",
+        "csv",
+        "parquet",
+        "arrow",
+    ],
+    AfterValidator(_check_export_format),
+]
+
+
+def export_file_path(prefix: str, extension: str = "json") -> str:
+    """
+    Reserve a new timestamped export file, creating the exports directory
+    if needed.
+
+    The file is created empty with an exclusive open, and a numeric suffix
+    is added if an export with the same timestamp exists, so concurrent
+    exports (running in worker threads) never write the same file.
+
+    Args:
+        prefix: File name prefix (e.g. "prospects").
+        extension: File extension without the dot.
+    """
+    os.makedirs(EXPORTS_DIRECTORY, exist_ok=True)
+    base = os.path.join(
+        EXPORTS_DIRECTORY, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    path, suffix = f"{base}.{extension}", 1
+    while True:
+        try:
+            with open(path, "xb"):
+                return path
+        except FileExistsError:
+            path, suffix = f"{base}_{suffix}.{extension}", suffix + 1
+
+
+def export_directory(prefix: str) -> str:
+    """
+    Create a new timestamped directory for a sharded export.
+
+    A numeric suffix is added if an export with the same timestamp exists,
+    so two exports never write shards into the same directory.
+
+    Args:
+        prefix: Directory name prefix (e.g. "prospects").
+    """
+    os.makedirs(EXPORTS_DIRECTORY, exist_ok=True)
+    base = os.path.join(
+        EXPORTS_DIRECTORY, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    )
+    path, suffix = base, 1
+    while True:
+        try:
+            os.mkdir(path)
+            return path
+        except FileExistsError:
+            path, suffix = f"{base}_{suffix}", suffix + 1
+
+
+class JSONExportWriter:
+    """Writes an export file record by record (blocking file I/O)."""
+
+    def __init__(self, path: str, collection: str, compact: bool = False):
+        """
+        Open the export file and write its header.
+
+        Args:
+            path: File to write.
+            collection: Name of the record list (e.g. "prospects"); the count
+                is written as "total_<collection>".
+            compact: Write without indentation instead of like json.dump
+                with indent=2.
+        """
+        self.path = path
+        self.collection = collection
+        self.compact = compact
+        self.count = 0
+        self._file = open(path, "wb")
+        newline = b"" if compact else b"\n  "
+        self._file.write(
+            b"{" + newline + b'"generated_at":' + (b"" if compact else b" ")
+            + json.dumps(datetime.now().isoformat()).encode()
+            + b"," + newline + f'"total_{collection}":'.encode()
+            + (b"" if compact else b" ")
+        )
+        self._count_offset = self._file.tell()
+        self._file.write(
+            b" " * _COUNT_WIDTH + b"," + newline + f'"{collection}":'.encode()
+            + (b"[" if compact else b" [")
+        )
+
+    @property
+    def size(self) -> int:
+        """Bytes written so far."""
+        return self._file.tell()
+
+    def write(self, records: Iterable[dict[str, Any]]) -> None:
+        """Append records."""
+        for record in records:
+            self.write_record(record)
+
+    def write_record(self, record: dict[str, Any]) -> None:
+        """Append one record."""
+        if self.compact:
+            self._file.write((b"," if self.count else b"") + fast_json.dumps(record))
+        else:
+            encoded = json.dumps(record, indent=2, ensure_ascii=False)
+            self._file.write(
+                (b",\n    " if self.count else b"\n    ")
+                + encoded.replace("\n", "\n    ").encode("utf-8")
+            )
+        self.count += 1
+
+    def close(self) -> str:
+        """
+        Finish the document and patch the record count into the header.
+
+        Returns:
+            Path to the export file.
+        """
+        if self.compact:
+            self._file.write(b"]}\n")
+        else:
+            self._file.write(b"\n  ]\n}\n" if self.count else b"]\n}\n")
+        self._file.seek(self._count_offset)
+        self._file.write(str(self.count).ljust(_COUNT_WIDTH).encode())
+        self._file.close()
+        return self.path
+
+    def abort(self) -> None:
+        """Close and delete an unfinished export file."""
+        self._file.close()
+        os.remove(self.path)
+
+
+class _JSONLShard:
+    """One JSONL shard, optionally compressed, checksummed as it is written."""
+
+    def __init__(self, path: str, export_format: str):
+        self.path = path
+        self.count = 0
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = open(path, "wb")
+        if export_format == "jsonl_gzip":
+            # wbits=31 produces a gzip container readable by gzip/zcat
+            self._compressor = zlib.compressobj(wbits=31)
+        elif export_format == "jsonl_zstd":
+            self._compressor = zstandard.ZstdCompressor().compressobj()
+        else:
+            self._compressor = None
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._file.write(data)
+            self._sha256.update(data)
+            self.size += len(data)
+
+    def write_record(self, record: dict[str, Any]) -> None:
+        line = fast_json.dumps(record) + b"\n"
+        self._emit(self._compressor.compress(line) if self._compressor else line)
+        self.count += 1
+
+    def close(self) -> str:
+        if self._compressor:
+            self._emit(self._compressor.flush())
+        self._file.close()
+        return self._sha256.hexdigest()
+
+    def abort(self) -> None:
+        self._file.close()
+
+
+class _CompactJSONShard(JSONExportWriter):
+    """A json_compact shard; checksummed on close, after the count patch."""
+
+    def __init__(self, path: str, collection: str):
+        super().__init__(path, collection, compact=True)
+
+    def close(self) -> str:
+        super().close()
+        return _file_sha256(self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+
+
+class ShardedExportWriter:
+    """
+    Writes an export as rotating shards plus a manifest (blocking file I/O).
+
+    Shards are named part-00000.<ext>, part-00001.<ext>, ... inside the
+    export directory. For compressed formats the size threshold applies to
+    compressed bytes, so a shard can overshoot it by one compression block.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        collection: str,
+        export_format: str,
+        max_records: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        """
+        Args:
+            directory: Existing, empty directory to write into.
+            collection: Name of the exported records (e.g. "prospects").
+            export_format: One of the sharded formats (see ExportFormat).
+            max_records: Records per shard (defaults to settings).
+            max_bytes: Bytes per shard (defaults to settings).
+        """
+        self.directory = directory
+        self.collection = collection
+        self.export_format = export_format
+        self.max_records = max_records or settings.export_shard_max_records
+        self.max_bytes = max_bytes or settings.export_shard_max_bytes
+        self.count = 0
+        self.shards: list[dict[str, Any]] = []
+        self._shard: _JSONLShard | _CompactJSONShard | None = None
+
+    def write(self, records: Iterable[dict[str, Any]]) -> None:
+        """Append records, rotating to a new shard at either threshold."""
+        for record in records:
+            if self._shard is None:
+                self._open_shard()
+            self._shard.write_record(record)
+            self.count += 1
+            if (
+                self._shard.count >= self.max_records
+                or self._shard.size >= self.max_bytes
+            ):
+                self._close_shard()
+
+    def close(self) -> str:
+        """
+        Close the current shard and write the manifest.
+
+        Returns:
+            Path to the manifest file.
+        """
+        if self._shard is not None:
+            self._close_shard()
+        manifest = {
+            "generated_at": datetime.now().isoformat(),
+            "collection": self.collection,
+            "format": self.export_format,
+            f"total_{self.collection}": self.count,
+            "shards": self.shards,
+        }
+        return _write_manifest(self.directory, manifest)
+
+    def abort(self) -> None:
+        """Close the current shard and delete the export directory."""
+        if self._shard is not None:
+            self._shard.abort()
+            self._shard = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _open_shard(self) -> None:
+        name = (
+            f"part-{len(self.shards):05d}.{_SHARD_EXTENSIONS[self.export_format]}"
+        )
+        path = os.path.join(self.directory, name)
+        if self.export_format == "json_compact":
+            self._shard = _CompactJSONShard(path, self.collection)
+        else:
+            self._shard = _JSONLShard(path, self.export_format)
+
+    def _close_shard(self) -> None:
+        shard, self._shard = self._shard, None
+        sha256 = shard.close()
+        self.shards.append(
+            {
+                "path": os.path.basename(shard.path),
+                "records": shard.count,
+                "bytes": os.path.getsize(shard.path),
+                "sha256": sha256,
+            }
+        )
+
+
+class CSVExportWriter:
+    """Writes records as flat CSV rows (blocking file I/O)."""
+
+    def __init__(
+        self,
+        path: str,
+        columns: CompiledColumns,
+        escape_formulas: bool | None = None,
+    ):
+        """
+        Open the export file and write the header row.
+
+        Args:
+            path: File to write.
+            columns: Compiled column set (see src/utils/flatten.py).
+            escape_formulas: Prefix cells a spreadsheet would evaluate as a
+                formula with "'" (see escape_formula). Defaults to
+                settings.csv_escape_formulas.
+        """
+        self.path = path
+        self.columns = columns
+        self.escape_formulas = (
+            settings.csv_escape_formulas if escape_formulas is None else escape_formulas
+        )
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._file)
+        self.write_row(list(columns.headers))
+
+    def write_row(self, row: list[str]) -> None:
+        """Write one row of cells, escaping formulas if enabled."""
+        if self.escape_formulas:
+            row = [escape_formula(cell) for cell in row]
+        self._csv.writerow(row)
+
+    def write(self, records: Iterable[dict[str, Any]]) -> None:
+        """Append one row per record."""
+        for row in self.columns.rows(records):
+            self.write_row(row)
+            self.count += 1
+
+    def close(self) -> str:
+        """
+        Close the export file.
+
+        Returns:
+            Path to the export file.
+        """
+        self._file.close()
+        return self.path
+
+    def abort(self) -> None:
+        """Close and delete an unfinished export file."""
+        self._file.close()
+        os.remove(self.path)
+
+
+def _arrow_type(column: Column) -> Any:
+    return {
+        "string": pyarrow.string(),
+        "int64": pyarrow.int64(),
+        "float64": pyarrow.float64(),
+        "bool": pyarrow.bool_(),
+        "list_string": pyarrow.list_(pyarrow.string()),
+        "json": pyarrow.string(),
+    }[column.type]
+
+
+def _arrow_schemas(schema: ColumnarSchema, collection: str) -> dict[str, Any]:
+    """
+    Arrow schemas of every table of a columnar export.
+
+    Args:
+        schema: Columnar layout of the exported records.
+        collection: Export collection name (e.g. "prospects").
+
+    Returns:
+        Table name → pyarrow.Schema, base table first.
+    """
+    tables = {
+        collection: pyarrow.schema(
+            [(column.name, _arrow_type(column)) for column in schema.columns]
+        )
+    }
+    for child in schema.children:
+        tables[f"{collection}_{child.field}"] = pyarrow.schema(
+            [
+                (schema.key_column, pyarrow.string()),
+                ("position", pyarrow.int32()),
+                *((column.name, _arrow_type(column)) for column in child.columns),
+            ]
+        )
+    return tables
+
+
+class ColumnarExportWriter:
+    """
+    Writes records as Parquet or Arrow IPC tables (blocking file I/O).
+
+    The directory holds the base table "<collection>.<ext>" and one
+    "<collection>_<field>.<ext>" per child table. Records are buffered for
+    at most batch_size records (one PDL search page by default) and then
+    written as one row group / record batch, so memory stays flat however
+    large the export grows. Every table is created up front with its full
+    schema, so empty child tables are still present with zero rows.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        collection: str,
+        export_format: str,
+        batch_size: int = PDL_SEARCH_PAGE_LIMIT,
+    ):
+        """
+        Create every table file in the export directory.
+
+        Args:
+            directory: Existing, empty directory to write into.
+            collection: Name of the exported records ("prospects",
+                "persons" or "companies").
+            export_format: "parquet" or "arrow".
+            batch_size: Records per row group / record batch.
+        """
+        self.directory = directory
+        self.collection = collection
+        self.export_format = export_format
+        self.batch_size = batch_size
+        self.count = 0
+        self.schema = COLLECTION_SCHEMAS[collection]
+        self._buffer: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._writers: dict[str, Any] = {}
+        self._arrow_schemas = _arrow_schemas(self.schema, collection)
+        extension = _COLUMNAR_EXTENSIONS[export_format]
+        for table, arrow_schema in self._arrow_schemas.items():
+            path = os.path.join(directory, f"{table}.{extension}")
+            if export_format == "parquet":
+                writer = pyarrow.parquet.ParquetWriter(path, arrow_schema)
+            else:
+                writer = pyarrow.ipc.new_file(path, arrow_schema)
+            self._writers[table] = writer
+            self._rows[table] = 0
+
+    def write(self, records: Iterable[dict[str, Any]]) -> None:
+        """
+        Append records, flushing a batch per batch_size records.
+
+        Records still buffered at the end of the call are flushed too, so
+        writing one page per call produces one row group per page.
+        """
+        for record in records:
+            self._buffer.append(record)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+        self._flush()
+
+    def close(self) -> str:
+        """
+        Close every table and write the manifest.
+
+        Returns:
+            Path to the manifest file.
+        """
+        self._flush()
+        for writer in self._writers.values():
+            writer.close()
+        extension = _COLUMNAR_EXTENSIONS[self.export_format]
+        tables = []
+        for table, rows in self._rows.items():
+            path = os.path.join(self.directory, f"{table}.{extension}")
+            tables.append(
+                {
+                    "name": table,
+                    "path": os.path.basename(path),
+                    "rows": rows,
+                    "bytes": os.path.getsize(path),
+                    "sha256": _file_sha256(path),
+                }
+            )
+        manifest = {
+            "generated_at": datetime.now().isoformat(),
+            "collection": self.collection,
+            "format": self.export_format,
+            f"total_{self.collection}": self.count,
+            "key_column": self.schema.key_column,
+            "tables": tables,
+        }
+        return _write_manifest(self.directory, manifest)
+
+    def abort(self) -> None:
+        """Close every table and delete the export directory."""
+        for writer in self._writers.values():
+            try:
+                writer.close()
+            except Exception:
+                pass
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        base, children = self.schema.to_columns(self._buffer)
+        self._buffer = []
+        self._write_table(self.collection, base)
+        for field, columns in children.items():
+            if columns["position"]:
+                self._write_table(f"{self.collection}_{field}", columns)
+
+    def _write_table(self, table: str, columns: dict[str, list]) -> None:
+        batch = pyarrow.RecordBatch.from_pydict(
+            columns, schema=self._arrow_schemas[table]
+        )
+        self._writers[table].write_table(pyarrow.Table.from_batches([batch]))
+        self._rows[table] += batch.num_rows
+
+
+def _file_sha256(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _write_manifest(directory: str, manifest: dict[str, Any]) -> str:
+    path = os.path.join(directory, MANIFEST_FILE_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+ExportWriter = (
+    JSONExportWriter | CSVExportWriter | ShardedExportWriter | ColumnarExportWriter
+)
+
+
+def open_export_writer(
+    prefix: str,
+    collection: str,
+    export_format: str = "json",
+    columns: CompiledColumns | None = None,
+) -> ExportWriter:
+    """
+    Start a new timestamped export in the given format.
+
+    "json" writes a single document (see JSONExportWriter), "csv" a single
+    flat file (see CSVExportWriter), "parquet" and "arrow" a columnar
+    export directory (see ColumnarExportWriter), and every other format a
+    sharded export directory (see ShardedExportWriter).
+
+    Args:
+        prefix: File or directory name prefix (e.g. "prospects").
+        collection: Name of the exported records.
+        export_format: Export format (see ExportFormat).
+        columns: CSV column set (defaults to the collection's "crm"
+            profile).
+    """
+    _check_export_format(export_format)
+    if export_format == "json":
+        return JSONExportWriter(export_file_path(prefix), collection)
+    if export_format == "csv":
+        return CSVExportWriter(
+            export_file_path(prefix, "csv"), columns or csv_columns(collection)
+        )
+    if export_format in _COLUMNAR_EXTENSIONS:
+        return ColumnarExportWriter(
+            export_directory(prefix), collection, export_format
+        )
+    return ShardedExportWriter(export_directory(prefix), collection, export_format)
+
+
+class AsyncExportWriter:
+    """Export writer whose encoding and I/O run in a worker thread."""
+
+    def __init__(
+        self,
+        prefix: str,
+        collection: str,
+        export_format: str = "json",
+        columns: CompiledColumns | None = None,
+    ):
+        self.prefix = prefix
+        self.collection = collection
+        self.export_format = export_format
+        self.columns = columns
+        self._writer: ExportWriter | None = None
+
+    @property
+    def count(self) -> int:
+        return self._writer.count if self._writer else 0
+
+    async def open(self) -> None:
+        self._writer = await asyncio.to_thread(
+            open_export_writer,
+            self.prefix,
+            self.collection,
+            self.export_format,
+            self.columns,
+        )
+
+    async def write(self, records: list[dict[str, Any]]) -> None:
+        """Append a batch of records (e.g. one page)."""
+        await asyncio.to_thread(self._writer.write, records)
+
+    async def close(self) -> str:
+        return await asyncio.to_thread(self._writer.close)
+
+    async def abort(self) -> None:
+        await asyncio.to_thread(self._writer.abort)
+
+    async def __aenter__(self) -> "AsyncExportWriter":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.abort()
+
+
+async def export_records(
+    prefix: str,
+    collection: str,
+    records: Iterable[dict],
+    export_format: str = "json",
+    columns: CompiledColumns | None = None,
+) -> str:
+    """
+    Export records to a new timestamped export off the event loop.
+
+    records may be a lazy iterable (e.g. a checkpoint's partial export); it
+    is consumed in the worker thread, one record at a time.
+
+    Args:
+        prefix: File or directory name prefix (e.g. "prospects").
+        collection: Name of the exported records.
+        records: Records to export.
+        export_format: Export format (see ExportFormat).
+        columns: CSV column set (see open_export_writer).
+
+    Returns:
+        Path to the exported JSON or CSV file, or to the manifest of a
+        sharded or columnar export.
+    """
+
+    def write() -> str:
+        writer = open_export_writer(prefix, collection, export_format, columns)
+        try:
+            writer.write(records)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.close()
+
+    return await asyncio.to_thread(write)
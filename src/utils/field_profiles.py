@@ -0,0 +1,102 @@
+"""
+Named field profiles for PDL server-side projection.
+
+A profile maps onto PDL's data_include parameter so search and enrichment
+responses only carry the fields a flow actually uses:
+- minimal: identity, current role and primary contact
+- outreach: minimal plus what is needed to qualify and reach out
+- full: no projection (PDL's complete record)
+
+The record "id" is always requested, because pagination, caching and
+search-to-enrichment matching key on it.
+"""
+
+from typing import Literal
+
+FieldProfile = Literal["minimal", "outreach", "full"]
+
+_PERSON_MINIMAL = (
+    "id",
+    "full_name",
+    "job_title",
+    "job_company_id",
+    "job_company_name",
+    "work_email",
+    "linkedin_url",
+)
+
+_COMPANY_MINIMAL = (
+    "id",
+    "name",
+    "website",
+    "industry",
+    "size",
+    "linkedin_url",
+)
+
+PERSON_FIELD_PROFILES: dict[str, tuple[str, ...] | None] = {
+    "minimal": _PERSON_MINIMAL,
+    "outreach": _PERSON_MINIMAL
+    + (
+        "first_name",
+        "last_name",
+        "job_title_role",
+        "job_title_levels",
+        "job_company_website",
+        "job_company_industry",
+        "job_company_size",
+        "job_company_location_country",
+        "location_name",
+        "location_country",
+        "emails",
+        "personal_emails",
+        "mobile_phone",
+        "phone_numbers",
+        "skills",
+    ),
+    "full": None,
+}
+
+COMPANY_FIELD_PROFILES: dict[str, tuple[str, ...] | None] = {
+    "minimal": _COMPANY_MINIMAL,
+    "outreach": _COMPANY_MINIMAL
+    + (
+        "display_name",
+        "ticker",
+        "founded",
+        "employee_count",
+        "location",
+        "summary",
+        "tags",
+        "naics",
+        "sic",
+    ),
+    "full": None,
+}
+
+
+def person_fields(profile: FieldProfile) -> list[str] | None:
+    """Fields for a person profile (None means the full record)."""
+    fields = PERSON_FIELD_PROFILES[profile]
+    return list(fields) if fields else None
+
+
+def company_fields(profile: FieldProfile) -> list[str] | None:
+    """Fields for a company profile (None means the full record)."""
+    fields = COMPANY_FIELD_PROFILES[profile]
+    return list(fields) if fields else None
+
+
+def data_include(fields: list[str] | None) -> str | None:
+    """
+    Encode a field projection as PDL's comma-separated data_include value.
+
+    Args:
+        fields: Field names to include, or None for the full record.
+
+    Returns:
+        The data_include string (always including "id"), or None.
+    """
+    if not fields:
+        return None
+    return ",".join(dict.fromkeys(["id", *fields]))
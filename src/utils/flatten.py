@@ -0,0 +1,402 @@
+"""
+Flattening of nested PDL records into tabular (CSV) rows.
+
+A column set is a list of column specs "header=expression" (or just
+"expression", which is then also the header). Expressions address values
+inside a record:
+
+    job_title                       top-level field
+    job_company_name || work_email  first non-empty alternative
+    experience[0].title.name        list element by position
+    experience[is_primary].company.name
+                                    first element whose field is truthy
+    emails[type=current_professional].address
+                                    first element whose field equals a value
+    experience[*].company.name      every element's value
+
+Lists are joined with "; ", objects are written as compact JSON and
+missing values as empty cells. escape_formula guards cells that a
+spreadsheet would evaluate as a formula; the CSV writer applies it when
+csv_escape_formulas is set.
+
+Expressions are parsed and compiled into chains of closures once per
+column set (see compile_columns, which is cached), so flattening a record
+is a fixed sequence of dict/list lookups rather than a walk over path
+strings per record.
+
+Named column sets (CSVProfile) exist for person and company records; the
+"detailed" person profile adds the top csv_top_experiences experiences as
+numbered columns (see experience_columns).
+"""
+
+import re
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Annotated, Any, Literal
+
+from pydantic import AfterValidator, Field
+
+from src.core.config import settings
+from src.utils import fast_json
+
+CSVProfile = Literal["minimal", "crm", "detailed"]
+
+_STEP = re.compile(r"([^.\[\]]+)|\[([^\]]*)\]|(\.)")
+# "header=" prefix; headers cannot contain selector or path characters, so
+# the "=" of an "[field=value]" selector is never taken for one
+_HEADER = re.compile(r"\s*([^=\[\].|]+?)\s*=(.*)", re.S)
+_LIST_SEPARATOR = "; "
+# Leading characters that make spreadsheets evaluate a cell as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_NUMBER = re.compile(r"[+-]?\d+(\.\d+)?([eE][+-]?\d+)?")
+
+Getter = Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class CompiledColumns:
+    """A column set compiled into one getter per column."""
+
+    headers: tuple[str, ...]
+    getters: tuple[Getter, ...]
+
+    def row(self, record: dict[str, Any]) -> list[str]:
+        """Flatten one record into a row of cell strings."""
+        return [_cell(getter(record)) for getter in self.getters]
+
+    def rows(self, records: Iterable[dict[str, Any]]) -> Iterator[list[str]]:
+        """Flatten records lazily, one row per record."""
+        row = self.row
+        for record in records:
+            yield row(record)
+
+
+def parse_column(spec: str) -> tuple[str, str]:
+    """
+    Split a column spec into (header, expression).
+
+    Raises:
+        ValueError: If the spec has an empty header or expression.
+    """
+    match = _HEADER.fullmatch(spec)
+    header, expression = match.groups() if match else (spec, spec)
+    header, expression = header.strip(), expression.strip()
+    if not header or not expression:
+        raise ValueError(f"Invalid column spec: {spec!r}")
+    return header, expression
+
+
+def compile_expression(expression: str) -> Getter:
+    """
+    Compile an expression into a getter (record → value or None).
+
+    Raises:
+        ValueError: If the expression is malformed.
+    """
+    alternatives = [
+        _compile_steps(_parse_steps(part.strip()), expression)
+        for part in expression.split("||")
+    ]
+    if len(alternatives) == 1:
+        return alternatives[0]
+
+    def first_present(value: Any) -> Any:
+        for getter in alternatives:
+            found = getter(value)
+            if found is not None and found != "" and found != []:
+                return found
+        return None
+
+    return first_present
+
+
+@lru_cache(maxsize=64)
+def compile_columns(specs: tuple[str, ...]) -> CompiledColumns:
+    """
+    Compile a column set (cached per distinct set).
+
+    Args:
+        specs: Column specs ("header=expression" or "expression").
+
+    Raises:
+        ValueError: If a spec is malformed or headers repeat.
+    """
+    parsed = [parse_column(spec) for spec in specs]
+    headers = tuple(header for header, _ in parsed)
+    if len(set(headers)) != len(headers):
+        raise ValueError("Column headers must be unique")
+    return CompiledColumns(
+        headers=headers,
+        getters=tuple(compile_expression(expression) for _, expression in parsed),
+    )
+
+
+def _validate_columns(specs: list[str]) -> list[str]:
+    compile_columns(tuple(specs))
+    return specs
+
+
+# Request field type for custom column sets (validated by compiling them)
+CSVColumns = Annotated[
+    list[str], Field(min_length=1, max_length=200), AfterValidator(_validate_columns)
+]
+
+
+def experience_columns(count: int) -> tuple[str, ...]:
+    """Numbered columns for the first count experience entries."""
+    columns: list[str] = []
+    for n in range(1, count + 1):
+        prefix, path = f"experience_{n}", f"experience[{n - 1}]"
+        columns += [
+            f"{prefix}_company={path}.company.name",
+            f"{prefix}_title={path}.title.name",
+            f"{prefix}_start_date={path}.start_date",
+            f"{prefix}_end_date={path}.end_date",
+        ]
+    return tuple(columns)
+
+
+_PERSON_MINIMAL = (
+    "id",
+    "full_name",
+    "email=work_email || emails[type=current_professional].address"
+    " || emails[0].address || personal_emails[0]",
+    "title=job_title",
+    "company=job_company_name",
+    "linkedin_url",
+)
+
+_PERSON_CRM = _PERSON_MINIMAL + (
+    "first_name",
+    "last_name",
+    "phone=mobile_phone || phone_numbers[0]",
+    "title_role=job_title_role",
+    "title_levels=job_title_levels",
+    "company_id=job_company_id",
+    "company_website=job_company_website",
+    "company_industry=job_company_industry",
+    "company_size=job_company_size",
+    "location=location_name",
+    "country=location_country",
+)
+
+_COMPANY_MINIMAL = ("id", "name", "website", "linkedin_url")
+
+_COMPANY_CRM = _COMPANY_MINIMAL + (
+    "industry",
+    "size",
+    "employee_count",
+    "founded",
+    "location=location.name",
+    "country=location.country",
+    "sic_codes=sic[*].sic_code",
+    "naics_codes=naics[*].naics_code",
+)
+
+PERSON_CSV_PROFILES: dict[str, tuple[str, ...]] = {
+    "minimal": _PERSON_MINIMAL,
+    "crm": _PERSON_CRM,
+    "detailed": _PERSON_CRM
+    + (
+        "skills",
+        "headline",
+        "inferred_years_experience",
+        "education_school=education[0].school.name",
+        "education_degrees=education[0].degrees",
+    )
+    + experience_columns(settings.csv_top_experiences),
+}
+
+COMPANY_CSV_PROFILES: dict[str, tuple[str, ...]] = {
+    "minimal": _COMPANY_MINIMAL,
+    "crm": _COMPANY_CRM,
+    "detailed": _COMPANY_CRM
+    + (
+        "display_name",
+        "ticker",
+        "type",
+        "tags",
+        "summary",
+        "total_funding_raised",
+        "latest_funding_stage",
+    ),
+}
+
+# Export collection name → named column sets for its records
+COLLECTION_CSV_PROFILES = {
+    "prospects": PERSON_CSV_PROFILES,
+    "persons": PERSON_CSV_PROFILES,
+    "companies": COMPANY_CSV_PROFILES,
+}
+
+
+def csv_columns(
+    collection: str, profile: str = "crm", columns: Sequence[str] | None = None
+) -> CompiledColumns:
+    """
+    Compiled column set for an export collection.
+
+    Args:
+        collection: Export collection name ("prospects", "persons" or
+            "companies").
+        profile: Named column set, used when no custom columns are given.
+        columns: Custom column specs.
+    """
+    if columns:
+        return compile_columns(tuple(columns))
+    return compile_columns(COLLECTION_CSV_PROFILES[collection][profile])
+
+
+# ==========================================================================
+# Expression compilation
+# ==========================================================================
+
+
+def _parse_steps(expression: str) -> list[tuple]:
+    """Parse "a.b[0].c[key=value]" into lookup steps."""
+    steps: list[tuple] = []
+    position = 0
+    expect_key = True
+    for match in _STEP.finditer(expression):
+        if match.start() != position:
+            break
+        position = match.end()
+        key, selector, dot = match.groups()
+        if dot:
+            if expect_key:
+                break
+            expect_key = True
+        elif key is not None:
+            if not expect_key:
+                break
+            steps.append(("key", key.strip()))
+            expect_key = False
+        else:
+            if expect_key:
+                break
+            steps.append(_parse_selector(selector.strip(), expression))
+    if not expression or position != len(expression) or expect_key:
+        raise ValueError(f"Invalid column expression: {expression!r}")
+    return steps
+
+
+def _parse_selector(selector: str, expression: str) -> tuple:
+    if selector == "*":
+        return ("all",)
+    if selector.isdigit():
+        return ("index", int(selector))
+    field, sep, value = selector.partition("=")
+    if not field or (sep and not value):
+        raise ValueError(f"Invalid selector [{selector}] in {expression!r}")
+    return ("match", field.strip(), value.strip() if sep else None)
+
+
+def _compile_steps(steps: list[tuple], expression: str) -> Getter:
+    """Fold steps right to left into one closure chain."""
+    if not steps:
+        raise ValueError(f"Invalid column expression: {expression!r}")
+    getter: Getter | None = None
+    for step in reversed(steps):
+        getter = _STEP_COMPILERS[step[0]](*step[1:], getter)
+    return getter
+
+
+def _key_step(key: str, then: Getter | None) -> Getter:
+    if then is None:
+
+        def get(value: Any) -> Any:
+            return value.get(key) if isinstance(value, dict) else None
+
+    else:
+
+        def get(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+            return None if value is None else then(value)
+
+    return get
+
+
+def _index_step(index: int, then: Getter | None) -> Getter:
+    def get(value: Any) -> Any:
+        if not isinstance(value, list) or len(value) <= index:
+            return None
+        value = value[index]
+        return value if then is None or value is None else then(value)
+
+    return get
+
+
+def _match_step(field: str, expected: str | None, then: Getter | None) -> Getter:
+    if expected is None:
+
+        def matches(element: dict) -> bool:
+            return bool(element.get(field))
+
+    else:
+
+        def matches(element: dict) -> bool:
+            value = element.get(field)
+            return value is not None and _cell(value) == expected
+
+    def get(value: Any) -> Any:
+        if not isinstance(value, list):
+            return None
+        for element in value:
+            if isinstance(element, dict) and matches(element):
+                return element if then is None else then(element)
+        return None
+
+    return get
+
+
+def _all_step(then: Getter | None) -> Getter:
+    def get(value: Any) -> Any:
+        if not isinstance(value, list):
+            return None
+        values = value if then is None else [then(element) for element in value]
+        flat: list[Any] = []
+        for item in values:
+            if isinstance(item, list):
+                flat.extend(item)
+            elif item is not None:
+                flat.append(item)
+        return flat
+
+    return get
+
+
+_STEP_COMPILERS: dict[str, Callable[..., Getter]] = {
+    "key": _key_step,
+    "index": _index_step,
+    "match": _match_step,
+    "all": _all_step,
+}
+
+
+def escape_formula(cell: str) -> str:
+    """
+    Prefix a cell that a spreadsheet would run as a formula with "'".
+
+    Plain numbers such as "-5" are left as they are.
+    """
+    if cell.startswith(_FORMULA_PREFIXES) and not _NUMBER.fullmatch(cell):
+        return "'" + cell
+    return cell
+
+
+def _cell(value: Any) -> str:
+    """Format a value as a CSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return _LIST_SEPARATOR.join(_cell(item) for item in value if item is not None)
+    if isinstance(value, dict):
+        return fast_json.dumps(value).decode("utf-8")
+    return str(value)
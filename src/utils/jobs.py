@@ -0,0 +1,238 @@
+"""
+In-process background job engine.
+
+Long-running work (e.g. prospect generation) is submitted as a job and
+executed by a bounded pool of asyncio workers, so the HTTP request that
+submits it returns immediately with a job ID. Callers poll the job for
+status and progress and fetch its result once it has finished.
+
+The queue has a depth limit; submitting to a full queue raises
+JobQueueFullError instead of accepting unbounded work. Finished jobs are
+kept in memory up to a retention limit (oldest evicted first).
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit."""
+
+
+@dataclass
+class Job:
+    """One unit of background work and its observable state."""
+
+    id: str
+    kind: str
+    status: JobStatus = "queued"
+    stage: str | None = None
+    progress: dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def report(self, stage: str, **progress: Any) -> None:
+        """Record the stage the job has reached and any progress counters."""
+        self.stage = stage
+        self.progress.update(progress)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Status view of the job (without its result)."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+JobFunc = Callable[[Job], Awaitable[Any]]
+
+
+class JobManager:
+    """Bounded worker pool with a depth-limited queue of jobs."""
+
+    def __init__(self, workers: int, queue_limit: int, retention: int):
+        """
+        Initialize job manager.
+
+        Args:
+            workers: Number of jobs executed concurrently.
+            queue_limit: Maximum number of jobs waiting to start.
+            retention: Maximum number of finished jobs kept for polling.
+        """
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retention = retention
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: asyncio.Queue[tuple[Job, JobFunc]] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._workers and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_limit)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued and running jobs are marked cancelled."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self.jobs.values():
+            if not job.finished:
+                self._finish(job, "cancelled", error="Job manager stopped")
+        self._queue = None
+
+    def submit(self, kind: str, func: JobFunc, job_id: str | None = None) -> Job:
+        """
+        Queue func to run as a background job.
+
+        Args:
+            kind: Job type label (e.g. "prospects_generate").
+            func: Coroutine function receiving the Job to report progress on.
+            job_id: Reuse an existing ID (e.g. to resume a checkpointed run);
+                a finished job with that ID is replaced.
+
+        Returns:
+            The queued Job.
+
+        Raises:
+            JobQueueFullError: If queue_limit jobs are already waiting.
+        """
+        self.start()
+        job = Job(id=job_id or uuid.uuid4().hex, kind=kind)
+        try:
+            self._queue.put_nowait((job, func))
+        except asyncio.QueueFull:
+            raise JobQueueFullError(
+                f"Job queue is full ({self.queue_limit} jobs waiting)"
+            ) from None
+        self.jobs.pop(job.id, None)
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job. Finished jobs are left unchanged."""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            self._finish(job, "cancelled")
+        return job
+
+    def metrics(self) -> dict[str, int]:
+        """Queue depth and job counts by status."""
+        counts = {status: 0 for status in ("queued", "running", *FINISHED_STATUSES)}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            **counts,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job, func = await self._queue.get()
+            try:
+                if job.status == "queued":
+                    await self._run(job, func)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job, func: JobFunc) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        task = asyncio.ensure_future(func(job))
+        self._running[job.id] = task
+        try:
+            job.result = await task
+            self._finish(job, "succeeded")
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # The worker itself is being stopped
+                self._finish(job, "cancelled", error="Job manager stopped")
+                raise
+            self._finish(job, "cancelled")
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            self._finish(job, "failed", error=str(e))
+        finally:
+            self._running.pop(job.id, None)
+
+    def _finish(self, job: Job, status: JobStatus, error: str | None = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.retention)]:
+            del self.jobs[job_id]
+
+
+# Singleton instance
+_job_manager: JobManager | None = None
+
+
+def get_job_manager() -> JobManager:
+    """Get or create the process-wide job manager."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(
+            workers=settings.job_workers,
+            queue_limit=settings.job_queue_limit,
+            retention=settings.job_retention,
+        )
+    return _job_manager
+
+
+async def close_job_manager() -> None:
+    """Stop the process-wide job manager's workers."""
+    global _job_manager
+    if _job_manager is not None:
+        await _job_manager.stop()
+        _job_manager = None
@@ -0,0 +1,59 @@
+"""
+Newline-delimited JSON streaming helpers.
+
+Streaming endpoints emit one {"record": {...}} line per result as soon as
+it is available, followed by a single trailing {"summary": {...}} line
+with the counts and pagination state that the non-streaming response
+would carry.
+"""
+
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+from src.utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def record_line(record: dict[str, Any]) -> bytes:
+    """Encode one result record as an NDJSON line."""
+    return b'{"record":' + fast_json.dumps(record) + b"}\n"
+
+
+def summary_line(summary: dict[str, Any]) -> bytes:
+    """Encode the trailing summary as an NDJSON line."""
+    return b'{"summary":' + fast_json.dumps(summary) + b"}\n"
+
+
+def ndjson_response(
+    lines: AsyncIterator[bytes],
+    on_error: Callable[[Exception], dict[str, Any]],
+) -> StreamingResponse:
+    """
+    Wrap an NDJSON line iterator in a StreamingResponse.
+
+    The HTTP status is sent before the first line, so an exception raised
+    mid-stream is reported as a final summary line built by on_error.
+
+    Args:
+        lines: Async iterator of encoded record and summary lines.
+        on_error: Builds the failure summary for an exception.
+
+    Returns:
+        StreamingResponse with the NDJSON media type.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for line in lines:
+                yield line
+        except Exception as e:
+            logger.exception("NDJSON stream failed")
+            yield summary_line(on_error(e))
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
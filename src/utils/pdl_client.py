@@ -1,17 +1,76 @@
 """
 PDL Client Utility for People Data Labs API.
 
-Wraps the peopledatalabs SDK for person search and enrichment operations.
+Provides two clients with the same method surface:
+- PDLClient: wraps the synchronous peopledatalabs SDK (scripts, notebooks)
+- AsyncPDLClient: native asyncio client over a pooled httpx.AsyncClient,
+  used by the API routers so PDL calls never block the event loop
+
+PDLRateLimiter paces AsyncPDLClient calls per endpoint family with a
+token bucket whose state is shared by all worker processes on the host.
+Transient failures are retried with backoff, and a per-family circuit
+breaker fails fast while PDL is degraded (see src/utils/resilience.py).
+Enrichment by PDL ID is served from a persistent cache when one is
+configured (see src/utils/enrichment_cache.py), and search pages from an
+LRU search cache (see src/utils/search_cache.py). Identical concurrent
+searches and enrichments that miss the caches share one in-flight call
+(see src/utils/single_flight.py).
+
+Requests use PDL's compact format (no pretty printing), accept gzip/deflate,
+and are decoded with orjson when available (see src/utils/fast_json.py).
+Every method takes an optional field projection that is sent as PDL's
+data_include (see src/utils/field_profiles.py for the named profiles).
+iter_person_search/iter_company_search follow scroll tokens across pages,
+prefetching the next page while the current one is consumed.
 """
 
+import asyncio
+import hashlib
+import logging
 import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from typing import Any
 
+import httpx
 from dotenv import load_dotenv
 from peopledatalabs import PDLPY
 
+from src.core.config import settings
+from src.utils import fast_json
+from src.utils.concurrency import gather_bounded
+from src.utils.enrichment_cache import CacheMode, EnrichmentCache
+from src.utils.field_profiles import data_include
+from src.utils.search_cache import SearchCache, search_cache_key
+from src.utils.single_flight import SingleFlight
+from src.utils.resilience import (
+    FAILURE_STATUS_CODES,
+    RETRYABLE_STATUS_CODES,
+    CircuitBreaker,
+    PDLUnavailableError,
+    RetryPolicy,
+)
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# PDL REST API base URLs (v5)
+PDL_BASE_URL = "https://api.peopledatalabs.com/v5"
+PDL_SANDBOX_BASE_URL = "https://sandbox.api.peopledatalabs.com/v5"
+
+# Maximum number of records PDL accepts in one bulk enrichment request
+PDL_BULK_LIMIT = 100
+
+# Maximum number of records PDL returns in one search page
+PDL_SEARCH_PAGE_LIMIT = 100
 
 class PDLClient:
     """
@@ -42,6 +101,7 @@ class PDLClient:
         size: int = 25,
         scroll_token: str | None = None,
         titlecase: bool = True,
+        fields: list[str] | None = None,
     ) -> dict[str, Any]:
         """
         Search for persons using SQL query.
@@ -51,22 +111,24 @@ class PDLClient:
             size: Number of results per page (max 100).
             scroll_token: Token for pagination.
             titlecase: Whether to titlecase names in response.
+            fields: Optional field projection sent as PDL's data_include.
             
         Returns:
             dict with status, data, total, scroll_token, etc.
         """
         params = {
             "sql": sql_query,
-            "size": min(size, 100),
-            "pretty": True,
+            "size": min(size, PDL_SEARCH_PAGE_LIMIT),
             "titlecase": titlecase,
         }
         
         if scroll_token:
             params["scroll_token"] = scroll_token
+        if fields:
+            params["data_include"] = data_include(fields)
         
         response = self.client.person.search(**params)
-        return response.json()
+        return _decode_sdk_response(response)
 
     def person_enrichment(
         self,
@@ -77,6 +139,7 @@ class PDLClient:
         company: str | None = None,
         min_likelihood: int = 6,
         titlecase: bool = True,
+        fields: list[str] | None = None,
     ) -> dict[str, Any]:
         """
         Enrich a person's data using PDL enrichment API.
@@ -89,13 +152,13 @@ class PDLClient:
             company: Company name.
             min_likelihood: Minimum match likelihood (1-10).
             titlecase: Whether to titlecase names in response.
+            fields: Optional field projection sent as PDL's data_include.
             
         Returns:
             dict with status and enriched person data.
         """
         params: dict[str, Any] = {
             "min_likelihood": min_likelihood,
-            "pretty": True,
             "titlecase": titlecase,
         }
         
@@ -109,18 +172,24 @@ class PDLClient:
             params["name"] = name
         if company:
             params["company"] = company
+        if fields:
+            params["data_include"] = data_include(fields)
         
         response = self.client.person.enrichment(**params)
-        return response.json()
+        return _decode_sdk_response(response)
 
     def person_bulk_enrichment(
         self,
         pdl_ids: list[str],
         titlecase: bool = True,
+        fields: list[str] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Bulk enrich multiple persons by PDL ID.
 
+        IDs beyond PDL_BULK_LIMIT are split into chunks that run concurrently;
+        results are merged back into a single list in input order.
+
         Request format per PDL docs:
         {
             "requests": [
@@ -138,27 +207,28 @@ class PDLClient:
         Args:
             pdl_ids: List of PDL person IDs to enrich.
             titlecase: Whether to titlecase names in response.
+            fields: Optional field projection sent as PDL's data_include.
 
         Returns:
             List of enrichment results with status and data.
         """
-        # Build requests in PDL's expected format: [{"params": {...}}, ...]
-        bulk_requests = [{"params": {"pdl_id": pdl_id}} for pdl_id in pdl_ids]
 
-        params = {
-            "requests": bulk_requests,
-            "pretty": True,
-            "titlecase": titlecase,
-        }
+        def enrich_chunk(chunk: list[str]) -> Any:
+            # Build requests in PDL's expected format: [{"params": {...}}, ...]
+            params = {
+                "requests": [_bulk_params(pdl_id, fields) for pdl_id in chunk],
+                "titlecase": titlecase,
+            }
+            return _decode_sdk_response(self.client.person.bulk(**params))
 
-        response = self.client.person.bulk(**params)
-        return response.json()
+        return self._bulk(pdl_ids, enrich_chunk)
 
     def company_search(
         self,
         sql_query: str,
         size: int = 25,
         scroll_token: str | None = None,
+        fields: list[str] | None = None,
     ) -> dict[str, Any]:
         """
         Search for companies using SQL query.
@@ -167,21 +237,23 @@ class PDLClient:
             sql_query: SQL query string for PDL company search.
             size: Number of results per page (max 100).
             scroll_token: Token for pagination.
+            fields: Optional field projection sent as PDL's data_include.
 
         Returns:
             dict with status, data, total, scroll_token, etc.
         """
         params = {
             "sql": sql_query,
-            "size": min(size, 100),
-            "pretty": True,
+            "size": min(size, PDL_SEARCH_PAGE_LIMIT),
         }
 
         if scroll_token:
             params["scroll_token"] = scroll_token
+        if fields:
+            params["data_include"] = data_include(fields)
 
         response = self.client.company.search(**params)
-        return response.json()
+        return _decode_sdk_response(response)
 
     def company_enrichment(
         self,
@@ -190,6 +262,7 @@ class PDLClient:
         website: str | None = None,
         profile: str | None = None,
         ticker: str | None = None,
+        fields: list[str] | None = None,
     ) -> dict[str, Any]:
         """
         Enrich a company's data using PDL Company Enrichment API.
@@ -200,13 +273,12 @@ class PDLClient:
             website: Company website domain.
             profile: Company social profile URL (e.g., linkedin.com/company/google).
             ticker: Stock ticker symbol (for public companies).
+            fields: Optional field projection sent as PDL's data_include.
 
         Returns:
             dict with status and enriched company data.
         """
-        params: dict[str, Any] = {
-            "pretty": True,
-        }
+        params: dict[str, Any] = {}
 
         if pdl_id:
             params["pdl_id"] = pdl_id
@@ -218,6 +290,8 @@ class PDLClient:
             params["profile"] = profile
         if ticker:
             params["ticker"] = ticker
+        if fields:
+            params["data_include"] = data_include(fields)
 
         # Ensure at least one identifier is provided
         if not any([pdl_id, name, website, profile, ticker]):
@@ -226,15 +300,19 @@ class PDLClient:
             )
 
         response = self.client.company.enrichment(**params)
-        return response.json()
+        return _decode_sdk_response(response)
 
     def company_bulk_enrichment(
         self,
         pdl_ids: list[str],
+        fields: list[str] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Bulk enrich multiple companies by PDL ID.
 
+        IDs beyond PDL_BULK_LIMIT are split into chunks that run concurrently;
+        results are merged back into a single list in input order.
+
         Request format per PDL docs:
         {
             "requests": [
@@ -251,30 +329,1074 @@ class PDLClient:
 
         Args:
             pdl_ids: List of PDL company IDs to enrich.
+            fields: Optional field projection sent as PDL's data_include.
 
         Returns:
             List of enrichment results with status and data.
         """
-        # Build requests in PDL's expected format: [{"params": {...}}, ...]
-        bulk_requests = [{"params": {"pdl_id": pdl_id}} for pdl_id in pdl_ids]
 
-        params = {
-            "requests": bulk_requests,
-            "pretty": True,
+        def enrich_chunk(chunk: list[str]) -> Any:
+            # Build requests in PDL's expected format: [{"params": {...}}, ...]
+            params = {
+                "requests": [_bulk_params(pdl_id, fields) for pdl_id in chunk],
+            }
+            return _decode_sdk_response(self.client.company.bulk(**params))
+
+        return self._bulk(pdl_ids, enrich_chunk)
+
+    def _bulk(
+        self, pdl_ids: list[str], enrich_chunk: Callable[[list[str]], Any]
+    ) -> list[dict[str, Any]]:
+        """Send PDL_BULK_LIMIT-sized chunks on a thread pool and merge in order."""
+        chunks = _chunk_ids(pdl_ids)
+        if not chunks:
+            return []
+
+        def run(chunk: list[str]) -> list[dict[str, Any]]:
+            try:
+                return _bulk_chunk_items(chunk, enrich_chunk(chunk))
+            except Exception as e:
+                return _bulk_chunk_items(chunk, error=e)
+
+        workers = min(len(chunks), settings.pdl_enrichment_concurrency)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return [item for items in executor.map(run, chunks) for item in items]
+
+
+class PDLRateLimiter:
+    """
+    Token-bucket rate limiter shared by every process on the host.
+
+    One bucket per endpoint family ("search", "enrichment", "bulk") is kept
+    in a SQLite database; each reservation runs in a BEGIN IMMEDIATE
+    transaction, so all uvicorn workers using the same PDL key draw from the
+    same buckets.
+
+    Buckets are seeded from settings and then tuned by PDL's response
+    headers: X-RateLimit-Limit sets the refill rate, X-RateLimit-Remaining
+    caps the available tokens, and a 429 (or zero remaining) blocks the
+    family until Retry-After / X-RateLimit-Reset.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        rates_per_minute: dict[str, float],
+        burst: int = 10,
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            db_path: SQLite file holding bucket state (created if missing).
+            rates_per_minute: Sustained request rate per endpoint family.
+            burst: Bucket capacity, i.e. requests allowed back-to-back.
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    family TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    rate REAL NOT NULL,
+                    capacity REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            now = time.time()
+            for family, per_minute in rates_per_minute.items():
+                conn.execute(
+                    """
+                    INSERT INTO rate_limit_buckets
+                        (family, tokens, rate, capacity, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(family) DO UPDATE SET
+                        rate = excluded.rate, capacity = excluded.capacity
+                    """,
+                    (family, float(burst), per_minute / 60, float(burst), now),
+                )
+
+    async def acquire(self, family: str) -> None:
+        """Wait until a token for family is available, then take it."""
+        while True:
+            wait = await asyncio.to_thread(self.reserve, family)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def observe(
+        self, family: str, status_code: int, headers: Mapping[str, str]
+    ) -> None:
+        """Feed a PDL response's status and rate-limit headers into the bucket."""
+        await asyncio.to_thread(self.update_from_response, family, status_code, headers)
+
+    def reserve(self, family: str, now: float | None = None) -> float:
+        """
+        Try to take one token for family.
+
+        Returns:
+            0 if a token was taken, otherwise seconds to wait before retrying.
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            row = self._refilled(conn, family, now)
+            if row is None:
+                return 0.0
+            tokens, rate, blocked_until = row
+
+            if now < blocked_until:
+                wait = blocked_until - now
+            elif tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate if rate > 0 else 1.0
+
+            conn.execute(
+                "UPDATE rate_limit_buckets SET tokens = ?, updated_at = ? WHERE family = ?",
+                (tokens, now, family),
+            )
+        return wait
+
+    def update_from_response(
+        self,
+        family: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        now: float | None = None,
+    ) -> None:
+        """Apply PDL rate-limit headers (and 429s) to the family's bucket."""
+        now = time.time() if now is None else now
+        limit = _parse_per_minute(headers.get("x-ratelimit-limit"))
+        remaining = _parse_per_minute(headers.get("x-ratelimit-remaining"))
+        reset_at = _parse_reset_at(headers.get("x-ratelimit-reset"), now)
+        retry_at = _parse_reset_at(headers.get("retry-after"), now, relative=True)
+
+        block_until = 0.0
+        if status_code == 429:
+            block_until = retry_at or reset_at or now + 1.0
+            remaining = 0
+        elif remaining == 0 and reset_at:
+            block_until = reset_at
+
+        if limit is None and remaining is None and not block_until:
+            return
+
+        with self._transaction() as conn:
+            row = self._refilled(conn, family, now)
+            if row is None:
+                return
+            tokens, rate, blocked_until = row
+            if limit:
+                rate = limit / 60
+            if remaining is not None:
+                tokens = min(tokens, float(remaining))
+            conn.execute(
+                """
+                UPDATE rate_limit_buckets
+                SET tokens = ?, rate = ?, updated_at = ?, blocked_until = ?
+                WHERE family = ?
+                """,
+                (tokens, rate, now, max(blocked_until, block_until), family),
+            )
+
+    @staticmethod
+    def _refilled(
+        conn: sqlite3.Connection, family: str, now: float
+    ) -> tuple[float, float, float] | None:
+        """Read a bucket and return (tokens, rate, blocked_until) refilled to now."""
+        row = conn.execute(
+            """
+            SELECT tokens, rate, capacity, updated_at, blocked_until
+            FROM rate_limit_buckets WHERE family = ?
+            """,
+            (family,),
+        ).fetchone()
+        if row is None:
+            return None
+        tokens, rate, capacity, updated_at, blocked_until = row
+        tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+        return tokens, rate, blocked_until
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection holding the database write lock."""
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+ENDPOINT_FAMILIES = ("search", "enrichment", "bulk")
+
+
+def _endpoint_family(path: str) -> str:
+    """Map a PDL API path to its rate-limit family."""
+    if path.endswith("/bulk"):
+        return "bulk"
+    if path.endswith("/search"):
+        return "search"
+    return "enrichment"
+
+
+def _parse_per_minute(value: str | None) -> int | None:
+    """Parse a PDL rate-limit header: either "100" or "{'minute': 100}"."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    match = re.search(r"minute['\"]?\s*:\s*(\d+)", value)
+    return int(match.group(1)) if match else None
+
+
+def _parse_reset_at(
+    value: str | None, now: float, relative: bool = False
+) -> float | None:
+    """
+    Parse a reset/Retry-After header into an absolute epoch time.
+
+    Accepts delta seconds, epoch seconds, ISO-8601 and HTTP dates.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        pass
+    else:
+        # Small numbers are deltas; large ones are epoch timestamps
+        return now + number if relative or number < 1_000_000_000 else number
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncPDLClient:
+    """
+    Native asyncio client for People Data Labs API operations.
+
+    Mirrors the PDLClient surface, but every method is a coroutine backed by
+    a single long-lived httpx.AsyncClient so connections (and TLS sessions)
+    are pooled and reused across requests.
+
+    Provides methods for:
+    - Person search, enrichment and bulk enrichment
+    - Company search, enrichment and bulk enrichment
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        sandbox: bool = False,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        timeout: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        bulk_concurrency: int | None = None,
+        rate_limiter: PDLRateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        enrichment_cache: EnrichmentCache | None = None,
+        search_cache: SearchCache | None = None,
+    ):
+        """
+        Initialize async PDL client.
+
+        Args:
+            api_key: PDL API key. Defaults to PDL_KEY env variable.
+            sandbox: Whether to use sandbox mode for testing.
+            max_connections: Maximum pooled connections. Defaults to settings.
+            max_keepalive_connections: Maximum idle keep-alive connections.
+            timeout: Request timeout in seconds. Defaults to settings.
+            transport: Optional httpx transport (used by tests).
+            bulk_concurrency: Maximum bulk chunks in flight. Defaults to settings.
+            rate_limiter: Optional shared rate limiter applied to every call.
+            retry_policy: Retry budgets and backoff. Defaults to settings.
+            enrichment_cache: Optional persistent cache for enrichment by PDL ID.
+            search_cache: Optional cache for person/company search pages.
+        """
+        self.api_key = api_key or os.getenv("PDL_KEY", "")
+        if not self.api_key:
+            raise ValueError("PDL API key is required. Set PDL_KEY environment variable.")
+
+        limits = httpx.Limits(
+            max_connections=max_connections or settings.pdl_max_connections,
+            max_keepalive_connections=(
+                max_keepalive_connections or settings.pdl_max_keepalive_connections
+            ),
+        )
+        self.http = httpx.AsyncClient(
+            base_url=PDL_SANDBOX_BASE_URL if sandbox else PDL_BASE_URL,
+            headers={
+                "X-Api-Key": self.api_key,
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+            },
+            limits=limits,
+            timeout=httpx.Timeout(timeout or settings.pdl_timeout_seconds),
+            transport=transport,
+        )
+        self.bulk_concurrency = bulk_concurrency or settings.pdl_enrichment_concurrency
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = {
+            family: CircuitBreaker(family) for family in ENDPOINT_FAMILIES
         }
+        self.retry_counts: Counter[str] = Counter()
+        self.short_circuit_counts: Counter[str] = Counter()
+        self.enrichment_cache = enrichment_cache
+        self.search_cache = search_cache
+        self.single_flight = SingleFlight()
 
-        response = self.client.company.bulk(**params)
-        result = response.json()
+    async def __aenter__(self) -> "AsyncPDLClient":
+        return self
 
-        # Log the response for debugging
-        print(f"[DEBUG] Bulk enrichment response type: {type(result)}")
-        print(f"[DEBUG] Bulk enrichment response: {result}")
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool and cache."""
+        await self.http.aclose()
+        if self.enrichment_cache:
+            self.enrichment_cache.close()
+        if self.search_cache:
+            self.search_cache.close()
+
+    def metrics(self) -> dict[str, Any]:
+        """Retry, circuit breaker, cache and coalescing counters."""
+        metrics: dict[str, Any] = {
+            "retries": dict(self.retry_counts),
+            "short_circuits": dict(self.short_circuit_counts),
+            "circuit_breakers": {
+                family: breaker.state for family, breaker in self.breakers.items()
+            },
+        }
+        if self.enrichment_cache:
+            metrics["enrichment_cache"] = self.enrichment_cache.metrics()
+        if self.search_cache:
+            metrics["search_cache"] = self.search_cache.metrics()
+        metrics["single_flight"] = self.single_flight.metrics()
+        return metrics
 
-        return result
+    async def person_search(
+        self,
+        sql_query: str,
+        size: int = 25,
+        scroll_token: str | None = None,
+        titlecase: bool = True,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> dict[str, Any]:
+        """
+        Search for persons using SQL query.
 
+        Successful pages are served from the search cache when configured.
 
-# Singleton instance
+        Args:
+            sql_query: SQL query string for PDL person search.
+            size: Number of results per page (max 100).
+            scroll_token: Token for pagination.
+            titlecase: Whether to titlecase names in response.
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the search cache.
+
+        Returns:
+            dict with status, data, total, scroll_token, etc.
+        """
+        params: dict[str, Any] = {
+            "sql": sql_query,
+            "size": min(size, PDL_SEARCH_PAGE_LIMIT),
+            "titlecase": titlecase,
+        }
+
+        if scroll_token:
+            params["scroll_token"] = scroll_token
+        if fields:
+            params["data_include"] = data_include(fields)
+
+        return await self._cached_search("person", params, cache_mode)
+
+    async def person_enrichment(
+        self,
+        pdl_id: str | None = None,
+        linkedin_url: str | None = None,
+        email: str | None = None,
+        name: str | None = None,
+        company: str | None = None,
+        min_likelihood: int = 6,
+        titlecase: bool = True,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> dict[str, Any]:
+        """
+        Enrich a person's data using PDL enrichment API.
+
+        Lookups by pdl_id alone go through the enrichment cache.
+
+        Args:
+            pdl_id: PDL person ID for direct lookup.
+            linkedin_url: LinkedIn profile URL.
+            email: Email address.
+            name: Full name of the person.
+            company: Company name.
+            min_likelihood: Minimum match likelihood (1-10).
+            titlecase: Whether to titlecase names in response.
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the enrichment cache.
+
+        Returns:
+            dict with status and enriched person data.
+        """
+        params: dict[str, Any] = {
+            "min_likelihood": min_likelihood,
+            "titlecase": titlecase,
+        }
+
+        if pdl_id:
+            params["pdl_id"] = pdl_id
+        if linkedin_url:
+            params["profile"] = linkedin_url
+        if email:
+            params["email"] = email
+        if name:
+            params["name"] = name
+        if company:
+            params["company"] = company
+        if fields:
+            params["data_include"] = data_include(fields)
+
+        if pdl_id and not any([linkedin_url, email, name, company]):
+            return await self._cached_enrichment(
+                _person_cache_namespace(titlecase, fields),
+                pdl_id,
+                lambda: self._get("/person/enrich", params),
+                cache_mode,
+            )
+        return await self._get("/person/enrich", params)
+
+    async def person_bulk_enrichment(
+        self,
+        pdl_ids: list[str],
+        titlecase: bool = True,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> list[dict[str, Any]]:
+        """
+        Bulk enrich multiple persons by PDL ID.
+
+        IDs beyond PDL_BULK_LIMIT are split into chunks that run concurrently;
+        results are merged back into a single list in input order.
+
+        See PDLClient.person_bulk_enrichment for request/response format.
+        Cached IDs are served locally; only cache misses are sent to PDL.
+
+        Args:
+            pdl_ids: List of PDL person IDs to enrich.
+            titlecase: Whether to titlecase names in response.
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the enrichment cache.
+
+        Returns:
+            List of enrichment results with status and data.
+        """
+
+        async def enrich_chunk(chunk: list[str]) -> Any:
+            params = {
+                "requests": [_bulk_params(pdl_id, fields) for pdl_id in chunk],
+                "titlecase": titlecase,
+            }
+            return await self._post("/person/bulk", params)
+
+        return await self._bulk(
+            pdl_ids,
+            enrich_chunk,
+            _person_cache_namespace(titlecase, fields),
+            cache_mode,
+        )
+
+    async def company_search(
+        self,
+        sql_query: str,
+        size: int = 25,
+        scroll_token: str | None = None,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> dict[str, Any]:
+        """
+        Search for companies using SQL query.
+
+        Successful pages are served from the search cache when configured.
+
+        Args:
+            sql_query: SQL query string for PDL company search.
+            size: Number of results per page (max 100).
+            scroll_token: Token for pagination.
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the search cache.
+
+        Returns:
+            dict with status, data, total, scroll_token, etc.
+        """
+        params: dict[str, Any] = {
+            "sql": sql_query,
+            "size": min(size, PDL_SEARCH_PAGE_LIMIT),
+        }
+
+        if scroll_token:
+            params["scroll_token"] = scroll_token
+        if fields:
+            params["data_include"] = data_include(fields)
+
+        return await self._cached_search("company", params, cache_mode)
+
+    async def company_enrichment(
+        self,
+        pdl_id: str | None = None,
+        name: str | None = None,
+        website: str | None = None,
+        profile: str | None = None,
+        ticker: str | None = None,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> dict[str, Any]:
+        """
+        Enrich a company's data using PDL Company Enrichment API.
+
+        Lookups by pdl_id alone go through the enrichment cache.
+
+        Args:
+            pdl_id: PDL company ID for direct lookup.
+            name: Company name.
+            website: Company website domain.
+            profile: Company social profile URL (e.g., linkedin.com/company/google).
+            ticker: Stock ticker symbol (for public companies).
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the enrichment cache.
+
+        Returns:
+            dict with status and enriched company data.
+        """
+        # Ensure at least one identifier is provided
+        if not any([pdl_id, name, website, profile, ticker]):
+            raise ValueError(
+                "At least one identifier is required: pdl_id, name, website, profile, or ticker"
+            )
+
+        params: dict[str, Any] = {}
+
+        if pdl_id:
+            params["pdl_id"] = pdl_id
+        if name:
+            params["name"] = name
+        if website:
+            params["website"] = website
+        if profile:
+            params["profile"] = profile
+        if ticker:
+            params["ticker"] = ticker
+        if fields:
+            params["data_include"] = data_include(fields)
+
+        if pdl_id and not any([name, website, profile, ticker]):
+            return await self._cached_enrichment(
+                _company_cache_namespace(fields),
+                pdl_id,
+                lambda: self._get("/company/enrich", params),
+                cache_mode,
+            )
+        return await self._get("/company/enrich", params)
+
+    async def company_bulk_enrichment(
+        self,
+        pdl_ids: list[str],
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> list[dict[str, Any]]:
+        """
+        Bulk enrich multiple companies by PDL ID.
+
+        IDs beyond PDL_BULK_LIMIT are split into chunks that run concurrently;
+        results are merged back into a single list in input order.
+
+        See PDLClient.company_bulk_enrichment for request/response format.
+        Cached IDs are served locally; only cache misses are sent to PDL.
+
+        Args:
+            pdl_ids: List of PDL company IDs to enrich.
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the enrichment cache.
+
+        Returns:
+            List of enrichment results with status and data.
+        """
+
+        async def enrich_chunk(chunk: list[str]) -> Any:
+            params = {
+                "requests": [_bulk_params(pdl_id, fields) for pdl_id in chunk],
+            }
+            return await self._post("/company/enrich/bulk", params)
+
+        return await self._bulk(
+            pdl_ids, enrich_chunk, _company_cache_namespace(fields), cache_mode
+        )
+
+    # ==========================================================================
+    # Pagination
+    # ==========================================================================
+
+    def iter_person_search(
+        self,
+        sql_query: str,
+        limit: int,
+        scroll_token: str | None = None,
+        titlecase: bool = True,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate person search pages, following scroll tokens up to limit records.
+
+        Args:
+            sql_query: SQL query string for PDL person search.
+            limit: Maximum number of records to return across all pages.
+            scroll_token: Token to resume from a previous search.
+            titlecase: Whether to titlecase names in response.
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the search cache.
+
+        Returns:
+            Async iterator of page responses (see _iter_search_pages).
+        """
+        return _iter_search_pages(
+            lambda size, token: self.person_search(
+                sql_query=sql_query,
+                size=size,
+                scroll_token=token,
+                titlecase=titlecase,
+                fields=fields,
+                cache_mode=cache_mode,
+            ),
+            limit,
+            scroll_token,
+        )
+
+    def iter_company_search(
+        self,
+        sql_query: str,
+        limit: int,
+        scroll_token: str | None = None,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate company search pages, following scroll tokens up to limit records.
+
+        Args:
+            sql_query: SQL query string for PDL company search.
+            limit: Maximum number of records to return across all pages.
+            scroll_token: Token to resume from a previous search.
+            fields: Optional field projection sent as PDL's data_include.
+            cache_mode: "use", "refresh" or "bypass" the search cache.
+
+        Returns:
+            Async iterator of page responses (see _iter_search_pages).
+        """
+        return _iter_search_pages(
+            lambda size, token: self.company_search(
+                sql_query=sql_query,
+                size=size,
+                scroll_token=token,
+                fields=fields,
+                cache_mode=cache_mode,
+            ),
+            limit,
+            scroll_token,
+        )
+
+    # ==========================================================================
+    # Transport
+    # ==========================================================================
+
+    async def _bulk(
+        self,
+        pdl_ids: list[str],
+        enrich_chunk: Callable[[list[str]], Awaitable[Any]],
+        cache_namespace: str,
+        cache_mode: CacheMode,
+    ) -> list[dict[str, Any]]:
+        """
+        Serve cached IDs, send the misses in PDL_BULK_LIMIT-sized chunks
+        concurrently, and merge everything back in input order.
+        """
+        cached: dict[str, dict[str, Any]] = {}
+        if self.enrichment_cache and cache_mode == "use":
+            cached = await asyncio.to_thread(
+                self.enrichment_cache.get_many, cache_namespace, pdl_ids
+            )
+
+        misses = [pdl_id for pdl_id in dict.fromkeys(pdl_ids) if pdl_id not in cached]
+        chunks = _chunk_ids(misses)
+        results = await gather_bounded(
+            chunks, enrich_chunk, limit=self.bulk_concurrency
+        )
+
+        fetched: dict[str, dict[str, Any]] = {}
+        for chunk, result in zip(chunks, results):
+            logger.info(
+                "PDL bulk chunk of %d IDs: %.1f ms%s",
+                len(chunk),
+                result.latency_ms,
+                "" if result.ok else f" (failed: {result.error})",
+            )
+            if result.ok:
+                items = _bulk_chunk_items(chunk, result.value)
+            else:
+                items = _bulk_chunk_items(chunk, error=result.error)
+            fetched.update(zip(chunk, items))
+
+        if self.enrichment_cache and cache_mode != "bypass":
+            successes = {
+                pdl_id: item
+                for pdl_id, item in fetched.items()
+                if item.get("status") == 200
+            }
+            await asyncio.to_thread(
+                self.enrichment_cache.put_many, cache_namespace, successes
+            )
+
+        return [cached.get(pdl_id) or fetched[pdl_id] for pdl_id in pdl_ids]
+
+    async def _cached_search(
+        self, kind: str, params: dict[str, Any], cache_mode: CacheMode
+    ) -> dict[str, Any]:
+        """
+        Serve a search page from the search cache, or fetch and store it.
+
+        Concurrent identical searches that miss the cache share one PDL call.
+        """
+        path = f"/{kind}/search"
+        key = search_cache_key(kind, params)
+        store = self.search_cache is not None and cache_mode != "bypass"
+
+        if self.search_cache and cache_mode == "use":
+            cached = self.search_cache.get_memory(key)
+            if cached is None and self.search_cache.has_disk_tier:
+                cached = await asyncio.to_thread(self.search_cache.get_disk, key)
+            if cached is not None:
+                return cached
+            self.search_cache.record_miss()
+
+        async def fetch() -> dict[str, Any]:
+            response = await self._post(path, params)
+            if store and isinstance(response, dict) and response.get("status") == 200:
+                if self.search_cache.has_disk_tier:
+                    await asyncio.to_thread(self.search_cache.put, key, response)
+                else:
+                    self.search_cache.put(key, response)
+            return response
+
+        # Callers that store and callers that bypass must not share a flight
+        return await self.single_flight.do(f"search:{key}:store={store}", fetch)
+
+    async def _cached_enrichment(
+        self,
+        cache_namespace: str,
+        pdl_id: str,
+        fetch: Callable[[], Awaitable[Any]],
+        cache_mode: CacheMode,
+    ) -> dict[str, Any]:
+        """
+        Serve a single enrichment by PDL ID from cache, or fetch and store it.
+
+        Concurrent identical enrichments that miss the cache share one PDL call.
+        """
+        if self.enrichment_cache and cache_mode == "use":
+            cached = await asyncio.to_thread(
+                self.enrichment_cache.get_many, cache_namespace, [pdl_id]
+            )
+            if pdl_id in cached:
+                return cached[pdl_id]
+
+        store = self.enrichment_cache is not None and cache_mode != "bypass"
+
+        async def fetch_and_store() -> dict[str, Any]:
+            response = await fetch()
+            if store and isinstance(response, dict) and response.get("status") == 200:
+                await asyncio.to_thread(
+                    self.enrichment_cache.put_many, cache_namespace, {pdl_id: response}
+                )
+            return response
+
+        return await self.single_flight.do(
+            f"enrich:{cache_namespace}:{pdl_id}:store={store}", fetch_and_store
+        )
+
+    async def _get(self, path: str, params: dict[str, Any]) -> Any:
+        """GET with query-string params (enrichment endpoints)."""
+        query = {
+            key: str(value).lower() if isinstance(value, bool) else value
+            for key, value in params.items()
+        }
+        response = await self._send("GET", path, params=query)
+        return _decode_response(response.status_code, response.content)
+
+    async def _post(self, path: str, payload: dict[str, Any]) -> Any:
+        """POST with a JSON body (search and bulk endpoints)."""
+        response = await self._send(
+            "POST",
+            path,
+            content=fast_json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        return _decode_response(response.status_code, response.content)
+
+    async def _send(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send one request with rate limiting, retries and circuit breaking.
+
+        Transient failures (429, 5xx, network errors) are retried within the
+        family's retry budget, honoring Retry-After. If retries run out, the
+        last response is returned (or the network error re-raised).
+
+        Raises:
+            PDLUnavailableError: If the family's circuit breaker is open.
+        """
+        family = _endpoint_family(path)
+        breaker = self.breakers[family]
+        max_retries = self.retry_policy.retries_for(family)
+
+        for attempt in range(max_retries + 1):
+            try:
+                is_trial = breaker.before_call()
+            except PDLUnavailableError:
+                self.short_circuit_counts[family] += 1
+                raise
+
+            try:
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire(family)
+                response = await self.http.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                if attempt >= max_retries:
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                reason = f"{type(e).__name__}: {e}"
+            except BaseException:
+                # Cancelled (prefetch task, client disconnect, job cancel)
+                # before an outcome: a half-open trial must not stay in
+                # flight, or the breaker would never close again
+                if is_trial:
+                    breaker.release_trial()
+                raise
+            else:
+                if response.status_code in FAILURE_STATUS_CODES:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if self.rate_limiter:
+                    await self.rate_limiter.observe(
+                        family, response.status_code, response.headers
+                    )
+
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt >= max_retries
+                ):
+                    return response
+                delay = self.retry_policy.backoff(
+                    attempt, _retry_after_seconds(response)
+                )
+                if delay is None:
+                    return response
+                reason = f"HTTP {response.status_code}"
+
+            self.retry_counts[family] += 1
+            logger.warning(
+                "PDL %s %s failed (%s); retry %d/%d in %.2fs",
+                method,
+                path,
+                reason,
+                attempt + 1,
+                max_retries,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+
+async def _iter_search_pages(
+    search: Callable[[int, str | None], Awaitable[dict[str, Any]]],
+    limit: int,
+    scroll_token: str | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Follow scroll tokens, prefetching the next page while one is consumed.
+
+    Each yielded item is a PDL search response whose "data" holds at most
+    the records still wanted. Iteration stops after limit records, on the
+    last page (no scroll_token or no data), or after yielding a non-200
+    response. The final page is requested at the remaining size, so the
+    last scroll_token resumes exactly after the returned records.
+    """
+    remaining = limit
+    pending = asyncio.ensure_future(
+        search(min(remaining, PDL_SEARCH_PAGE_LIMIT), scroll_token)
+    )
+    try:
+        while pending is not None:
+            response = await pending
+            pending = None
+
+            data = response.get("data") or []
+            if response.get("status") == 200:
+                data = data[:remaining]
+                remaining -= len(data)
+                next_token = response.get("scroll_token")
+                if remaining > 0 and data and next_token:
+                    pending = asyncio.ensure_future(
+                        search(min(remaining, PDL_SEARCH_PAGE_LIMIT), next_token)
+                    )
+
+            yield {**response, "data": data} if "data" in response else response
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def collect_search_pages(pages: AsyncIterator[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Drain a search page iterator into one response shaped like a single page.
+
+    If the first page fails its error response is returned as-is. If a later
+    page fails, the records gathered so far are returned with the error
+    attached and the scroll_token of the last good page, so the caller can
+    resume.
+    """
+    records: list[dict[str, Any]] = []
+    collected: dict[str, Any] = {"status": 200, "data": records}
+    async for page in pages:
+        if page.get("status") != 200:
+            if not records:
+                return page
+            collected["error"] = page.get("error")
+            break
+        records.extend(page.get("data", []))
+        collected["total"] = page.get("total", collected.get("total"))
+        collected["scroll_token"] = page.get("scroll_token")
+    return collected
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    """Seconds requested by a Retry-After header, if present."""
+    now = time.time()
+    retry_at = _parse_reset_at(response.headers.get("retry-after"), now, relative=True)
+    return None if retry_at is None else retry_at - now
+
+
+def _decode_response(status_code: int, content: bytes) -> Any:
+    """
+    Decode a compact PDL response body with the fast JSON backend.
+
+    Non-JSON bodies (e.g. an HTML 502 from a proxy) become a PDL-style
+    error object so callers can keep checking "status".
+    """
+    try:
+        return fast_json.loads(content)
+    except ValueError:
+        message = content[:200].decode("utf-8", errors="replace")
+        return {"status": status_code, "error": {"message": message}}
+
+
+def _decode_sdk_response(response: Any) -> Any:
+    """Decode a peopledatalabs SDK (requests) response with fast JSON."""
+    return _decode_response(response.status_code, response.content)
+
+
+def _person_cache_namespace(titlecase: bool, fields: list[str] | None = None) -> str:
+    """Cache namespace for person enrichment (titlecase and fields change the payload)."""
+    return f"person:titlecase={titlecase}{_projection_suffix(fields)}"
+
+
+def _company_cache_namespace(fields: list[str] | None = None) -> str:
+    """Cache namespace for company enrichment (fields change the payload)."""
+    return f"company{_projection_suffix(fields)}"
+
+
+def _projection_suffix(fields: list[str] | None) -> str:
+    """Short, order-independent namespace suffix for a field projection."""
+    if not fields:
+        return ""
+    digest = hashlib.sha1(",".join(sorted(set(fields))).encode("utf-8"))
+    return f":fields={digest.hexdigest()[:12]}"
+
+
+def _bulk_params(pdl_id: str, fields: list[str] | None) -> dict[str, Any]:
+    """One bulk request item; data_include rides along with each item's params."""
+    params: dict[str, Any] = {"pdl_id": pdl_id}
+    if fields:
+        params["data_include"] = data_include(fields)
+    return {"params": params}
+
+
+def _chunk_ids(pdl_ids: list[str]) -> list[list[str]]:
+    """Split IDs into PDL_BULK_LIMIT-sized chunks."""
+    return [
+        pdl_ids[i : i + PDL_BULK_LIMIT] for i in range(0, len(pdl_ids), PDL_BULK_LIMIT)
+    ]
+
+
+def _bulk_chunk_items(
+    chunk: list[str],
+    response: Any = None,
+    error: BaseException | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Normalize one bulk chunk's outcome to exactly one item per requested ID.
+
+    A failed chunk (exception or a top-level PDL error object instead of a
+    list) becomes per-ID error items, so merged results stay aligned with
+    the input IDs.
+    """
+    if error is None and isinstance(response, list):
+        missing = len(chunk) - len(response)
+        padding = [
+            {"status": 500, "error": {"message": "Missing from bulk response"}}
+        ] * max(0, missing)
+        return response[: len(chunk)] + padding
+
+    if error is not None:
+        status, detail = 500, {"message": str(error)}
+    else:
+        response = response if isinstance(response, dict) else {}
+        status = response.get("status", 500)
+        detail = response.get("error", {"message": "Bulk enrichment failed"})
+    return [{"status": status, "error": detail} for _ in chunk]
+
+
+# Singleton instances
 _pdl_client: PDLClient | None = None
+_async_pdl_client: AsyncPDLClient | None = None
 
 
 def get_pdl_client(sandbox: bool = False) -> PDLClient:
@@ -284,3 +1406,82 @@ def get_pdl_client(sandbox: bool = False) -> PDLClient:
         _pdl_client = PDLClient(sandbox=sandbox)
     return _pdl_client
 
+
+def get_async_pdl_client(sandbox: bool = False) -> AsyncPDLClient:
+    """
+    Get or create the shared async PDL client.
+
+    Normally created at startup by the application lifespan; created lazily
+    here if a request arrives first.
+    """
+    global _async_pdl_client
+    if _async_pdl_client is None:
+        _async_pdl_client = AsyncPDLClient(
+            sandbox=sandbox,
+            rate_limiter=_build_rate_limiter(),
+            enrichment_cache=_build_enrichment_cache(),
+            search_cache=_build_search_cache(),
+        )
+    return _async_pdl_client
+
+
+def peek_async_pdl_client() -> AsyncPDLClient | None:
+    """Return the shared async PDL client if it has been created."""
+    return _async_pdl_client
+
+
+def _build_rate_limiter() -> PDLRateLimiter | None:
+    """Create the host-wide rate limiter from settings (None if disabled)."""
+    if not settings.pdl_rate_limit_enabled:
+        return None
+    return PDLRateLimiter(
+        db_path=os.path.join(state_directory(), "rate_limits.sqlite3"),
+        rates_per_minute={
+            "search": settings.pdl_rate_limit_search_per_minute,
+            "enrichment": settings.pdl_rate_limit_enrichment_per_minute,
+            "bulk": settings.pdl_rate_limit_bulk_per_minute,
+        },
+        burst=settings.pdl_rate_limit_burst,
+    )
+
+
+def _build_enrichment_cache() -> EnrichmentCache | None:
+    """Create the host-wide enrichment cache from settings (None if disabled)."""
+    if not settings.pdl_enrichment_cache_enabled:
+        return None
+    return EnrichmentCache(
+        db_path=os.path.join(state_directory(), "enrichment_cache.sqlite3"),
+        ttl_seconds=settings.pdl_enrichment_cache_ttl_seconds,
+        max_entries=settings.pdl_enrichment_cache_max_entries,
+    )
+
+
+def _build_search_cache() -> SearchCache | None:
+    """Create the search cache from settings (None if disabled)."""
+    if not settings.pdl_search_cache_enabled:
+        return None
+    return SearchCache(
+        max_entries=settings.pdl_search_cache_max_entries,
+        ttl_seconds=settings.pdl_search_cache_ttl_seconds,
+        db_path=(
+            os.path.join(state_directory(), "search_cache.sqlite3")
+            if settings.pdl_search_cache_disk_enabled
+            else None
+        ),
+    )
+
+
+def state_directory() -> str:
+    """Directory for PDL client state shared between worker processes."""
+    return os.path.join(
+        os.path.dirname(__file__), "..", "..", settings.pdl_state_directory
+    )
+
+
+async def close_async_pdl_client() -> None:
+    """Close the shared async PDL client and release its connection pool."""
+    global _async_pdl_client
+    if _async_pdl_client is not None:
+        await _async_pdl_client.aclose()
+        _async_pdl_client = None
+
@@ -0,0 +1,498 @@
+"""
+Local prospect store: persons and companies fetched from PDL, in SQLite.
+
+Generate and enrich calls upsert their records here (besides writing their
+export file), so previously fetched prospects can be queried without
+re-reading exports or spending PDL credits. Each call is recorded as an
+ICP run (its kind and ICP criteria) and linked to the records it
+returned; a record fetched by several runs is stored once.
+
+Re-fetched records are merged into the stored payload rather than
+replacing it: fields in the new record that are not None win, and fields
+it lacks or has as None keep their stored value. A later run with a
+smaller field profile (or a search-only fallback for a person whose
+enrichment missed) therefore refreshes the fields it has without dropping
+the ones it did not request.
+
+Indexed lookups:
+- persons / companies by PDL ID (primary keys)
+- persons by job_company_id and by work email domain
+- persons / companies by ICP run ID (run link tables)
+
+The database runs in WAL mode so queries are not blocked by upserts, and
+upserts are written in batched transactions of prospect_store_batch_size
+records. The file is shared by all worker processes on the host.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any
+
+from src.core.config import settings
+from src.utils import fast_json
+from src.utils.pdl_client import state_directory
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS icp_runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    icp TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS persons (
+    pdl_id TEXT PRIMARY KEY,
+    job_company_id TEXT,
+    work_email_domain TEXT,
+    payload BLOB NOT NULL,
+    first_seen_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_persons_job_company_id
+    ON persons (job_company_id);
+CREATE INDEX IF NOT EXISTS idx_persons_work_email_domain
+    ON persons (work_email_domain);
+CREATE TABLE IF NOT EXISTS run_persons (
+    run_id TEXT NOT NULL,
+    pdl_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, pdl_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS companies (
+    pdl_id TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    first_seen_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_companies (
+    run_id TEXT NOT NULL,
+    pdl_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, pdl_id)
+) WITHOUT ROWID;
+"""
+
+
+def work_email_domain(record: dict[str, Any]) -> str | None:
+    """Lower-cased domain of a person's work email (None if unknown)."""
+    email = record.get("work_email")
+    # Free plans return true/false instead of the address
+    if not isinstance(email, str) or "@" not in email:
+        return None
+    return email.rsplit("@", 1)[1].strip().lower() or None
+
+
+class ProspectStore:
+    """SQLite-backed store of fetched person and company records."""
+
+    def __init__(self, db_path: str, batch_size: int = 500):
+        """
+        Open (and create if missing) the prospect store.
+
+        Args:
+            db_path: SQLite file holding the store.
+            batch_size: Records written per upsert transaction.
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(
+            db_path, timeout=10, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def start_run(
+        self,
+        run_id: str,
+        kind: str,
+        icp: dict[str, Any] | None = None,
+        now: float | None = None,
+    ) -> None:
+        """
+        Record an ICP run (a no-op if it already exists, e.g. a resumed job).
+
+        Args:
+            run_id: Run identifier.
+            kind: What produced the run (e.g. "prospects_generate").
+            icp: Criteria the run searched with.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO icp_runs (run_id, kind, icp, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (run_id, kind, _json_text(icp), now),
+            )
+
+    def upsert_persons(
+        self,
+        records: Iterable[dict[str, Any]],
+        run_id: str | None = None,
+        now: float | None = None,
+    ) -> int:
+        """
+        Insert or update person records (and link them to run_id).
+
+        records may be a lazy iterable; it is consumed batch_size records
+        per transaction. Records without an "id" are skipped, and records
+        already stored are merged into the stored payload (see the module
+        docstring).
+
+        Returns:
+            Number of records written.
+        """
+        now = time.time() if now is None else now
+        written = 0
+        for batch in self._batches(records):
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    batch = self._merge_stored("persons", batch)
+                    self._conn.executemany(
+                        """
+                        INSERT INTO persons (
+                            pdl_id, job_company_id, work_email_domain, payload,
+                            first_seen_at, updated_at
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (pdl_id) DO UPDATE SET
+                            job_company_id = excluded.job_company_id,
+                            work_email_domain = excluded.work_email_domain,
+                            payload = excluded.payload,
+                            updated_at = excluded.updated_at
+                        """,
+                        [
+                            (
+                                record["id"],
+                                _text(record.get("job_company_id")),
+                                work_email_domain(record),
+                                fast_json.dumps(record),
+                                now,
+                                now,
+                            )
+                            for record in batch
+                        ],
+                    )
+                    self._link("run_persons", run_id, batch)
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            written += len(batch)
+        return written
+
+    def upsert_companies(
+        self,
+        records: Iterable[dict[str, Any]],
+        run_id: str | None = None,
+        now: float | None = None,
+    ) -> int:
+        """
+        Insert or update company records (and link them to run_id).
+
+        Records already stored are merged into the stored payload.
+
+        Returns:
+            Number of records written.
+        """
+        now = time.time() if now is None else now
+        written = 0
+        for batch in self._batches(records):
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    batch = self._merge_stored("companies", batch)
+                    self._conn.executemany(
+                        """
+                        INSERT INTO companies (
+                            pdl_id, payload, first_seen_at, updated_at
+                        )
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT (pdl_id) DO UPDATE SET
+                            payload = excluded.payload,
+                            updated_at = excluded.updated_at
+                        """,
+                        [
+                            (record["id"], fast_json.dumps(record), now, now)
+                            for record in batch
+                        ],
+                    )
+                    self._link("run_companies", run_id, batch)
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            written += len(batch)
+        return written
+
+    def query_persons(
+        self,
+        pdl_ids: list[str] | None = None,
+        job_company_ids: list[str] | None = None,
+        work_email_domain: str | None = None,
+        run_id: str | None = None,
+        after: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Look up stored persons, ordered by PDL ID.
+
+        Filters are combined with AND; omitted filters match everything.
+
+        Args:
+            pdl_ids: PDL person IDs.
+            job_company_ids: PDL company IDs of the persons' current job.
+            work_email_domain: Work email domain (case-insensitive).
+            run_id: ICP run that returned the persons.
+            after: Cursor from a previous page (the last PDL ID returned).
+            limit: Maximum number of records to return.
+
+        Returns:
+            (records, next_cursor): next_cursor is None on the last page.
+        """
+        conditions: list[str] = []
+        params: list[Any] = []
+        _add_in(conditions, params, "p.job_company_id", job_company_ids)
+        if work_email_domain:
+            conditions.append("p.work_email_domain = ?")
+            params.append(work_email_domain.strip().lower())
+        return self._query("persons", "run_persons", conditions, params,
+                           pdl_ids, run_id, after, limit)
+
+    def query_companies(
+        self,
+        pdl_ids: list[str] | None = None,
+        run_id: str | None = None,
+        after: str | None = None,
+        limit: int = 100,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        Look up stored companies, ordered by PDL ID.
+
+        Args:
+            pdl_ids: PDL company IDs.
+            run_id: ICP run that returned the companies.
+            after: Cursor from a previous page (the last PDL ID returned).
+            limit: Maximum number of records to return.
+
+        Returns:
+            (records, next_cursor): next_cursor is None on the last page.
+        """
+        return self._query("companies", "run_companies", [], [],
+                           pdl_ids, run_id, after, limit)
+
+    def list_runs(self, limit: int = 100) -> list[dict[str, Any]]:
+        """Most recent ICP runs with their record counts."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT r.run_id, r.kind, r.icp, r.created_at,
+                    (SELECT COUNT(*) FROM run_persons WHERE run_id = r.run_id),
+                    (SELECT COUNT(*) FROM run_companies WHERE run_id = r.run_id)
+                FROM icp_runs r
+                ORDER BY r.created_at DESC
+                LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        return [
+            {
+                "run_id": run_id,
+                "kind": kind,
+                "icp": fast_json.loads(icp) if icp else None,
+                "created_at": created_at,
+                "persons": persons,
+                "companies": companies,
+            }
+            for run_id, kind, icp, created_at, persons, companies in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _batches(
+        self, records: Iterable[dict[str, Any]]
+    ) -> Iterator[list[dict[str, Any]]]:
+        iterator = (record for record in records if record.get("id"))
+        while batch := list(islice(iterator, self.batch_size)):
+            yield batch
+
+    def _merge_stored(
+        self, table: str, batch: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Merge each record into its stored payload (inside the transaction)."""
+        rows = self._conn.execute(
+            f"SELECT pdl_id, payload FROM {table} "
+            "WHERE pdl_id IN (SELECT value FROM json_each(?))",
+            (_json_text([record["id"] for record in batch]),),
+        ).fetchall()
+        stored = {pdl_id: fast_json.loads(payload) for pdl_id, payload in rows}
+        merged: list[dict[str, Any]] = []
+        for record in batch:
+            previous = stored.get(record["id"])
+            if previous is not None:
+                record = previous | {
+                    key: value for key, value in record.items() if value is not None
+                }
+            # A record repeated within the batch merges into its first copy
+            stored[record["id"]] = record
+            merged.append(record)
+        return merged
+
+    def _link(
+        self, table: str, run_id: str | None, batch: list[dict[str, Any]]
+    ) -> None:
+        if run_id is None:
+            return
+        self._conn.executemany(
+            f"INSERT OR IGNORE INTO {table} (run_id, pdl_id) VALUES (?, ?)",
+            [(run_id, record["id"]) for record in batch],
+        )
+
+    def _query(
+        self,
+        table: str,
+        run_table: str,
+        conditions: list[str],
+        params: list[Any],
+        pdl_ids: list[str] | None,
+        run_id: str | None,
+        after: str | None,
+        limit: int,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        join = ""
+        if run_id is not None:
+            join = f"JOIN {run_table} r ON r.pdl_id = p.pdl_id AND r.run_id = ?"
+            params = [run_id, *params]
+        _add_in(conditions, params, "p.pdl_id", pdl_ids)
+        if after is not None:
+            conditions.append("p.pdl_id > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT p.pdl_id, p.payload FROM {table} p {join}
+                {where}
+                ORDER BY p.pdl_id
+                LIMIT ?
+                """,
+                (*params, limit + 1),
+            ).fetchall()
+        records = [fast_json.loads(payload) for _, payload in rows[:limit]]
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return records, next_cursor
+
+
+def _add_in(
+    conditions: list[str], params: list[Any], column: str, values: list[str] | None
+) -> None:
+    if values:
+        conditions.append(f"{column} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+
+
+def _text(value: Any) -> str | None:
+    return value if isinstance(value, str) else None
+
+
+def _json_text(value: Any) -> str | None:
+    return None if value is None else fast_json.dumps(value).decode("utf-8")
+
+
+# Singleton instance
+_prospect_store: ProspectStore | None = None
+
+
+def get_prospect_store() -> ProspectStore | None:
+    """Get or create the host-wide prospect store (None if disabled)."""
+    global _prospect_store
+    if not settings.prospect_store_enabled:
+        return None
+    if _prospect_store is None:
+        _prospect_store = ProspectStore(
+            db_path=os.path.join(state_directory(), "prospect_store.sqlite3"),
+            batch_size=settings.prospect_store_batch_size,
+        )
+    return _prospect_store
+
+
+def close_prospect_store() -> None:
+    """Close the host-wide prospect store."""
+    global _prospect_store
+    if _prospect_store is not None:
+        _prospect_store.close()
+        _prospect_store = None
+
+
+async def store_persons(
+    records: Iterable[dict[str, Any]],
+    kind: str,
+    icp: dict[str, Any] | None,
+    run_id: str | None = None,
+) -> str | None:
+    """
+    Upsert person records under an ICP run, off the event loop.
+
+    Call again with the returned run_id to add further batches to the
+    same run.
+
+    Args:
+        records: Person records (may be a lazy iterable).
+        kind: What produced the run (e.g. "persons_enrich").
+        icp: Criteria the run searched with.
+        run_id: Existing run to add to (a new run if omitted).
+
+    Returns:
+        The run ID, or None if the store is disabled.
+    """
+    store = get_prospect_store()
+    if store is None:
+        return None
+    run_id = run_id or uuid.uuid4().hex
+
+    def write() -> None:
+        store.start_run(run_id, kind, icp)
+        store.upsert_persons(records, run_id)
+
+    await asyncio.to_thread(write)
+    return run_id
+
+
+async def store_companies(
+    records: Iterable[dict[str, Any]],
+    kind: str,
+    icp: dict[str, Any] | None,
+    run_id: str | None = None,
+) -> str | None:
+    """
+    Upsert company records under an ICP run, off the event loop.
+
+    Args:
+        records: Company records.
+        kind: What produced the run (e.g. "companies_enrich").
+        icp: Criteria the run searched with.
+        run_id: Existing run to add to (a new run if omitted).
+
+    Returns:
+        The run ID, or None if the store is disabled.
+    """
+    store = get_prospect_store()
+    if store is None:
+        return None
+    run_id = run_id or uuid.uuid4().hex
+
+    def write() -> None:
+        store.start_run(run_id, kind, icp)
+        store.upsert_companies(records, run_id)
+
+    await asyncio.to_thread(write)
+    return run_id
@@ -163,6 +163,55 @@ class ProspectsQueryBuilder:
         where_clause = " AND ".join(self.conditions)
         return f"SELECT * FROM person WHERE {where_clause}"
 
+    def shard_company_ids(
+        self, company_ids: list[str], max_ids: int, max_query_length: int
+    ) -> list[list[str]]:
+        """
+        Split company IDs into shards for build_person_query_with_company_ids.
+
+        Uses the fewest shards that keep every shard within max_ids IDs and
+        every shard's person query within max_query_length characters, and
+        spreads the IDs evenly across them (so 52 IDs at max_ids=25 become
+        18+17+17 rather than 25+25+2). Order is preserved.
+
+        Args:
+            company_ids: PDL company IDs from company search.
+            max_ids: Maximum number of IDs per shard.
+            max_query_length: Maximum length of a shard's person query.
+        """
+        if not company_ids:
+            return []
+
+        # Query length with a one-character ID, minus its quoted form 'x'
+        base_length = len(self.build_person_query_with_company_ids(["x"])) - 3
+        id_budget = max(1, max_query_length - base_length)
+        # Each ID is quoted and followed by ", " (except the last)
+        total_length = sum(len(cid) + 4 for cid in company_ids) - 2
+
+        shard_count = max(
+            -(-len(company_ids) // max_ids), -(-total_length // id_budget)
+        )
+
+        shards: list[list[str]] = []
+        shard: list[str] = []
+        shard_length = 0
+        shard_size = -(-len(company_ids) // shard_count)
+        for i, cid in enumerate(company_ids):
+            id_length = len(cid) + 2 + (2 if shard else 0)
+            if shard and (
+                len(shard) >= shard_size or shard_length + id_length > id_budget
+            ):
+                shards.append(shard)
+                shard, shard_length = [], 0
+                id_length = len(cid) + 2
+                # Spread the remaining IDs over the remaining shards
+                remaining = len(company_ids) - i
+                shard_size = -(-remaining // max(1, shard_count - len(shards)))
+            shard.append(cid)
+            shard_length += id_length
+        shards.append(shard)
+        return shards
+
     # ==========================================================================
     # Helper Methods
     # ==========================================================================
@@ -0,0 +1,138 @@
+"""
+Resilience primitives for PDL API calls.
+
+Provides:
+- RetryPolicy: per-family retry budgets with exponential backoff, full
+  jitter and Retry-After support
+- CircuitBreaker: fails fast while PDL is degraded, probing with a single
+  trial call once the cool-down has passed
+- PDLUnavailableError: raised instead of calling PDL while a breaker is open
+"""
+
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from src.core.config import settings
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Responses that indicate PDL itself is degraded (429 does not count)
+FAILURE_STATUS_CODES = {500, 502, 503, 504}
+
+
+class PDLUnavailableError(Exception):
+    """Raised when the circuit breaker for an endpoint family is open."""
+
+
+def _default_max_retries() -> dict[str, int]:
+    return {
+        "search": settings.pdl_retry_search,
+        "enrichment": settings.pdl_retry_enrichment,
+        "bulk": settings.pdl_retry_bulk,
+    }
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry budget and backoff schedule for PDL calls.
+
+    Attributes:
+        max_retries: Retries allowed per endpoint family (after the first try).
+        base_delay: Backoff base in seconds; attempt n waits up to base * 2**n.
+        max_delay: Cap on any single wait. A Retry-After longer than this
+            is not waited out; the response is returned to the caller.
+    """
+
+    max_retries: dict[str, int] = field(default_factory=_default_max_retries)
+    base_delay: float = field(
+        default_factory=lambda: settings.pdl_retry_base_delay_seconds
+    )
+    max_delay: float = field(
+        default_factory=lambda: settings.pdl_retry_max_delay_seconds
+    )
+
+    def retries_for(self, family: str) -> int:
+        """Retry budget for an endpoint family."""
+        return self.max_retries.get(family, 0)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """
+        Seconds to wait before retry number `attempt` (0-based).
+
+        Returns:
+            Delay in seconds, or None if Retry-After exceeds max_delay.
+        """
+        if retry_after is not None:
+            return max(0.0, retry_after) if retry_after <= self.max_delay else None
+        # Full jitter: uniform over [0, capped exponential]
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    → calls pass; `failure_threshold` failures in a row open it
+    open      → calls raise PDLUnavailableError until `reset_timeout` passes
+    half_open → one trial call passes; success closes, failure re-opens
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int | None = None,
+        reset_timeout: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.pdl_circuit_failure_threshold
+        self.reset_timeout = reset_timeout or settings.pdl_circuit_reset_seconds
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """
+        Raise PDLUnavailableError if the call must not go through.
+
+        Returns:
+            True if the call is the half-open trial. A trial that ends
+            without an outcome (e.g. cancelled) must call release_trial.
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        raise PDLUnavailableError(
+            f"PDL {self.name} calls are failing; circuit breaker is open"
+        )
+
+    def release_trial(self) -> None:
+        """Let another call be the trial; the breaker stays half-open."""
+        self.trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self.trial_in_flight = False
@@ -0,0 +1,47 @@
+"""
+Per-request budget for PDL search calls and credits.
+
+Fill-to-target (top-up) runs keep paging until they have enough qualifying
+prospects, so they are capped by a budget instead of by a page count. PDL
+search bills one credit per record returned; a call's page size is
+reserved against the credit budget before it is sent and the unused part
+is refunded once the response arrives, so concurrent calls cannot
+overshoot the budget together.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class SearchBudget:
+    """Cap on the search calls and credits spent by one request."""
+
+    max_calls: int | None = None
+    max_credits: int | None = None
+    calls: int = 0
+    credits: int = 0
+
+    @property
+    def exhausted(self) -> bool:
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return True
+        return self.max_credits is not None and self.credits >= self.max_credits
+
+    def acquire(self, size: int) -> int:
+        """
+        Reserve one call of up to size records.
+
+        Returns:
+            The page size the budget allows (0 if it is exhausted).
+        """
+        if self.exhausted:
+            return 0
+        if self.max_credits is not None:
+            size = min(size, self.max_credits - self.credits)
+        self.calls += 1
+        self.credits += size
+        return size
+
+    def settle(self, reserved: int, returned: int) -> None:
+        """Refund the part of a reservation the response did not use."""
+        self.credits -= max(0, reserved - returned)
@@ -0,0 +1,170 @@
+"""
+Search result cache for PDL person and company search.
+
+Two tiers, both keyed by the normalized request (SQL with whitespace
+collapsed outside string literals, plus size, titlecase, scroll token and
+any other request params):
+- an in-process LRU with TTL, so repeated pages return without I/O
+- an optional SQLite tier shared by all worker processes on the host
+
+Both tiers hold the encoded response, so every hit decodes a fresh copy
+that callers may modify freely.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any
+
+from src.utils import fast_json
+
+# Single-quoted SQL string literals, with '' as an escaped quote
+_SQL_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+_COUNTERS = ("memory_hits", "disk_hits", "misses", "evictions", "expirations")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside string literals and drop a trailing ';'."""
+    parts = _SQL_LITERAL.split(sql.strip().rstrip(";").strip())
+    return "".join(
+        part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts)
+    )
+
+
+def search_cache_key(kind: str, params: dict[str, Any]) -> str:
+    """Build a cache key from the search kind and its request params."""
+    normalized = {**params, "sql": normalize_sql(params.get("sql", ""))}
+    normalized.pop("pretty", None)
+    raw = json.dumps([kind, normalized], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """In-process LRU + TTL cache with an optional shared SQLite tier."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        db_path: str | None = None,
+    ):
+        """
+        Initialize search cache.
+
+        Args:
+            max_entries: Maximum entries held in memory (LRU evicted).
+            ttl_seconds: Age after which an entry is treated as a miss.
+            db_path: Optional SQLite file for the shared on-disk tier.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.counters: Counter[str] = Counter()
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        # _lock guards _memory and counters and is taken on the event loop;
+        # _db_lock serializes the shared connection in worker threads
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(
+                db_path, timeout=10, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+
+    @property
+    def has_disk_tier(self) -> bool:
+        return self._conn is not None
+
+    def get_memory(self, key: str, now: float | None = None) -> dict[str, Any] | None:
+        """Look up the in-process tier only (no I/O)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            created_at, payload = entry
+            if now - created_at > self.ttl_seconds:
+                del self._memory[key]
+                self.counters["expirations"] += 1
+                return None
+            self._memory.move_to_end(key)
+            self.counters["memory_hits"] += 1
+        return fast_json.loads(payload)
+
+    def get_disk(self, key: str, now: float | None = None) -> dict[str, Any] | None:
+        """Look up the shared on-disk tier, promoting hits into memory."""
+        if self._conn is None:
+            return None
+        now = time.time() if now is None else now
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM search_cache WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            return None
+        payload = bytes(row[0])
+        self._remember(key, payload, row[1])
+        with self._lock:
+            self.counters["disk_hits"] += 1
+        return fast_json.loads(payload)
+
+    def put(self, key: str, response: dict[str, Any], now: float | None = None) -> None:
+        """Store a response in memory and, if configured, on disk."""
+        now = time.time() if now is None else now
+        payload = fast_json.dumps(response)
+        self._remember(key, payload, now)
+        if self._conn is None:
+            return
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (cache_key, payload, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, payload, now),
+            )
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.counters["misses"] += 1
+
+    def metrics(self) -> dict[str, int]:
+        """Hit/miss/eviction counters for this process."""
+        with self._lock:
+            return {key: self.counters[key] for key in _COUNTERS} | {
+                "memory_entries": len(self._memory)
+            }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+
+    def _remember(self, key: str, payload: bytes, created_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (created_at, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.counters["evictions"] += 1
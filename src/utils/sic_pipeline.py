@@ -0,0 +1,490 @@
+"""
+Pipelined SIC-based prospect flow.
+
+The SIC flow has three stages: company search, person search over the
+matched company IDs and (for generate) enrichment. Run in sequence its
+latency is the sum of all stages; SICPipeline overlaps them instead:
+
+- company stage: follows company search pages and shards each page's IDs
+  as soon as the page arrives (see ProspectsQueryBuilder.shard_company_ids),
+  so no person query inlines more IDs than the ID and query-length limits
+- person stage: a pool of workers runs the person search for each shard
+  (following its scroll pages) while the company stage is still paging
+- collect stage: merges person pages as they land, dedupes them across
+  shards, trims them to the target and hands each page to the optional
+  enrich callable
+
+No stage runs (and spends credits) further ahead than the target needs:
+each person search reserves its page size against the target before it is
+sent, the company stage fetches its next page only once every pending shard
+has been taken and the searches in flight cannot cover the target, and
+person pages reach the collect stage through a bounded queue, so slow
+enrichment backpressures the person searches. Once the target is reached
+(or the optional SearchBudget is spent) no new searches are started.
+
+A run's position in both stages is an SICCursor: the company scroll token,
+plus the shards still pending with each shard's person scroll token. Calls
+in flight when the target is reached are allowed to finish and land in the
+cursor, so resuming from it never repeats a PDL call. on_page receives,
+with each collected page, the cursor that resumes right after it: shards
+whose later pages are still queued or in flight appear there at their
+last collected position, so a caller checkpointing every page never skips
+a person.
+"""
+
+import asyncio
+import base64
+import zlib
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.core.config import settings
+from src.utils import fast_json
+from src.utils.enrichment_cache import CacheMode
+from src.utils.pdl_client import PDL_SEARCH_PAGE_LIMIT
+from src.utils.prospects_query_builder import ProspectsQueryBuilder
+from src.utils.search_budget import SearchBudget
+
+EnrichFunc = Callable[[list[dict[str, Any]]], Awaitable[list[dict[str, Any]]]]
+PageFunc = Callable[[list[dict[str, Any]], "SICCursor"], Awaitable[None]]
+
+# Marks scroll tokens that are SIC cursors rather than raw PDL scroll tokens
+CURSOR_PREFIX = "sic1."
+
+
+@dataclass
+class CompanyShard:
+    """Company IDs searched by one person query, and its scroll position."""
+
+    company_ids: list[str]
+    scroll_token: str | None = None
+
+
+@dataclass
+class SICCursor:
+    """Position of a SIC flow in both its company and person stages."""
+
+    company_scroll_token: str | None = None
+    companies_exhausted: bool = False
+    shards: list[CompanyShard] = field(default_factory=list)
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether no company pages and no shards are left."""
+        return self.companies_exhausted and not self.shards
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "company_scroll_token": self.company_scroll_token,
+            "companies_exhausted": self.companies_exhausted,
+            "shards": [[s.company_ids, s.scroll_token] for s in self.shards],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SICCursor":
+        """
+        Build a cursor from to_dict output.
+
+        Raises:
+            ValueError: If any field has the wrong type; the data may come
+                from a client-supplied scroll token.
+        """
+        company_scroll_token = data["company_scroll_token"]
+        companies_exhausted = data["companies_exhausted"]
+        shards = data["shards"]
+        if not (
+            _is_token(company_scroll_token)
+            and isinstance(companies_exhausted, bool)
+            and isinstance(shards, list)
+            and all(_is_shard(shard) for shard in shards)
+        ):
+            raise ValueError("Invalid SIC cursor")
+        return cls(
+            company_scroll_token=company_scroll_token,
+            companies_exhausted=companies_exhausted,
+            shards=[CompanyShard(list(ids), token) for ids, token in shards],
+        )
+
+    def encode(self) -> str | None:
+        """Encode as an opaque scroll token (None once exhausted)."""
+        if self.exhausted:
+            return None
+        payload = zlib.compress(fast_json.dumps(self.to_dict()))
+        return CURSOR_PREFIX + base64.urlsafe_b64encode(payload).decode("ascii")
+
+    @classmethod
+    def decode(cls, token: str | None) -> "SICCursor":
+        """
+        Decode a scroll token returned by the SIC flow.
+
+        A token without the cursor prefix is taken as a plain company search
+        scroll token.
+
+        Raises:
+            ValueError: If the token has the cursor prefix but is malformed.
+        """
+        if not token:
+            return cls()
+        if not token.startswith(CURSOR_PREFIX):
+            return cls(company_scroll_token=token)
+        try:
+            payload = base64.urlsafe_b64decode(token[len(CURSOR_PREFIX) :])
+            return cls.from_dict(fast_json.loads(zlib.decompress(payload)))
+        except (ValueError, TypeError, KeyError, zlib.error):
+            raise ValueError("Invalid scroll_token") from None
+
+
+def _is_token(value: Any) -> bool:
+    return value is None or isinstance(value, str)
+
+
+def _is_shard(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) == 2
+        and isinstance(value[0], list)
+        and all(isinstance(company_id, str) for company_id in value[0])
+        and _is_token(value[1])
+    )
+
+
+@dataclass
+class SICPipelineResult:
+    """Outcome of a SIC pipeline run."""
+
+    persons: list[dict[str, Any]] = field(default_factory=list)
+    companies_found: int = 0
+    cursor: SICCursor = field(default_factory=SICCursor)
+    company_error: str | None = None
+    person_error: str | None = None
+    budget_exhausted: bool = False
+
+
+class SICPipeline:
+    """Overlapping Company Search → Person Search → Enrichment stages."""
+
+    def __init__(
+        self,
+        client: Any,
+        query_builder: ProspectsQueryBuilder,
+        target: int,
+        company_limit: int | None,
+        cursor: SICCursor | None = None,
+        fields: list[str] | None = None,
+        cache_mode: CacheMode = "use",
+        enrich: EnrichFunc | None = None,
+        on_page: PageFunc | None = None,
+        budget: SearchBudget | None = None,
+        company_budget: SearchBudget | None = None,
+        batch_size: int | None = None,
+        max_query_length: int | None = None,
+        concurrency: int | None = None,
+        queue_size: int | None = None,
+    ):
+        """
+        Initialize SIC pipeline.
+
+        Args:
+            client: Async PDL client.
+            query_builder: Builds the company and per-shard person queries.
+            target: Number of persons to collect.
+            company_limit: Maximum number of companies to page through
+                (None pages until the target is reached).
+            cursor: Position to resume both stages from.
+            fields: Optional field projection for person search records.
+            cache_mode: Search cache behavior for this run.
+            enrich: Optional coroutine function replacing each collected
+                person page with its enriched records; persons it drops
+                (e.g. not enrichable) do not count towards the target.
+            on_page: Optional coroutine function called with each collected
+                (and enriched) page as soon as it is collected, in the order
+                the pages make up result.persons, and the cursor resuming
+                right after that page.
+            budget: Optional cap on the search calls and credits spent.
+            company_budget: Separate cap for company searches (defaults to
+                budget, so both stages share it).
+            batch_size: Maximum company IDs per person search (defaults to
+                settings).
+            max_query_length: Maximum person query length (defaults to
+                settings).
+            concurrency: Concurrent person searches (defaults to settings).
+            queue_size: Depth of the person page queue feeding the collect
+                stage (defaults to settings).
+        """
+        self.client = client
+        self.query_builder = query_builder
+        self.target = target
+        self.company_limit = company_limit
+        self.cursor = cursor or SICCursor()
+        self.fields = fields
+        self.cache_mode = cache_mode
+        self.enrich = enrich
+        self.on_page = on_page
+        self.budget = budget or SearchBudget()
+        self.company_budget = company_budget or self.budget
+        self.batch_size = batch_size or settings.sic_company_batch_size
+        self.max_query_length = (
+            max_query_length or settings.sic_person_query_max_length
+        )
+        self.concurrency = concurrency or settings.sic_person_search_concurrency
+        self.queue_size = queue_size or settings.sic_pipeline_queue_size
+        self.result = SICPipelineResult(cursor=self.cursor)
+
+    async def run(self) -> SICPipelineResult:
+        """
+        Run all stages to completion (or until target persons are collected).
+
+        Returns:
+            The collected persons, the number of companies fetched, the
+            cursor to resume from and any search errors. Search error
+            responses are recorded rather than raised (the failed shard or
+            company page stays in the cursor); other exceptions (e.g.
+            PDLUnavailableError) propagate.
+        """
+        if self.target <= 0 or self.cursor.exhausted:
+            return self.result
+
+        self._pending: deque[CompanyShard] = deque(self.cursor.shards)
+        self._failed: list[CompanyShard] = []
+        self._company_scroll_token = self.cursor.company_scroll_token
+        self._companies_exhausted = self.cursor.companies_exhausted
+        self._companies_done = False
+        self._stopped = False
+        self._changed = asyncio.Condition()
+        self._pages: asyncio.Queue[
+            tuple[CompanyShard, list[dict], str | None] | None
+        ] = asyncio.Queue(maxsize=self.queue_size)
+        # Taken shards at the position after their last collected page, keyed
+        # by id() since shards are unhashable dataclasses
+        self._collected: dict[int, CompanyShard] = {}
+        self._reserved = 0
+        self._workers_left = self.concurrency
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._company_stage())
+                for _ in range(self.concurrency):
+                    group.create_task(self._person_worker())
+                group.create_task(self._collect_stage())
+        except BaseExceptionGroup as errors:
+            raise errors.exceptions[0] from None
+
+        self.result.cursor = SICCursor(
+            company_scroll_token=self._company_scroll_token,
+            companies_exhausted=self._companies_exhausted,
+            shards=[*self._failed, *self._pending],
+        )
+        return self.result
+
+    async def _company_stage(self) -> None:
+        company_query = self.query_builder.build_company_query()
+        fetched = 0
+
+        while not self._companies_exhausted and (
+            self.company_limit is None or fetched < self.company_limit
+        ):
+            # Fetch the next page only once every pending shard has been
+            # taken and the searches in flight cannot cover the target
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: (not self._pending and self._reserved < self.target)
+                    or self._stopped
+                )
+            if self._stopped:
+                break
+
+            size = PDL_SEARCH_PAGE_LIMIT
+            if self.company_limit is not None:
+                size = min(size, self.company_limit - fetched)
+            size = self.company_budget.acquire(size)
+            if not size:
+                await self._budget_spent()
+                break
+
+            # Only company IDs feed the person query, so project to "id"
+            response = await self.client.company_search(
+                sql_query=company_query,
+                size=size,
+                scroll_token=self._company_scroll_token,
+                fields=["id"],
+                cache_mode=self.cache_mode,
+            )
+            self.company_budget.settle(size, len(response.get("data", [])))
+            if response.get("status") != 200:
+                self.result.company_error = _error_message(response)
+                break
+
+            companies = response.get("data", [])
+            company_ids = [c.get("id") for c in companies if c.get("id")]
+            fetched += len(companies)
+            self.result.companies_found = fetched
+
+            async with self._changed:
+                # Advanced together with the new shards, so no cursor ever
+                # skips this page's companies
+                self._company_scroll_token = response.get("scroll_token")
+                self._companies_exhausted = (
+                    not companies or not self._company_scroll_token
+                )
+                self._pending.extend(
+                    CompanyShard(shard)
+                    for shard in self.query_builder.shard_company_ids(
+                        company_ids, self.batch_size, self.max_query_length
+                    )
+                )
+                self._changed.notify_all()
+
+        async with self._changed:
+            self._companies_done = True
+            self._changed.notify_all()
+
+    async def _person_worker(self) -> None:
+        while True:
+            # Take a shard together with its first page's reservation
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: (self._pending and self._reserved < self.target)
+                    or (self._companies_done and not self._pending)
+                    or self._stopped
+                )
+                if self._stopped or not self._pending:
+                    break
+                shard = self._pending.popleft()
+                self._collected[id(shard)] = CompanyShard(
+                    shard.company_ids, shard.scroll_token
+                )
+                size = self._reserve_locked()
+            await self._search_shard(shard, size)
+
+        self._workers_left -= 1
+        if not self._workers_left:
+            await self._pages.put(None)
+
+    async def _search_shard(self, shard: CompanyShard, size: int) -> None:
+        """Follow the person search pages of one company ID shard."""
+        person_query = self.query_builder.build_person_query_with_company_ids(
+            shard.company_ids
+        )
+
+        while size:
+            allowed = self.budget.acquire(size)
+            await self._release(size - allowed)
+            if not allowed:
+                await self._budget_spent()
+                break
+            size = allowed
+
+            response = await self.client.person_search(
+                sql_query=person_query,
+                size=size,
+                scroll_token=shard.scroll_token,
+                fields=self.fields,
+                cache_mode=self.cache_mode,
+            )
+            self.budget.settle(size, len(response.get("data", [])))
+            if response.get("status") != 200:
+                await self._release(size)
+                self.result.person_error = _error_message(response)
+                self._failed.append(shard)
+                return
+
+            persons = response.get("data", [])[:size]
+            await self._release(size - len(persons))
+            # Empty pages too: collecting one moves the shard's position
+            shard.scroll_token = response.get("scroll_token")
+            await self._pages.put((shard, persons, shard.scroll_token))
+            if not persons or not shard.scroll_token:
+                return
+            size = await self._reserve()
+
+        # Stopped with pages left: the shard resumes from its scroll token
+        async with self._changed:
+            self._pending.appendleft(shard)
+
+    async def _collect_stage(self) -> None:
+        seen: set[str] = set()
+
+        while (page := await self._pages.get()) is not None:
+            shard, persons, scroll_token = page
+            new_persons = []
+            for person in persons:
+                pdl_id = person.get("id")
+                if pdl_id is not None:
+                    if pdl_id in seen:
+                        continue
+                    seen.add(pdl_id)
+                new_persons.append(person)
+            new_persons = new_persons[: self.target - len(self.result.persons)]
+            await self._release(len(persons) - len(new_persons))
+
+            if self.enrich is not None and new_persons:
+                candidates = len(new_persons)
+                new_persons = await self.enrich(new_persons)
+                await self._release(candidates - len(new_persons))
+            self.result.persons.extend(new_persons)
+
+            if not persons or not scroll_token:
+                del self._collected[id(shard)]
+            else:
+                self._collected[id(shard)].scroll_token = scroll_token
+            if self.on_page is not None and new_persons:
+                await self.on_page(new_persons, self._collected_cursor())
+
+            if len(self.result.persons) >= self.target:
+                await self._stop()
+
+    def _collected_cursor(self) -> SICCursor:
+        """Cursor resuming right after the pages collected so far."""
+        untaken = [s for s in self._pending if id(s) not in self._collected]
+        return SICCursor(
+            company_scroll_token=self._company_scroll_token,
+            companies_exhausted=self._companies_exhausted,
+            shards=[
+                CompanyShard(s.company_ids, s.scroll_token)
+                for s in [*self._collected.values(), *untaken]
+            ],
+        )
+
+    async def _reserve(self) -> int:
+        """
+        Reserve the size of the next person page against the target.
+
+        Waits while in-flight and collected persons already cover the target;
+        a search returning fewer persons releases the rest of its reservation.
+        Returns 0 once the run is stopped.
+        """
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self._reserved < self.target or self._stopped
+            )
+            if self._stopped:
+                return 0
+            return self._reserve_locked()
+
+    def _reserve_locked(self) -> int:
+        size = min(PDL_SEARCH_PAGE_LIMIT, self.target - self._reserved)
+        self._reserved += size
+        return size
+
+    async def _release(self, count: int) -> None:
+        if count <= 0:
+            return
+        async with self._changed:
+            self._reserved -= count
+            self._changed.notify_all()
+
+    async def _stop(self) -> None:
+        """Stop starting new searches once the target is reached."""
+        async with self._changed:
+            self._stopped = True
+            self._changed.notify_all()
+
+    async def _budget_spent(self) -> None:
+        self.result.budget_exhausted = True
+        await self._stop()
+
+
+def _error_message(response: dict[str, Any]) -> str:
+    return response.get("error", {}).get("message", "Unknown error")
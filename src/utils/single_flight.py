@@ -0,0 +1,54 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call and
+its result instead of each issuing an identical PDL request. The shared
+call runs as its own task, so one caller being cancelled does not cancel
+it for the others.
+"""
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._flights: dict[str, asyncio.Task[Any]] = {}
+        self.counters: Counter[str] = Counter()
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for key, or join the call already in flight for key.
+
+        Args:
+            key: Identity of the request (callers with equal keys coalesce).
+            func: Zero-argument coroutine function performing the call.
+
+        Returns:
+            The shared result. Exceptions propagate to every waiter.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._flights[key] = task
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def metrics(self) -> dict[str, int]:
+        """Leader/coalesced call counters for this process."""
+        return {
+            "leaders": self.counters["leaders"],
+            "coalesced": self.counters["coalesced"],
+            "in_flight": self.in_flight,
+        }